@@ -1,7 +1,11 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
+import asyncio
+import hashlib
+from contextlib import asynccontextmanager
 import sys
 import os
 
@@ -9,15 +13,137 @@ import os
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(project_root)
 
-from src.data.stock_data import get_stock_data
-from src.data.summarization import summarize_text
+from src.data import shared_cache, store
+from src.data.stock_data import bars_since, get_latest_quote, get_stock_data, get_stock_data_resolution
+from src.data.summarization import summarize_batch, summarize_text
+from src.data import models, pyramid, sentiment
+from src.data.quote_stream import Subscriber, quote_hub
+from src.data.alerts import alert_engine
+from src.data.prefetch import PREFETCH_ENABLED, prefetch_scheduler
+from src.data.watchlist import ACCESS_FLUSH_SECONDS, access_stats, flush_access_counts, record_access
+from src.data.symbols import directory, search_symbols
+from src.data.hedging import hedged_fetcher
+from src.data.export import MEDIA_TYPES, export_stream
+from src.analytics.portfolio import portfolio_risk
+from src.analytics.correlation import correlation_matrices
+from src.analytics.backtest import backtest, shutdown_executor, sweep
+from src.analytics.screener import SCREENER_ENABLED, screener_index
+from src.analytics.anomaly import anomaly_monitor, detect_anomalies
+from src.utils.market_hours import cache_max_age
+from src.utils import deadline, leader, profiling
+from src.utils.deadline import DeadlineExceeded
+
+def _check_alerts(symbol: str, quote: dict):
+    # Fired alerts no longer need their symbol polled
+    for _ in alert_engine.on_quote(symbol, quote):
+        quote_hub.unpin(symbol)
+
+
+quote_hub.add_listener(_check_alerts)
+# Score new bars for anomalies as they are stored
+store.add_listener(anomaly_monitor.on_bars)
+# Keep zoom-chart aggregates current as daily bars are stored
+store.add_listener(pyramid.on_bars)
+
+
+async def _lead_background_jobs():
+    """Start the provider-polling background jobs once this worker leads the node"""
+    while not leader.try_acquire():
+        await asyncio.sleep(leader.LEADER_RETRY_SECONDS)
+    if PREFETCH_ENABLED:
+        prefetch_scheduler.start()
+    if SCREENER_ENABLED:
+        screener_index.start()
+
+
+async def _share_access_counts():
+    """Feed this worker's request counts to the node-wide watchlist ranking"""
+    while True:
+        await asyncio.sleep(ACCESS_FLUSH_SECONDS)
+        await asyncio.to_thread(flush_access_counts)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load the symbol directory off the event loop (a no-op when gunicorn
+    # preloaded it), so the first search does not download the listings
+    preload = asyncio.create_task(asyncio.to_thread(directory))
+    # Keep the watchlist warm in the background, from one worker per node
+    election = None
+    if PREFETCH_ENABLED or SCREENER_ENABLED:
+        election = asyncio.create_task(_lead_background_jobs())
+    # Every worker's requests count towards the leader's prefetch ranking
+    sharing = asyncio.create_task(_share_access_counts()) if shared_cache.enabled() else None
+    yield
+    preload.cancel()
+    if election is not None:
+        election.cancel()
+    if sharing is not None:
+        sharing.cancel()
+        await asyncio.to_thread(flush_access_counts)
+    await prefetch_scheduler.stop()
+    await screener_index.stop()
+    leader.release()
+    await asyncio.to_thread(shutdown_executor)
+
+
+class DeadlineMiddleware:
+    """
+    Bound a request by the client's X-Request-Timeout (seconds). Providers,
+    fallbacks and the summarizer queue see the deadline and give up once
+    it passes; the client gets 504 rather than a late answer.
+
+    A plain ASGI middleware rather than @app.middleware("http"): only here
+    is the endpoint itself cancelled when the deadline passes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        header = None
+        if scope["type"] == "http":
+            header = dict(scope["headers"]).get(b"x-request-timeout")
+        if header is None:
+            return await self.app(scope, receive, send)
+        try:
+            seconds = float(header)
+        except ValueError:
+            response = JSONResponse(status_code=400, content={"detail": f"Invalid X-Request-Timeout '{header.decode()}'"})
+            return await response(scope, receive, send)
+        if seconds <= 0:
+            response = JSONResponse(status_code=504, content={"detail": "Deadline exceeded before the request started"})
+            return await response(scope, receive, send)
+
+        started = asyncio.Event()
+
+        async def send_tracked(message):
+            started.set()
+            await send(message)
+
+        with deadline.bound(seconds):
+            task = asyncio.ensure_future(self.app(scope, receive, send_tracked))
+            waiter = asyncio.ensure_future(started.wait())
+            await asyncio.wait({task, waiter}, timeout=seconds, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not started.is_set() and not task.done():
+                task.cancel()
+                response = JSONResponse(status_code=504, content={"detail": "Deadline exceeded"})
+                return await response(scope, receive, send)
+            # Once the response has started it is streamed to the end
+            await task
+
 
 app = FastAPI(
     title="Stock Dashboard API",
     description="API for stock data and text summarization",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Added before CORS so deadline responses still carry CORS headers
+app.add_middleware(DeadlineMiddleware)
+
 # Enable CORS for Streamlit frontend
 app.add_middleware(
     CORSMiddleware,
@@ -25,18 +151,115 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Server-Timing", "X-Profile-Id"],
 )
 
 
+@app.middleware("http")
+async def profile_request(request: Request, call_next):
+    """
+    Profile a single request when it carries an X-Profile header or a
+    `profile` query parameter ("stages" or "cprofile"). Stage timings come
+    back in Server-Timing; the full profile is kept under X-Profile-Id.
+    """
+    mode = request.headers.get("x-profile") or request.query_params.get("profile")
+    if not mode or not profiling.PROFILING_ENABLED:
+        return await call_next(request)
+    profile = profiling.start(mode, f"{request.method} {request.url.path}?{request.url.query}")
+    try:
+        response = await call_next(request)
+    finally:
+        profiling.finish(profile)
+    response.headers["Server-Timing"] = profile.server_timing()
+    response.headers["X-Profile-Id"] = str(profile.id)
+    return response
+
+
+@app.exception_handler(DeadlineExceeded)
+async def deadline_exceeded(request: Request, exc: DeadlineExceeded):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
 class SummarizeRequest(BaseModel):
     text: str
     max_length: int = 150
     min_length: int = 50
 
 
+class BatchSummarizeRequest(BaseModel):
+    texts: List[str]
+    max_length: int = 150
+    min_length: int = 50
+
+
+class SentimentRequest(BaseModel):
+    texts: List[str]
+
+
+class PortfolioRiskRequest(BaseModel):
+    symbols: List[str]
+    period: str = "1y"
+    weights: Optional[List[float]] = None
+    benchmark: Optional[str] = "SPY"
+    risk_free_rate: float = 0.0
+    interval: str = "1d"
+
+
+class CorrelationRequest(BaseModel):
+    symbols: List[str]
+    period: str = "1y"
+    window: int = 60
+    interval: str = "1d"
+
+
+class BacktestRequest(BaseModel):
+    symbol: str
+    strategy: str
+    params: Dict[str, float]
+    period: str = "max"
+    cost_bps: float = 1.0
+
+
+class BacktestSweepRequest(BaseModel):
+    symbol: str
+    strategy: str
+    grid: Dict[str, List[float]]
+    period: str = "max"
+    cost_bps: float = 1.0
+    top: int = 20
+    sort_by: str = "sharpe"
+
+
+class ScreenerRequest(BaseModel):
+    filters: Dict[str, Dict[str, Optional[float]]] = {}
+    sort_by: Optional[str] = None
+    descending: bool = True
+    limit: int = 100
+
+
+class ExportRequest(BaseModel):
+    symbols: List[str]
+    format: str = "csv"
+    period: str = "max"
+    start: Optional[str] = None
+    end: Optional[str] = None
+    interval: str = "1d"
+
+
+class AlertRequest(BaseModel):
+    symbol: str
+    kind: str
+    value: float
+    reference: Optional[float] = None
+    note: str = ""
+
+
 class StockDataRequest(BaseModel):
     symbol: str
-    period: str
+    period: str = "1mo"
+    start: Optional[str] = None
+    end: Optional[str] = None
+    interval: str = "1d"
 
 
 @app.get("/")
@@ -55,42 +278,119 @@ async def summarize(request: SummarizeRequest):
     Summarize text using transformer model
     """
     try:
-        summary = summarize_text(
+        summary = await asyncio.to_thread(
+            summarize_text,
             request.text,
             request.max_length,
             request.min_length
         )
         return {"summary": summary}
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/stock-data")
-async def get_stock_data_endpoint(request: StockDataRequest):
+@app.post("/api/summarize/batch")
+async def summarize_batch_endpoint(request: BatchSummarizeRequest):
+    """
+    Summarize many texts, generating once per cluster of near-duplicate
+    texts (e.g. syndicated copies of one wire story)
+    """
+    try:
+        return await asyncio.to_thread(
+            summarize_batch,
+            request.texts,
+            request.max_length,
+            request.min_length
+        )
+    except DeadlineExceeded:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/api/sentiment")
+async def sentiment_endpoint(request: SentimentRequest):
     """
-    Get stock data for a given symbol and period
+    Score many texts (e.g. headlines) in one call. Results come back in input
+    order; texts seen before are answered from the content-hash cache.
     """
     try:
-        df = get_stock_data(request.symbol, request.period)
+        return await asyncio.to_thread(sentiment.score_sentiment, request.texts)
+    except DeadlineExceeded:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/api/sentiment/stats")
+async def sentiment_stats():
+    """
+    Sentiment cache size and hit counts
+    """
+    return sentiment.stats()
+
+
+@app.get("/api/profiles")
+async def list_profiles():
+    """
+    Recently profiled requests with their stage timings, newest first
+    """
+    return {"profiles": profiling.recent()}
+
+
+@app.get("/api/profiles/{profile_id}")
+async def get_profile(profile_id: int):
+    """
+    One stored profile, including its cProfile report when one was taken
+    """
+    profile = profiling.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"No stored profile {profile_id}")
+    return profile
+
+
+@app.get("/api/models/stats")
+async def model_stats():
+    """
+    Transformer pipelines resident in this process
+    """
+    return models.stats()
+
+
+def _load_stock_frame(symbol: str, period: str, start: Optional[str],
+                      end: Optional[str], interval: str, resolution: Optional[str] = None,
+                      width: int = 1000):
+    """
+    Fetch a symbol's series, mapping failures to HTTP errors.
+
+    Returns (DataFrame, bar interval); with a `resolution` the bars come
+    from the daily pyramid level it selects.
+    """
+    record_access(symbol)
+    try:
+        if resolution is not None:
+            if interval != "1d":
+                raise ValueError("resolution is only supported for daily data")
+            df, interval = get_stock_data_resolution(symbol, period, start, end, resolution, width)
+        else:
+            df = get_stock_data(symbol, period, start=start, end=end, interval=interval)
         
         if df is None or df.empty:
             raise HTTPException(
                 status_code=404, 
-                detail=f"No data available for symbol {request.symbol} for period {request.period}"
+                detail=f"No data available for symbol {symbol} for period {period}"
             )
-        
-        # Convert DataFrame to JSON-serializable format
-        # Convert datetime index to string for JSON serialization
-        df_dict = df.to_dict(orient="index")
-        data = {
-            "symbol": request.symbol,
-            "period": request.period,
-            "data": {str(k): v for k, v in df_dict.items()},
-            "columns": list(df.columns)
-        }
-        return data
+        return df, interval
     except HTTPException:
         raise
+    except DeadlineExceeded:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -100,35 +400,494 @@ async def get_stock_data_endpoint(request: StockDataRequest):
         raise HTTPException(status_code=500, detail=error_detail)
 
 
+def _frame_payload(df, symbol: str, period: str, start: Optional[str],
+                   end: Optional[str], interval: str, since: Optional[str] = None,
+                   resolution: Optional[str] = None, history: int = 0) -> dict:
+    """
+    Convert a series to the JSON response payload.
+
+    With `since`, only bars at or after that timestamp are included; "first"
+    and "rows" still describe the full series so clients can trim and check
+    the frame they merge the delta into. "history" is the store's version of
+    the settled bars: when it differs from the one a client merged into, bars
+    before `since` were revised and the client must reload the full series.
+    """
+    rows = len(df)
+    first = str(df.index[0])
+    if since is not None:
+        df = bars_since(df, since)
+
+    # Build the {timestamp: {column: value}} mapping straight from the
+    # column arrays, without to_dict's intermediate Timestamp-keyed dict
+    columns = list(df.columns)
+    values = zip(*(df[column].tolist() for column in columns))
+    # Vectorised formatting matches str(Timestamp) for tz-aware indexes; naive
+    # all-midnight indexes would lose their time part, so those use str()
+    tz = getattr(df.index, "tz", None)
+    keys = df.index.astype(str) if tz is not None else map(str, df.index)
+    data = dict(zip(keys, (dict(zip(columns, row)) for row in values)))
+    return {
+        "symbol": symbol,
+        "period": period,
+        "start": start,
+        "end": end,
+        "interval": interval,
+        "resolution": resolution,
+        "since": since,
+        "tz": str(tz) if tz is not None else None,
+        "first": first,
+        "rows": rows,
+        "history": history,
+        "data": data,
+        "columns": list(df.columns)
+    }
+
+
+def _stock_data_etag(df, symbol: str, period: str, start: Optional[str],
+                     end: Optional[str], interval: str, level: Optional[str] = None) -> str:
+    """
+    Strong validator for a response: the query, the stored data version and
+    the first/last bar timestamps of the slice (plus the pyramid level served)
+    """
+    version = store.data_version(symbol, interval)
+    key = f"{symbol.upper()}|{period}|{start}|{end}|{interval}|{level}|{version}|{df.index[0]}|{df.index[-1]}|{len(df)}"
+    return '"' + hashlib.sha1(key.encode()).hexdigest()[:20] + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def _stock_data_cache_control(interval: str) -> str:
+    # While the session is open the series changes once per store refresh;
+    # after the close it cannot change before the next open
+    ttl = store.INTRADAY_TTL_SECONDS if interval in store.INTRADAY_MINUTES else store.CACHE_TTL_SECONDS
+    return f"public, max-age={cache_max_age(ttl)}"
+
+
+@app.post("/api/stock-data")
+async def get_stock_data_endpoint(request: StockDataRequest):
+    """
+    Get stock data for a given symbol and period, or a start/end date range
+    """
+    df, _ = await asyncio.to_thread(
+        _load_stock_frame,
+        request.symbol,
+        request.period,
+        request.start,
+        request.end,
+        request.interval
+    )
+    return _frame_payload(
+        df,
+        request.symbol,
+        request.period,
+        request.start,
+        request.end,
+        request.interval,
+        history=store.history_version(request.symbol, request.interval)
+    )
+
+
 @app.get("/api/stock-data/{symbol}")
-async def get_stock_data_get(symbol: str, period: str = "1mo"):
+async def get_stock_data_get(
+    symbol: str,
+    request: Request,
+    response: Response,
+    period: str = "1mo",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    interval: str = "1d",
+    since: Optional[str] = None,
+    resolution: Optional[str] = None,
+    width: int = 1000
+):
     """
     Get stock data via GET request
+
+    Responses carry a strong ETag for the full series; sending it back in
+    If-None-Match returns 304 Not Modified while the series is unchanged.
+    Pass `since` (the client's last bar timestamp) to receive only that bar,
+    which may have been revised, and anything newer. A changed "history"
+    in the payload means older bars were revised too.
+
+    With `resolution` ("auto", "1d", "1wk", "1mo" or "3mo") daily history is
+    served from precomputed aggregates; "auto" picks the coarsest level that
+    still has a bar per pixel of a `width` pixel chart. The level served is
+    returned as `interval`.
     """
+    df, level = await asyncio.to_thread(
+        _load_stock_frame, symbol, period, start, end, interval, resolution, width
+    )
+
+    headers = {
+        "ETag": _stock_data_etag(df, symbol, period, start, end, interval, level),
+        "Cache-Control": _stock_data_cache_control(interval)
+    }
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
     try:
-        df = get_stock_data(symbol, period)
-        
-        if df is None or df.empty:
-            raise HTTPException(
-                status_code=404,
-                detail=f"No data available for symbol {symbol} for period {period}"
-            )
-        
-        df_dict = df.to_dict(orient="index")
-        data = {
-            "symbol": symbol,
-            "period": period,
-            "data": {str(k): v for k, v in df_dict.items()},
-            "columns": list(df.columns)
-        }
-        return data
-    except HTTPException:
+        with profiling.stage("serialize"):
+            payload = _frame_payload(df, symbol, period, start, end, level, since, resolution,
+                                     store.history_version(symbol, interval))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid since timestamp: {str(e)}")
+    response.headers.update(headers)
+    return payload
+
+
+@app.get("/api/symbols/search")
+async def symbol_search(q: str = "", limit: int = 10):
+    """
+    Tickers and company names starting with `q`, ticker matches first
+    """
+    # Waits in a worker thread if the directory is still being loaded
+    results = await asyncio.to_thread(search_symbols, q, limit)
+    return {"query": q, "results": results}
+
+
+@app.post("/api/export")
+async def export_endpoint(request: ExportRequest):
+    """
+    Stream the history of many symbols as CSV, NDJSON or Parquet.
+    Rows are encoded and sent chunk by chunk; symbols that cannot be loaded
+    are left out.
+    """
+    try:
+        stream = export_stream(
+            request.symbols,
+            request.format,
+            request.period,
+            request.start,
+            request.end,
+            request.interval
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return StreamingResponse(
+        stream,
+        media_type=MEDIA_TYPES[request.format],
+        headers={"Content-Disposition": f'attachment; filename="export.{request.format}"'}
+    )
+
+
+@app.post("/api/portfolio/risk")
+async def portfolio_risk_endpoint(request: PortfolioRiskRequest):
+    """
+    Returns, volatility, max drawdown, Sharpe/Sortino and beta for each symbol
+    and for the weighted portfolio
+    """
+    try:
+        return await asyncio.to_thread(
+            portfolio_risk,
+            request.symbols,
+            request.period,
+            request.weights,
+            request.benchmark,
+            request.risk_free_rate,
+            request.interval
+        )
+    except DeadlineExceeded:
         raise
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        import traceback
-        error_detail = f"Error fetching stock data: {str(e)}"
-        print(f"Stock data error: {traceback.format_exc()}")
-        raise HTTPException(status_code=500, detail=error_detail)
+        raise HTTPException(status_code=500, detail=f"Error computing portfolio risk: {str(e)}")
+
+
+@app.post("/api/correlation")
+async def correlation_endpoint(request: CorrelationRequest):
+    """
+    Full-period and rolling-window correlation and covariance matrices
+    """
+    try:
+        return await asyncio.to_thread(
+            correlation_matrices,
+            request.symbols,
+            request.period,
+            request.window,
+            request.interval
+        )
+    except DeadlineExceeded:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error computing correlations: {str(e)}")
+
+
+@app.post("/api/backtest")
+async def backtest_endpoint(request: BacktestRequest):
+    """
+    Run one strategy over a symbol's history; returns metrics and the equity
+    curve next to buy-and-hold
+    """
+    try:
+        return await asyncio.to_thread(
+            backtest,
+            request.symbol,
+            request.strategy,
+            request.params,
+            request.period,
+            request.cost_bps
+        )
+    except DeadlineExceeded:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running backtest: {str(e)}")
+
+
+@app.post("/api/backtest/sweep")
+async def backtest_sweep_endpoint(request: BacktestSweepRequest):
+    """
+    Evaluate every parameter combination of a grid and return the best `top`
+    """
+    try:
+        return await asyncio.to_thread(
+            sweep,
+            request.symbol,
+            request.strategy,
+            request.grid,
+            request.period,
+            request.cost_bps,
+            request.top,
+            request.sort_by
+        )
+    except DeadlineExceeded:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running sweep: {str(e)}")
+
+
+@app.post("/api/screener")
+async def screener_endpoint(request: ScreenerRequest):
+    """
+    Filter the precomputed per-symbol metrics, e.g.
+    {"filters": {"from_high": {"min": -0.05}, "volume_ratio": {"min": 2}}}
+    """
+    try:
+        # Workers other than the leader rebuild their rows from the shared store
+        if screener_index.needs_refresh():
+            await asyncio.to_thread(screener_index.refresh)
+        return screener_index.query(
+            request.filters,
+            request.sort_by,
+            request.descending,
+            request.limit
+        )
+    except DeadlineExceeded:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error running screener: {str(e)}")
+
+
+@app.get("/api/screener/stats")
+async def screener_stats():
+    """
+    Symbols indexed by the screener and its last refresh cycle
+    """
+    return screener_index.stats()
 
+
+@app.get("/api/anomalies/stats")
+async def anomaly_stats():
+    """
+    Series monitored for anomalies, bars scored and detector settings
+    """
+    return anomaly_monitor.stats()
+
+
+@app.get("/api/anomalies/{symbol}")
+async def anomalies(
+    symbol: str,
+    period: str = "1y",
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    interval: str = "1d"
+):
+    """
+    Volume spikes and opening price gaps flagged in the requested range.
+    The newest bar's events are marked provisional until a newer bar arrives.
+    """
+    record_access(symbol)
+    try:
+        return await asyncio.to_thread(detect_anomalies, symbol, period, start, end, interval)
+    except DeadlineExceeded:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error detecting anomalies: {str(e)}")
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """
+    Size of the stored series, including bytes per bar versus float64 frames
+    """
+    return store.stats()
+
+
+@app.get("/api/prefetch/stats")
+async def prefetch_stats():
+    """
+    Prefetch watchlist, last refresh cycle, whether this worker runs the
+    background jobs and per-symbol request counts
+    """
+    return {**prefetch_scheduler.stats(), "leader": leader.is_leader(), "access_counts": access_stats()}
+
+
+@app.get("/api/providers/stats")
+async def provider_stats():
+    """
+    yfinance hedge delay, hedges sent and won, and Alpha Vantage budget use
+    """
+    return hedged_fetcher.stats()
+
+
+@app.get("/api/quotes/stats")
+async def quote_stream_stats():
+    """
+    Symbols currently polled for live quotes and their subscriber counts
+    """
+    return quote_hub.stats()
+
+
+@app.post("/api/alerts")
+async def create_alert(request: AlertRequest):
+    """
+    Register a one-shot alert: price_above/price_below a price, or
+    pct_up/pct_down by a percentage from `reference` (default: latest quote).
+
+    The alert is checked against the latest quote straight away, so one
+    whose threshold is already crossed fires now rather than on the next
+    price change; "triggered" in the response says whether it did.
+    """
+    symbol = request.symbol.upper()
+    reference = request.reference
+    quote = quote_hub.snapshot(symbol)
+    try:
+        if request.kind.startswith("pct") and reference is None:
+            if quote is None:
+                quote = await asyncio.to_thread(get_latest_quote, symbol)
+            reference = quote["p"]
+        alert = alert_engine.add(symbol, request.kind, request.value, reference, request.note)
+    except DeadlineExceeded:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error creating alert: {str(e)}")
+    # Keep the symbol's quotes coming while the alert is armed
+    quote_hub.pin(symbol)
+    if quote is None:
+        try:
+            quote = await asyncio.to_thread(get_latest_quote, symbol)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            # The poller checks it once a quote arrives
+            print(f"No quote to check alert {alert['id']} on {symbol} against: {str(e)}")
+    triggered = False
+    if quote is not None:
+        _check_alerts(symbol, quote)
+        triggered = alert["id"] not in {a["id"] for a in alert_engine.alerts(symbol)}
+    return {**alert, "triggered": triggered}
+
+
+@app.get("/api/alerts")
+async def list_alerts(symbol: Optional[str] = None):
+    """
+    Armed alerts, optionally for one symbol
+    """
+    return {"alerts": alert_engine.alerts(symbol)}
+
+
+@app.delete("/api/alerts/{alert_id}")
+async def delete_alert(alert_id: int):
+    alert = alert_engine.remove(alert_id)
+    if alert is None:
+        raise HTTPException(status_code=404, detail=f"No armed alert {alert_id}")
+    quote_hub.unpin(alert["symbol"])
+    return alert
+
+
+@app.get("/api/alerts/triggered")
+async def triggered_alerts():
+    """
+    Recently triggered alerts, oldest first
+    """
+    return {"triggered": list(alert_engine.history)}
+
+
+@app.get("/api/alerts/stats")
+async def alert_stats():
+    return alert_engine.stats()
+
+
+@app.websocket("/ws/alerts")
+async def alert_stream(websocket: WebSocket):
+    """
+    Push every triggered alert as {"type": "alert", "symbol": ..., "price": ...}
+    """
+    await websocket.accept()
+    subscriber = Subscriber()
+    alert_engine.subscribers.add(subscriber)
+
+    async def send_frames():
+        while True:
+            await websocket.send_json(await subscriber.next_frame())
+
+    sender = asyncio.create_task(send_frames())
+    try:
+        while True:
+            # Nothing to receive; wait for the client to go away
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        alert_engine.subscribers.discard(subscriber)
+
+
+@app.websocket("/ws/quotes")
+async def quote_stream(websocket: WebSocket, symbols: str = ""):
+    """
+    Stream live quote deltas for a comma-separated list of symbols.
+
+    Frames look like {"type": "delta", "s": "AAPL", "t": 1700000000000, "p": 189.5}
+    and only carry the fields that changed. Clients may send
+    {"subscribe": [...]} or {"unsubscribe": [...]} to change their symbols.
+    """
+    await websocket.accept()
+    subscriber = Subscriber()
+    for symbol in filter(None, (s.strip() for s in symbols.split(","))):
+        quote_hub.subscribe(subscriber, symbol)
+
+    async def send_frames():
+        while True:
+            await websocket.send_json(await subscriber.next_frame())
+
+    sender = asyncio.create_task(send_frames())
+    try:
+        while True:
+            message = await websocket.receive_json()
+            for symbol in message.get("subscribe", []):
+                quote_hub.subscribe(subscriber, symbol)
+            for symbol in message.get("unsubscribe", []):
+                quote_hub.unsubscribe(subscriber, symbol)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sender.cancel()
+        quote_hub.unsubscribe(subscriber)
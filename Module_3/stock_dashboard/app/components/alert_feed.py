@@ -0,0 +1,49 @@
+"""
+Browser-side feed of triggered alerts.
+
+Connects to the API's alert WebSocket and lists each alert as it fires,
+newest first, without rerunning the page script.
+"""
+import json
+
+import streamlit.components.v1 as components
+
+_TEMPLATE = """
+<div id="status" style="font:12px sans-serif;color:#888;margin-bottom:6px;"></div>
+<ul id="feed" style="font:14px sans-serif;list-style:none;padding:0;margin:0;"></ul>
+<script>
+const cfg = __CONFIG__;
+const feed = document.getElementById("feed");
+const status = document.getElementById("status");
+
+function show(alert) {
+  const item = document.createElement("li");
+  item.style.cssText = "padding:6px 8px;margin-bottom:4px;border-radius:4px;" +
+    (alert.direction === "above" ? "background:#e8f5e9;" : "background:#ffebee;");
+  const when = new Date(alert.triggered_at * 1000).toLocaleTimeString();
+  item.textContent = "🔔 " + when + " · " + alert.symbol + " " +
+    (alert.direction === "above" ? "reached " : "fell to ") + alert.price +
+    " (threshold " + alert.threshold + ")" + (alert.note ? " · " + alert.note : "");
+  feed.prepend(item);
+  while (feed.children.length > cfg.maxItems) feed.lastChild.remove();
+}
+
+function connect() {
+  const ws = new WebSocket(cfg.wsUrl);
+  ws.onopen = () => { status.textContent = "Listening for alerts"; };
+  ws.onmessage = (event) => show(JSON.parse(event.data));
+  ws.onclose = () => {
+    status.textContent = "Disconnected, retrying...";
+    setTimeout(connect, 5000);
+  };
+}
+connect();
+</script>
+"""
+
+
+def render_alert_feed(ws_url: str, height: int = 300, max_items: int = 50):
+    """Live list of alerts pushed from `ws_url`"""
+    config = {"wsUrl": ws_url, "maxItems": max_items}
+    html = _TEMPLATE.replace("__CONFIG__", json.dumps(config))
+    components.html(html, height=height, scrolling=True)
@@ -0,0 +1,131 @@
+"""
+Browser-side live price chart.
+
+The chart is rendered once with Plotly.js inside a Streamlit HTML component
+and then patched in place from the API's quote WebSocket, so new prices show
+up without rerunning the page script.
+
+Each quote is assigned to the bar it belongs to: intraday quotes to their
+interval bucket, daily quotes to their exchange-local date, weekly ones to
+the Monday of their week and monthly ones to the first of their month. A
+quote in the chart's last bar patches it; a quote in a later bar appends a
+point labelled with that bar's start, like the seeded bars.
+"""
+import json
+
+import pandas as pd
+import streamlit.components.v1 as components
+
+from src.utils.market_hours import MARKET_TZ
+
+PLOTLY_JS_URL = "https://cdn.plot.ly/plotly-2.35.2.min.js"
+
+# Bucket width of intraday intervals; longer bars follow the calendar
+INTERVAL_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+}
+
+_TEMPLATE = """
+<div id="chart" style="width:100%;height:__HEIGHT__px;"></div>
+<div id="status" style="font:12px sans-serif;color:#888;"></div>
+<script src="__PLOTLY__"></script>
+<script>
+const cfg = __CONFIG__;
+const chart = document.getElementById("chart");
+const status = document.getElementById("status");
+let lastBar = cfg.x.length ? cfg.x[cfg.x.length - 1] : null;
+
+// Exchange-local wall clock, matching how the seeded points are labelled
+const fmt = new Intl.DateTimeFormat("sv-SE", {
+  timeZone: cfg.tz, year: "numeric", month: "2-digit", day: "2-digit",
+  hour: "2-digit", minute: "2-digit", second: "2-digit", hour12: false
+});
+const label = (t) => fmt.format(new Date(t)).replace(",", "");
+const parts = (t) => Object.fromEntries(fmt.formatToParts(new Date(t)).map((p) => [p.type, p.value]));
+
+// Label of the start of the bar containing t, comparable as a string
+function barStart(t) {
+  if (cfg.intervalMs) {
+    // Exchange zones are offset from UTC by whole hours, so UTC buckets line up
+    return label(Math.floor(t / cfg.intervalMs) * cfg.intervalMs);
+  }
+  const p = parts(t);
+  let day = p.year + "-" + p.month + "-" + p.day;
+  if (cfg.interval === "1mo") {
+    day = p.year + "-" + p.month + "-01";
+  } else if (cfg.interval === "1wk") {
+    const d = new Date(Date.UTC(Number(p.year), Number(p.month) - 1, Number(p.day)));
+    d.setUTCDate(d.getUTCDate() - (d.getUTCDay() + 6) % 7);
+    day = d.toISOString().slice(0, 10);
+  }
+  return day + " 00:00:00";
+}
+
+Plotly.newPlot(chart, [{
+  x: cfg.x, y: cfg.y, type: "scatter", mode: "lines",
+  name: "Close Price", line: {color: "#1f77b4"}
+}], {
+  title: cfg.symbol + " Stock Price (live)", template: "plotly_white",
+  hovermode: "x unified", margin: {t: 40, r: 10, b: 40, l: 50},
+  xaxis: {title: "Date"}, yaxis: {title: "Price (USD)"}
+}, {responsive: true});
+
+function applyQuote(frame) {
+  if (frame.s !== cfg.symbol || frame.p === undefined) return;
+  const bar = barStart(frame.t);
+  // A quote from before the last bar (e.g. a delayed snapshot) changes nothing
+  if (lastBar !== null && bar < lastBar) return;
+  if (bar === lastBar) {
+    // Still inside the current bar: patch its last point
+    const y = chart.data[0].y;
+    y[y.length - 1] = frame.p;
+    Plotly.restyle(chart, {y: [y]}, [0]);
+  } else {
+    Plotly.extendTraces(chart, {x: [[bar]], y: [[frame.p]]}, [0]);
+    lastBar = bar;
+  }
+  status.textContent = "Last " + frame.p + " at " + label(frame.t) +
+    (frame.v !== undefined ? " · volume " + frame.v.toLocaleString() : "");
+}
+
+function connect() {
+  const ws = new WebSocket(cfg.wsUrl);
+  ws.onopen = () => { status.textContent = "Live"; };
+  ws.onmessage = (event) => applyQuote(JSON.parse(event.data));
+  ws.onclose = () => {
+    status.textContent = "Disconnected, retrying...";
+    setTimeout(connect, 5000);
+  };
+}
+connect();
+</script>
+"""
+
+
+def render_live_chart(symbol: str, df: pd.DataFrame, ws_url: str,
+                      interval: str = "1d", height: int = 450):
+    """
+    Render a closing-price chart seeded with `df` that keeps itself up to
+    date from the quote stream at `ws_url`
+    """
+    index = pd.DatetimeIndex(df.index)
+    # Naive indexes are exchange-local
+    tz = str(index.tz) if index.tz is not None else MARKET_TZ
+    wall_clock = index.tz_localize(None) if index.tz is not None else index
+
+    config = {
+        "symbol": symbol.upper(),
+        "x": wall_clock.strftime("%Y-%m-%d %H:%M:%S").tolist(),
+        "y": df["Close"].round(4).tolist(),
+        "tz": tz,
+        "interval": interval,
+        "intervalMs": INTERVAL_MS.get(interval),
+        "wsUrl": ws_url,
+    }
+    html = (_TEMPLATE
+            .replace("__HEIGHT__", str(height))
+            .replace("__PLOTLY__", PLOTLY_JS_URL)
+            .replace("__CONFIG__", json.dumps(config)))
+    components.html(html, height=height + 30)
@@ -0,0 +1,199 @@
+"""
+Browser-side price and volume charts that keep themselves up to date.
+
+Both charts are rendered once with Plotly.js, seeded with the frame the page
+already loaded, and then poll the API's stock-data endpoint with the last
+bar's timestamp as `since` and the previous ETag as If-None-Match:
+
+- 304 Not Modified: nothing changed, the charts are left alone
+- a delta: the last bar is revised in place and newer bars are appended
+  with Plotly.extendTraces, dropping bars that rolled out of the period
+- a delta whose "history" version differs from the one the charts were
+  drawn from (older bars were revised, e.g. split or dividend adjusted), or
+  that no longer starts at the charts' last bar, reloads the full series
+
+The history version is seeded from the frame's attrs (set by api_client);
+without it the first delta reloads the full series to learn it.
+
+The next poll is scheduled from the response's Cache-Control max-age, which
+the API keeps short during the session and stretches to the next open while
+the market is closed.
+"""
+import json
+from typing import Optional
+
+import pandas as pd
+import streamlit.components.v1 as components
+
+from app.components.live_chart import PLOTLY_JS_URL
+
+# Shortest wait between polls, whatever the API's max-age
+MIN_POLL_SECONDS = 15
+
+_TEMPLATE = """
+<div id="price" style="width:100%;height:__HEIGHT__px;"></div>
+<div id="volume" style="width:100%;height:__VOLUME_HEIGHT__px;"></div>
+<div id="status" style="font:12px sans-serif;color:#888;"></div>
+<script src="__PLOTLY__"></script>
+<script>
+const cfg = __CONFIG__;
+const price = document.getElementById("price");
+const volume = document.getElementById("volume");
+const status = document.getElementById("status");
+const url = cfg.apiUrl + "/api/stock-data/" + encodeURIComponent(cfg.symbol);
+let lastKey = cfg.lastKey;
+let history = cfg.history;
+let etag = null;
+
+// Exchange-local wall clock, matching the other charts
+const label = (key) => key.slice(0, 19);
+const time = (key) => Date.parse(key.replace(" ", "T"));
+const layout = (title, yTitle) => ({
+  title: title, template: "plotly_white", hovermode: "x unified",
+  margin: {t: 40, r: 10, b: 40, l: 60}, xaxis: {title: "Date"}, yaxis: {title: yTitle}
+});
+
+Plotly.newPlot(price, [{
+  x: cfg.x, y: cfg.close, type: "scatter", mode: "lines",
+  name: "Close Price", line: {color: "#1f77b4"}
+}, ...cfg.priceMarkers], layout(cfg.symbol + " Stock Price", "Price (USD)"), {responsive: true});
+Plotly.newPlot(volume, [{
+  x: cfg.x, y: cfg.volume, type: "bar", name: "Volume"
+}, ...cfg.volumeMarkers], layout(cfg.symbol + " Trading Volume", "Volume"), {responsive: true});
+
+function patch(payload) {
+  // Revised older bars are not in the delta, only in the full series
+  if (history === null || payload.history !== history) return false;
+  const keys = Object.keys(payload.data).sort((a, b) => time(a) - time(b));
+  // The delta starts at our last bar unless the series shifted under us
+  if (!keys.length || time(keys[0]) !== time(lastKey)) return false;
+
+  const revised = payload.data[keys[0]];
+  const closes = price.data[0].y;
+  const volumes = volume.data[0].y;
+  const last = closes.length - 1;
+  if (closes[last] !== revised.Close || volumes[last] !== revised.Volume) {
+    closes[last] = revised.Close;
+    volumes[last] = revised.Volume;
+    Plotly.restyle(price, {y: [closes]}, [0]);
+    Plotly.restyle(volume, {y: [volumes]}, [0]);
+  }
+
+  const added = keys.slice(1);
+  if (added.length) {
+    const x = added.map(label);
+    Plotly.extendTraces(price, {x: [x], y: [added.map((k) => payload.data[k].Close)]}, [0], payload.rows);
+    Plotly.extendTraces(volume, {x: [x], y: [added.map((k) => payload.data[k].Volume)]}, [0], payload.rows);
+    lastKey = added[added.length - 1];
+  }
+  return true;
+}
+
+async function reload() {
+  const response = await fetch(url + "?" + new URLSearchParams({period: cfg.period, interval: cfg.interval}),
+                               {cache: "no-store"});
+  if (!response.ok) throw new Error("HTTP " + response.status);
+  const payload = await response.json();
+  const keys = Object.keys(payload.data).sort((a, b) => time(a) - time(b));
+  const x = keys.map(label);
+  await Plotly.react(price, [{...price.data[0], x: x, y: keys.map((k) => payload.data[k].Close)},
+                             ...price.data.slice(1)], price.layout);
+  await Plotly.react(volume, [{...volume.data[0], x: x, y: keys.map((k) => payload.data[k].Volume)},
+                              ...volume.data.slice(1)], volume.layout);
+  lastKey = keys[keys.length - 1];
+  history = payload.history;
+  return response;
+}
+
+function nextDelay(response) {
+  const maxAge = /max-age=(\\d+)/.exec(response.headers.get("Cache-Control") || "");
+  return Math.max(maxAge ? Number(maxAge[1]) : 0, cfg.minPollSeconds) * 1000;
+}
+
+async function poll() {
+  let delay = cfg.minPollSeconds * 1000;
+  try {
+    const params = new URLSearchParams({period: cfg.period, interval: cfg.interval, since: lastKey});
+    let response = await fetch(url + "?" + params, {
+      headers: etag ? {"If-None-Match": etag} : {}, cache: "no-store"
+    });
+    const checked = new Date().toLocaleTimeString();
+    if (response.status === 304) {
+      status.textContent = "No new data · checked " + checked;
+    } else if (!response.ok) {
+      throw new Error("HTTP " + response.status);
+    } else {
+      if (!patch(await response.json())) response = await reload();
+      status.textContent = "Updated " + checked + " · last bar " + label(lastKey);
+    }
+    etag = response.headers.get("ETag") || etag;
+    delay = nextDelay(response);
+    status.textContent += " · next check in " + Math.round(delay / 1000) + "s";
+  } catch (error) {
+    status.textContent = "Refresh failed: " + error.message + ", retrying...";
+  }
+  setTimeout(poll, delay);
+}
+
+setTimeout(poll, cfg.minPollSeconds * 1000);
+</script>
+"""
+
+
+def _markers(events: pd.DataFrame, kind: str, y: str, name: str, symbol: str, color: str) -> dict:
+    """Plotly.js marker trace for one kind of flagged event"""
+    rows = events[events["kind"] == kind]
+    times = pd.DatetimeIndex(rows["t"])
+    if times.tz is not None:
+        times = times.tz_localize(None)
+    return {
+        "x": times.strftime("%Y-%m-%d %H:%M:%S").tolist(),
+        "y": rows[y].tolist(),
+        "type": "scatter",
+        "mode": "markers",
+        "name": name,
+        "marker": {"symbol": symbol, "size": 11, "color": color},
+        "customdata": rows["z"].tolist(),
+        "hovertemplate": "%{x}<br>z = %{customdata}<extra>" + name + "</extra>",
+    }
+
+
+def render_refresh_chart(symbol: str, df: pd.DataFrame, api_url: str, period: str,
+                         interval: str = "1d", events: Optional[pd.DataFrame] = None,
+                         height: int = 450, volume_height: int = 350):
+    """
+    Render price and volume charts seeded with `df` that poll the API for
+    changes and patch themselves in place. Anomaly `events` are drawn as
+    markers as of render time.
+    """
+    index = pd.DatetimeIndex(df.index)
+    wall_clock = index.tz_localize(None) if index.tz is not None else index
+    has_events = events is not None and not events.empty
+
+    config = {
+        "symbol": symbol.upper(),
+        "period": period,
+        "interval": interval,
+        "apiUrl": api_url.rstrip("/"),
+        "x": wall_clock.strftime("%Y-%m-%d %H:%M:%S").tolist(),
+        "close": df["Close"].round(4).tolist(),
+        "volume": df["Volume"].tolist(),
+        # Same form as the API's timestamp keys, so it can be sent as `since`
+        "lastKey": str(index[-1]),
+        # History version the frame was served at, if it came from the API
+        "history": df.attrs.get("history"),
+        "minPollSeconds": MIN_POLL_SECONDS,
+        "priceMarkers": [
+            _markers(events, "gap_up", "close", "Gap up", "triangle-up", "#2ca02c"),
+            _markers(events, "gap_down", "close", "Gap down", "triangle-down", "#d62728"),
+        ] if has_events else [],
+        "volumeMarkers": [
+            _markers(events, "volume_spike", "volume", "Volume spike", "star", "#ff7f0e"),
+        ] if has_events else [],
+    }
+    html = (_TEMPLATE
+            .replace("__HEIGHT__", str(height))
+            .replace("__VOLUME_HEIGHT__", str(volume_height))
+            .replace("__PLOTLY__", PLOTLY_JS_URL)
+            .replace("__CONFIG__", json.dumps(config)))
+    components.html(html, height=height + volume_height + 30)
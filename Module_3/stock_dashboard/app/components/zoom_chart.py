@@ -0,0 +1,96 @@
+"""
+Browser-side price chart that refetches at the right resolution on zoom.
+
+The chart asks the API for daily history with resolution=auto and the
+chart's pixel width, so a decades-long range arrives as weekly or monthly
+bars. Each Plotly relayout (zoom, pan, reset) fetches only the visible
+window at the level the API picks for it and swaps the trace in place.
+"""
+import json
+
+import streamlit.components.v1 as components
+
+from app.components.live_chart import PLOTLY_JS_URL
+
+_TEMPLATE = """
+<div id="chart" style="width:100%;height:__HEIGHT__px;"></div>
+<div id="status" style="font:12px sans-serif;color:#888;"></div>
+<script src="__PLOTLY__"></script>
+<script>
+const cfg = __CONFIG__;
+const chart = document.getElementById("chart");
+const status = document.getElementById("status");
+let pending = null;
+let timer = null;
+
+Plotly.newPlot(chart, [{
+  x: [], y: [], type: "scatter", mode: "lines",
+  name: "Close Price", line: {color: "#1f77b4"}
+}], {
+  title: cfg.symbol + " Stock Price", template: "plotly_white",
+  hovermode: "x unified", margin: {t: 40, r: 10, b: 40, l: 50},
+  xaxis: {title: "Date"}, yaxis: {title: "Price (USD)", autorange: true}
+}, {responsive: true});
+
+async function load(start, end) {
+  const params = new URLSearchParams({
+    period: cfg.period, resolution: "auto", width: String(chart.clientWidth || 800)
+  });
+  if (start) params.set("start", start.slice(0, 10));
+  if (end) params.set("end", end.slice(0, 10));
+  if (pending) pending.abort();
+  pending = new AbortController();
+  try {
+    const response = await fetch(
+      cfg.apiUrl + "/api/stock-data/" + encodeURIComponent(cfg.symbol) + "?" + params,
+      {signal: pending.signal}
+    );
+    if (!response.ok) throw new Error("HTTP " + response.status);
+    const payload = await response.json();
+    const keys = Object.keys(payload.data);
+    // Exchange-local wall clock, matching the other charts
+    const x = keys.map((k) => k.slice(0, 19));
+    const y = keys.map((k) => payload.data[k].Close);
+    const layout = {...chart.layout, yaxis: {...chart.layout.yaxis, autorange: true}};
+    if (start && end) layout.xaxis = {...chart.layout.xaxis, range: [start, end], autorange: false};
+    await Plotly.react(chart, [{...chart.data[0], x: x, y: y}], layout);
+    status.textContent = payload.interval + " bars · " + keys.length + " points";
+  } catch (error) {
+    if (error.name !== "AbortError") status.textContent = "Could not load data: " + error.message;
+  }
+}
+
+chart.on("plotly_relayout", (event) => {
+  let start = null, end = null;
+  if (event["xaxis.range[0]"] !== undefined) {
+    start = event["xaxis.range[0]"];
+    end = event["xaxis.range[1]"];
+  } else if (Array.isArray(event["xaxis.range"])) {
+    [start, end] = event["xaxis.range"];
+  } else if (!event["xaxis.autorange"]) {
+    return;
+  }
+  clearTimeout(timer);
+  timer = setTimeout(() => load(start, end), 250);
+});
+
+load(null, null);
+</script>
+"""
+
+
+def render_zoom_chart(symbol: str, api_url: str, period: str = "max", height: int = 450):
+    """
+    Render a closing-price chart for `period` whose zoom and pan reload the
+    visible window from the API at a resolution matching the chart width
+    """
+    config = {
+        "symbol": symbol.upper(),
+        "period": period,
+        "apiUrl": api_url.rstrip("/"),
+    }
+    html = (_TEMPLATE
+            .replace("__HEIGHT__", str(height))
+            .replace("__PLOTLY__", PLOTLY_JS_URL)
+            .replace("__CONFIG__", json.dumps(config)))
+    components.html(html, height=height + 30)
@@ -20,4 +20,8 @@ Welcome to the Stock Market Analysis Dashboard!
 Use the sidebar to navigate between:
 - Stock Visualization: View and analyze stock price trends
 - Text Summarization: Summarize stock-related articles or text
+- Correlation: Correlation and covariance heatmaps across many tickers
+- Backtesting: Test trading strategies and sweep their parameters
+- Screener: Filter a large symbol universe by price, volume and RSI criteria
+- Alerts: Get notified when a price or percent move is reached
 """)
\ No newline at end of file
@@ -0,0 +1,73 @@
+import streamlit as st
+import pandas as pd
+import sys
+import os
+
+# Add project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(project_root)
+
+from src.utils.api_client import USE_API, alert_stream_url, create_alert, delete_alert, list_alerts
+from src.data.watchlist import DEFAULT_SYMBOLS
+from app.components.alert_feed import render_alert_feed
+
+st.title("Price Alerts")
+
+if not USE_API:
+    st.info("Alerts are checked by the API against its live quote stream. Set USE_API=true and start the FastAPI backend to use them.")
+    st.stop()
+
+KINDS = {
+    "Price rises to": "price_above",
+    "Price falls to": "price_below",
+    "Rises by %": "pct_up",
+    "Falls by %": "pct_down",
+}
+
+# New alert form
+with st.form("new_alert", clear_on_submit=True):
+    col1, col2, col3 = st.columns(3)
+    symbol = col1.selectbox("Symbol", DEFAULT_SYMBOLS)
+    custom = col1.text_input("Or another ticker", "")
+    kind_label = col2.selectbox("Condition", list(KINDS))
+    value = col3.number_input("Price or percent", min_value=0.01, value=5.0, step=0.5)
+    note = st.text_input("Note (optional)", "")
+    if st.form_submit_button("Add alert"):
+        try:
+            alert = create_alert(custom.strip().upper() or symbol, KINDS[kind_label], value, note=note)
+            st.success(f"Alert {alert['id']} armed: {alert['symbol']} {alert['direction']} {alert['threshold']}")
+        except Exception as e:
+            st.error(f"❌ Error creating alert: {str(e)}")
+
+st.subheader("Triggered")
+render_alert_feed(alert_stream_url())
+
+try:
+    data = list_alerts()
+except Exception as e:
+    st.error(f"❌ Error loading alerts: {str(e)}")
+    st.stop()
+
+st.subheader("Armed alerts")
+if not data["alerts"]:
+    st.caption("No armed alerts")
+for alert in sorted(data["alerts"], key=lambda a: (a["symbol"], a["threshold"])):
+    col1, col2 = st.columns([5, 1])
+    col1.write(
+        f"**{alert['symbol']}** {alert['direction']} {alert['threshold']}"
+        + (f" ({alert['kind']} {alert['value']}% from {alert['reference']})" if alert["kind"].startswith("pct") else "")
+        + (f" · {alert['note']}" if alert["note"] else "")
+    )
+    if col2.button("Remove", key=f"remove_{alert['id']}"):
+        delete_alert(alert["id"])
+        st.rerun()
+
+if data["triggered"]:
+    st.subheader("History")
+    history = pd.DataFrame(data["triggered"])
+    history["triggered_at"] = pd.to_datetime(history["triggered_at"], unit="s")
+    st.dataframe(
+        history[["triggered_at", "symbol", "direction", "threshold", "price", "note"]].iloc[::-1],
+        use_container_width=True,
+        hide_index=True
+    )
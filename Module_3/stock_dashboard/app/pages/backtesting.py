@@ -0,0 +1,137 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import sys
+import os
+
+# Add project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(project_root)
+
+from src.utils.api_client import run_backtest, run_backtest_sweep
+from src.data.watchlist import DEFAULT_SYMBOLS
+
+st.title("Strategy Backtesting")
+
+STRATEGIES = {
+    "MA Crossover": "ma_crossover",
+    "RSI": "rsi",
+    "Breakout": "breakout",
+}
+
+@st.cache_data(ttl=300)  # Cache for 5 minutes
+def load_backtest(symbol, strategy, params, period, cost_bps):
+    return run_backtest(symbol, strategy, dict(params), period, cost_bps)
+
+@st.cache_data(ttl=300)
+def load_sweep(symbol, strategy, grid, period, cost_bps, top, sort_by):
+    grid = {name: list(values) for name, values in grid}
+    return run_backtest_sweep(symbol, strategy, grid, period, cost_bps, top, sort_by)
+
+def value_range(label, low, high, default, step=1):
+    lo, hi = st.sidebar.slider(label, low, high, default)
+    return [float(v) for v in range(lo, hi + 1, step)]
+
+# Sidebar controls
+st.sidebar.header("Strategy")
+symbol = st.sidebar.selectbox("Select Stock Symbol", DEFAULT_SYMBOLS)
+period = st.sidebar.selectbox("Select Period", ["1y", "2y", "5y", "10y", "max"], index=4)
+strategy_label = st.sidebar.selectbox("Strategy", list(STRATEGIES))
+strategy = STRATEGIES[strategy_label]
+cost_bps = st.sidebar.number_input("Cost per trade (bps)", 0.0, 100.0, 1.0, 0.5)
+
+tab_single, tab_sweep = st.tabs(["Single run", "Parameter sweep"])
+
+with tab_single:
+    if strategy == "ma_crossover":
+        col1, col2 = st.columns(2)
+        params = {
+            "fast": col1.number_input("Fast MA", 1, 200, 20),
+            "slow": col2.number_input("Slow MA", 2, 400, 50),
+        }
+    elif strategy == "rsi":
+        col1, col2, col3 = st.columns(3)
+        params = {
+            "period": col1.number_input("RSI period", 2, 100, 14),
+            "lower": col2.number_input("Buy below", 1, 99, 30),
+            "upper": col3.number_input("Sell above", 1, 99, 70),
+        }
+    else:
+        col1, col2 = st.columns(2)
+        params = {
+            "lookback": col1.number_input("Entry lookback", 1, 400, 55),
+            "exit_lookback": col2.number_input("Exit lookback", 1, 400, 20),
+        }
+
+    try:
+        with st.spinner("Running backtest..."):
+            result = load_backtest(symbol, strategy, tuple(params.items()), period, cost_bps)
+    except Exception as e:
+        st.error(f"❌ Error running backtest: {str(e)}")
+    else:
+        equity = result["equity"]
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=equity["dates"], y=equity["strategy"], name=strategy_label))
+        fig.add_trace(go.Scatter(x=equity["dates"], y=equity["buy_and_hold"], name="Buy & Hold"))
+        fig.update_layout(
+            title=f"{symbol} equity curve",
+            yaxis_title="Growth of $1",
+            template="plotly_white"
+        )
+        st.plotly_chart(fig, use_container_width=True)
+
+        metrics = pd.DataFrame(
+            {strategy_label: result["metrics"], "Buy & Hold": result["buy_and_hold"]}
+        )
+        st.dataframe(metrics, use_container_width=True)
+
+with tab_sweep:
+    st.sidebar.header("Sweep grid")
+    if strategy == "ma_crossover":
+        grid = {
+            "fast": value_range("Fast MA range", 2, 100, (5, 50)),
+            "slow": value_range("Slow MA range", 10, 300, (20, 200), step=5),
+        }
+    elif strategy == "rsi":
+        grid = {
+            "period": value_range("RSI period range", 2, 50, (5, 30)),
+            "lower": value_range("Buy-below range", 5, 50, (20, 40), step=5),
+            "upper": value_range("Sell-above range", 50, 95, (60, 80), step=5),
+        }
+    else:
+        grid = {
+            "lookback": value_range("Entry lookback range", 5, 300, (10, 120), step=5),
+            "exit_lookback": value_range("Exit lookback range", 5, 200, (5, 60), step=5),
+        }
+    sort_by = st.selectbox("Rank by", ["sharpe", "total_return", "annual_return", "max_drawdown"])
+    top = st.slider("Results to show", 5, 200, 20)
+
+    if st.button("Run sweep"):
+        try:
+            with st.spinner("Sweeping parameters..."):
+                result = load_sweep(
+                    symbol, strategy,
+                    tuple((name, tuple(values)) for name, values in grid.items()),
+                    period, cost_bps, top, sort_by
+                )
+        except Exception as e:
+            st.error(f"❌ Error running sweep: {str(e)}")
+        else:
+            st.caption(
+                f"{result['combos']} combinations over {result['bars']} bars in "
+                f"{result['seconds']}s on {result['workers']} worker(s)"
+            )
+            results = pd.DataFrame(result["results"])
+            st.dataframe(results, use_container_width=True)
+
+            if strategy == "ma_crossover" and len(results) > 1:
+                pivot = results.pivot_table(index="fast", columns="slow", values=sort_by)
+                fig = px.imshow(
+                    pivot.astype(float),
+                    color_continuous_scale="RdYlGn",
+                    aspect="auto",
+                    labels={"color": sort_by}
+                )
+                fig.update_layout(title=f"{sort_by} of the top combinations", template="plotly_white")
+                st.plotly_chart(fig, use_container_width=True)
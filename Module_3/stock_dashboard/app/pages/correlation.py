@@ -0,0 +1,70 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import sys
+import os
+
+# Add project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(project_root)
+
+from src.utils.api_client import get_correlation
+from src.data.watchlist import DEFAULT_SYMBOLS
+
+st.title("Correlation Matrix")
+
+@st.cache_data(ttl=300)  # Cache for 5 minutes
+def load_correlation(symbols, period, window):
+    return get_correlation(list(symbols), period, window)
+
+# Sidebar controls
+st.sidebar.header("Universe")
+symbols = st.sidebar.multiselect(
+    "Select Stock Symbols",
+    options=DEFAULT_SYMBOLS,
+    default=DEFAULT_SYMBOLS
+)
+extra = st.sidebar.text_input("Additional symbols (comma-separated)", "")
+symbols = list(dict.fromkeys(symbols + [s.strip().upper() for s in extra.split(",") if s.strip()]))
+
+period = st.sidebar.selectbox("Select Period", ["3mo", "6mo", "1y", "ytd", "max"], index=2)
+window = st.sidebar.slider("Rolling window (bars)", 10, 250, 60)
+measure = st.sidebar.radio("Matrix", ["Correlation", "Covariance"])
+
+if len(symbols) < 2:
+    st.info("Select at least two symbols")
+    st.stop()
+
+try:
+    with st.spinner("Computing matrices..."):
+        result = load_correlation(tuple(symbols), period, window)
+except Exception as e:
+    st.error(f"❌ Error computing correlations: {str(e)}")
+    st.stop()
+
+key = measure.lower()
+labels = result["symbols"]
+
+def heatmap(matrix, title):
+    df = pd.DataFrame(matrix, index=labels, columns=labels, dtype=float)
+    if key == "correlation":
+        fig = px.imshow(df, zmin=-1, zmax=1, color_continuous_scale="RdBu_r", aspect="auto")
+    else:
+        fig = px.imshow(df, color_continuous_scale="Viridis", aspect="auto")
+    fig.update_layout(title=title, template="plotly_white")
+    return fig
+
+col1, col2 = st.columns(2)
+with col1:
+    st.plotly_chart(
+        heatmap(result["full"][key], f"Full period ({result['start']} to {result['end']})"),
+        use_container_width=True
+    )
+with col2:
+    rolling = result["rolling"]
+    st.plotly_chart(
+        heatmap(rolling[key], f"Last {window} bars ({rolling['start']} to {rolling['end']})"),
+        use_container_width=True
+    )
+
+st.caption(f"{result['bars']} aligned bars across {len(labels)} symbols")
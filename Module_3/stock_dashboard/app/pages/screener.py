@@ -0,0 +1,88 @@
+import streamlit as st
+import pandas as pd
+import sys
+import os
+
+# Add project root directory to sys.path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+sys.path.append(project_root)
+
+from src.utils.api_client import run_screener
+
+st.title("Stock Screener")
+
+SORT_OPTIONS = {
+    "Volume spike": "volume_ratio",
+    "Closest to 52-week high": "from_high",
+    "1-day change": "change",
+    "1-month return": "return_1m",
+    "RSI": "rsi",
+}
+
+@st.cache_data(ttl=60)  # Metrics refresh in the background every few minutes
+def load_screen(filters, sort_by, descending, limit):
+    filters = {name: dict(bounds) for name, bounds in filters}
+    return run_screener(filters, sort_by, descending, limit)
+
+# Sidebar controls
+st.sidebar.header("Criteria")
+filters = {}
+
+if st.sidebar.checkbox("Near 52-week high", value=True):
+    within = st.sidebar.slider("Within % of the 52-week high", 1, 50, 5)
+    filters["from_high"] = {"min": -within / 100}
+
+if st.sidebar.checkbox("Volume spike"):
+    ratio = st.sidebar.slider("Volume vs 20-day average (x)", 1.0, 10.0, 2.0, 0.5)
+    filters["volume_ratio"] = {"min": ratio}
+
+if st.sidebar.checkbox("RSI band"):
+    low, high = st.sidebar.slider("RSI (14)", 0, 100, (30, 70))
+    filters["rsi"] = {"min": low, "max": high}
+
+min_price = st.sidebar.number_input("Minimum price", 0.0, 10000.0, 5.0)
+if min_price > 0:
+    filters["close"] = {"min": min_price}
+
+sort_label = st.sidebar.selectbox("Sort by", list(SORT_OPTIONS))
+descending = st.sidebar.checkbox("Descending", value=True)
+limit = st.sidebar.slider("Results", 10, 500, 100, 10)
+
+try:
+    with st.spinner("Screening..."):
+        result = load_screen(
+            tuple((name, tuple(bounds.items())) for name, bounds in filters.items()),
+            SORT_OPTIONS[sort_label],
+            descending,
+            limit
+        )
+except Exception as e:
+    st.error(f"❌ Error running screener: {str(e)}")
+    st.stop()
+
+st.caption(
+    f"{result['matches']} of {result['universe']} symbols match "
+    f"(query took {result['query_ms']} ms)"
+)
+
+if not result["universe"]:
+    st.info("The screener index is still being built, check back in a minute")
+    st.stop()
+
+if not result["results"]:
+    st.info("No symbols match these criteria")
+    st.stop()
+
+df = pd.DataFrame(result["results"]).set_index("symbol")
+for column in ["change", "return_1m", "from_high", "from_low"]:
+    df[column] = df[column] * 100
+st.dataframe(
+    df.rename(columns={
+        "change": "Change %",
+        "return_1m": "1M %",
+        "from_high": "From 52W High %",
+        "from_low": "From 52W Low %",
+        "volume_ratio": "Volume x Avg",
+    }).round(2),
+    use_container_width=True
+)
@@ -12,37 +12,134 @@ sys.path.append(project_root)
 print(f"Project root (stock_visualization.py): {project_root}")
 print(f"sys.path (stock_visualization.py): {sys.path}")
 
-from src.utils.api_client import get_stock_data
+from src.utils.api_client import PUBLIC_API_URL, USE_API, get_anomalies, get_stock_data, quote_stream_url, search_symbols
+from src.data.watchlist import DEFAULT_SYMBOLS
+from app.components.live_chart import render_live_chart
+from app.components.refresh_chart import render_refresh_chart
+from app.components.zoom_chart import render_zoom_chart
 
 st.title("Stock Price Visualization")
 
+INTRADAY_INTERVALS = ["1m", "5m", "15m"]
+
 @st.cache_data(ttl=300)  # Cache for 5 minutes
-def load_stock_data(symbol, period):
+def load_stock_data(symbol, period, interval="1d"):
     try:
-        return get_stock_data(symbol, period)
+        return get_stock_data(symbol, period, interval=interval)
     except Exception as e:
         # Re-raise with more context
         raise Exception(f"Failed to load data for {symbol}: {str(e)}")
 
+@st.cache_data(ttl=60)  # Intraday bars change every minute
+def load_intraday_data(symbol, period, interval):
+    try:
+        return get_stock_data(symbol, period, interval=interval)
+    except Exception as e:
+        raise Exception(f"Failed to load {interval} data for {symbol}: {str(e)}")
+
+@st.cache_data(ttl=60)
+def load_anomalies(symbol, period, interval):
+    payload = get_anomalies(symbol, period, interval=interval)
+    events = pd.DataFrame(payload["events"])
+    if events.empty:
+        return events
+    if payload.get("tz"):
+        events["t"] = pd.to_datetime(events["t"], utc=True).dt.tz_convert(payload["tz"])
+    else:
+        events["t"] = pd.to_datetime(events["t"])
+    return events
+
+def anomaly_markers(events, kind, y, name, symbol, color):
+    """Marker trace for one kind of flagged event"""
+    rows = events[events["kind"] == kind]
+    return go.Scatter(
+        x=rows["t"],
+        y=rows[y],
+        mode="markers",
+        name=name,
+        marker=dict(symbol=symbol, size=11, color=color),
+        customdata=rows["z"],
+        hovertemplate="%{x}<br>z = %{customdata}<extra>" + name + "</extra>"
+    )
+
+@st.cache_data(ttl=3600)
+def find_symbols(query):
+    return search_symbols(query, 20)
+
 # Sidebar controls
 st.sidebar.header("Stock Selection")
-available_symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "NFLX"]  # You can add more
+query = st.sidebar.text_input("Search ticker or company", "")
+try:
+    matches = find_symbols(query) if query.strip() else []
+except Exception as e:
+    matches = []
+    st.sidebar.warning(f"Symbol search unavailable: {str(e)}")
+if query.strip() and not matches:
+    st.sidebar.caption("No matching symbols")
+
+# Keep the current selection selectable while the search results change
+selected = st.session_state.get("selected_symbols", ["AAPL"])
+available_symbols = list(dict.fromkeys(selected + [m["symbol"] for m in matches] + list(DEFAULT_SYMBOLS)))
+labels = {m["symbol"]: f"{m['symbol']} - {m['name']}" if m["name"] else m["symbol"] for m in matches}
 symbols = st.sidebar.multiselect(
     "Select Stock Symbols",
     options=available_symbols,
-    default=["AAPL"]
+    default=selected,
+    format_func=lambda s: labels.get(s, s),
+    key="selected_symbols"
 )
 
+interval_options = ["1d", "1wk", "1mo"] + INTRADAY_INTERVALS
+interval = st.sidebar.selectbox("Select Interval", interval_options, index=0)
+
 # Period options that work reliably with yfinance
-period_options = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "ytd", "max"]
-period = st.sidebar.selectbox("Select Period", period_options, index=2)  # Default to 1mo
+if interval in INTRADAY_INTERVALS:
+    # Intraday bars are only retained for the last few sessions
+    period_options = ["1d", "5d"]
+    period = st.sidebar.selectbox("Select Period", period_options, index=0)
+else:
+    period_options = ["1d", "5d", "1mo", "3mo", "6mo", "1y", "ytd", "max"]
+    period = st.sidebar.selectbox("Select Period", period_options, index=2)  # Default to 1mo
+
+# Live mode streams quotes from the API and patches the chart in the browser
+live_mode = st.sidebar.toggle(
+    "Live mode",
+    value=False,
+    help="Stream live prices from the API over WebSocket (requires the FastAPI backend)"
+)
+
+# Zooming reloads only the visible window, at a resolution matching the chart width
+adaptive_zoom = st.sidebar.toggle(
+    "Adaptive zoom",
+    value=False,
+    disabled=not USE_API or interval != "1d" or live_mode,
+    help="Load weekly/monthly aggregates for long ranges and finer bars as you zoom in (daily interval, requires the FastAPI backend)"
+)
+
+# Poll for new bars and patch the charts in place instead of rerunning the page
+auto_refresh = st.sidebar.toggle(
+    "Auto-refresh",
+    value=False,
+    disabled=not USE_API or live_mode or adaptive_zoom,
+    help="Check the API for new bars, often while the market is open and rarely while it is closed, and update the charts in place (requires the FastAPI backend)"
+)
+
+# Volume spikes and price gaps flagged by the online anomaly detector
+show_anomalies = st.sidebar.toggle(
+    "Flag anomalies",
+    value=True,
+    help="Mark unusual volume spikes and opening price gaps on the charts"
+)
 
 # Iterate over each symbol and render the section
 for symbol in symbols:
     st.subheader(f"{symbol} Stock Visualization")
 
     try:
-        df = load_stock_data(symbol, period)
+        if interval in INTRADAY_INTERVALS:
+            df = load_intraday_data(symbol, period, interval)
+        else:
+            df = load_stock_data(symbol, period, interval)
 
         if df is None or df.empty:
             st.warning(f"No data found for {symbol}")
@@ -61,25 +158,47 @@ for symbol in symbols:
         with col3:
             st.metric("Change %", f"{price_change_pct:.2f}%")
 
+        events = pd.DataFrame()
+        if show_anomalies:
+            try:
+                events = load_anomalies(symbol, period, interval)
+            except Exception as e:
+                st.caption(f"Anomaly flags unavailable: {str(e)}")
+
+        if auto_refresh and USE_API and not live_mode and not adaptive_zoom:
+            # Price and volume charts update themselves in the browser
+            render_refresh_chart(symbol, df, PUBLIC_API_URL, period, interval=interval, events=events)
+            continue
+
         # Price chart
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(
-            x=df.index,
-            y=df['Close'],
-            name='Close Price',
-            line=dict(color='#1f77b4')
-        ))
-        fig.update_layout(
-            title=f"{symbol} Stock Price",
-            xaxis_title="Date",
-            yaxis_title="Price (USD)",
-            template="plotly_white",
-            hovermode="x unified"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        if live_mode:
+            render_live_chart(symbol, df, quote_stream_url([symbol]), interval=interval)
+        elif adaptive_zoom and USE_API and interval == "1d":
+            render_zoom_chart(symbol, PUBLIC_API_URL, period=period)
+        else:
+            fig = go.Figure()
+            fig.add_trace(go.Scatter(
+                x=df.index,
+                y=df['Close'],
+                name='Close Price',
+                line=dict(color='#1f77b4')
+            ))
+            if not events.empty:
+                fig.add_trace(anomaly_markers(events, "gap_up", "close", "Gap up", "triangle-up", "#2ca02c"))
+                fig.add_trace(anomaly_markers(events, "gap_down", "close", "Gap down", "triangle-down", "#d62728"))
+            fig.update_layout(
+                title=f"{symbol} Stock Price",
+                xaxis_title="Date",
+                yaxis_title="Price (USD)",
+                template="plotly_white",
+                hovermode="x unified"
+            )
+            st.plotly_chart(fig, use_container_width=True)
 
         # Volume chart
         fig_volume = px.bar(df, x=df.index, y='Volume')
+        if not events.empty:
+            fig_volume.add_trace(anomaly_markers(events, "volume_spike", "volume", "Volume spike", "star", "#ff7f0e"))
         fig_volume.update_layout(
             title=f"{symbol} Trading Volume",
             xaxis_title="Date",
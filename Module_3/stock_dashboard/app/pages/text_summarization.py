@@ -1,4 +1,5 @@
 import streamlit as st
+import pandas as pd
 import sys
 import os
 
@@ -8,7 +9,7 @@ sys.path.append(project_root)
 print(f"Project root (text_summarization.py): {project_root}")
 print(f"sys.path (text_summarization.py): {sys.path}")
 
-from src.utils.api_client import summarize_text
+from src.utils.api_client import score_sentiment, summarize_batch, summarize_text
 
 st.title("Stock Text Summarization")
 
@@ -34,4 +35,62 @@ if st.button("Generate Summary"):
             except Exception as e:
                 st.error(f"Error generating summary: {str(e)}")
     else:
-        st.warning("Please enter text to summarize")
\ No newline at end of file
+        st.warning("Please enter text to summarize")
+
+# Batch summarization
+st.subheader("Summarize Many Articles")
+articles_text = st.text_area(
+    "Paste several articles separated by a line containing only ---",
+    height=200,
+    placeholder="First article...\n---\nSecond article..."
+)
+
+if st.button("Summarize Articles"):
+    articles = [a.strip() for a in articles_text.split("\n---\n") if a.strip()]
+    if articles:
+        with st.spinner(f"Summarizing {len(articles)} articles..."):
+            try:
+                batch = summarize_batch(articles, max_length, min_length)
+                st.caption(
+                    f"{batch['generations']} summaries generated for {len(articles)} articles "
+                    f"({batch['generations_saved']} near-duplicates reused a summary)"
+                )
+                for members in batch["clusters"]:
+                    label = f"Article {members[0] + 1}"
+                    if len(members) > 1:
+                        label += f" and {len(members) - 1} near-duplicate(s)"
+                    with st.expander(label, expanded=True):
+                        st.write(batch["summaries"][members[0]])
+            except Exception as e:
+                st.error(f"Error generating summaries: {str(e)}")
+    else:
+        st.warning("Please enter at least one article")
+
+# Headline sentiment
+st.subheader("Headline Sentiment")
+headlines_text = st.text_area(
+    "Enter headlines to score, one per line",
+    height=200,
+    placeholder="Apple beats earnings estimates on strong iPhone sales\nTesla shares slide after delivery miss"
+)
+
+if st.button("Score Sentiment"):
+    headlines = [line.strip() for line in headlines_text.splitlines() if line.strip()]
+    if headlines:
+        with st.spinner(f"Scoring {len(headlines)} headlines..."):
+            try:
+                # One request for the whole batch
+                scored = score_sentiment(headlines)
+                results = pd.DataFrame(scored["results"])
+                results.insert(0, "headline", headlines)
+                counts = results["label"].value_counts()
+                col1, col2, col3 = st.columns(3)
+                col1.metric("Positive", int(counts.get("positive", 0)))
+                col2.metric("Neutral", int(counts.get("neutral", 0)))
+                col3.metric("Negative", int(counts.get("negative", 0)))
+                st.dataframe(results, use_container_width=True, hide_index=True)
+                st.caption(f"{scored['scored']} scored by the model, {scored['cached']} served from cache")
+            except Exception as e:
+                st.error(f"Error scoring sentiment: {str(e)}")
+    else:
+        st.warning("Please enter at least one headline")
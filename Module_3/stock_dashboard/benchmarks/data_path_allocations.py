@@ -0,0 +1,119 @@
+"""
+Allocations per stock-data request, before and after the copy-free data path.
+
+Runs the provider-normalisation and API-serialisation stages on a synthetic
+20-year daily frame shaped like a yfinance history (extra Dividends/Stock
+Splits columns, tz-aware index) and reports, per stage, the bytes and
+blocks allocated and the peak traced memory from tracemalloc. The previous
+implementations are kept here as the baseline.
+
+Usage (from the stock_dashboard directory):
+    python benchmarks/data_path_allocations.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from api.main import _frame_payload
+from src.data.compact import CompactFrame
+from src.data.stock_data import _normalize_history
+
+YEARS = 20
+REPEATS = 5
+
+
+def synthetic_history(years: int = YEARS) -> pd.DataFrame:
+    """Daily bars shaped like yfinance's Ticker.history output"""
+    index = pd.bdate_range(end="2024-12-31", periods=252 * years, tz="America/New_York", name="Date")
+    rng = np.random.default_rng(0)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(index))))
+    return pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.002, len(index))),
+        "High": close * 1.01,
+        "Low": close * 0.99,
+        "Close": close,
+        "Volume": rng.integers(1_000_000, 50_000_000, len(index)),
+        "Dividends": 0.0,
+        "Stock Splits": 0.0,
+    }, index=index)
+
+
+def normalize_before(df: pd.DataFrame, symbol: str) -> pd.DataFrame:
+    df = df.rename(columns={
+        "Open": "Open",
+        "High": "High",
+        "Low": "Low",
+        "Close": "Close",
+        "Volume": "Volume"
+    })
+    required_cols = ["Open", "High", "Low", "Close", "Volume"]
+    if not all(col in df.columns for col in required_cols):
+        raise ValueError(f"Missing required columns in data for {symbol}")
+    df = df[required_cols].copy()
+    df.index = pd.to_datetime(df.index)
+    df.sort_index(inplace=True)
+    return df
+
+
+def payload_before(df: pd.DataFrame) -> dict:
+    df_dict = df.to_dict(orient="index")
+    return {"data": {str(k): v for k, v in df_dict.items()}, "columns": list(df.columns)}
+
+
+def payload_after(df: pd.DataFrame) -> dict:
+    return _frame_payload(df, "SYN", "max", None, None, "1d")
+
+
+def measure(fn, *args) -> dict:
+    """Allocations of one call (after a warm-up call) and the best wall time"""
+    fn(*args)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = fn(*args)
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    diff = [stat for stat in after.compare_to(before, "filename") if stat.size_diff > 0]
+
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        fn(*args)
+        timings.append(time.perf_counter() - started)
+    return {
+        "retained_kb": sum(stat.size_diff for stat in diff) / 1024,
+        "blocks": sum(stat.count_diff for stat in diff),
+        "peak_kb": peak / 1024,
+        "ms": min(timings) * 1000,
+    }
+
+
+def main():
+    raw = synthetic_history()
+    stored = CompactFrame.from_frame(_normalize_history(raw, "SYN")).to_frame()
+    print(f"Synthetic history: {len(raw)} bars ({YEARS} years)\n")
+
+    rows = [
+        ("normalize", "before", measure(normalize_before, raw, "SYN")),
+        ("normalize", "after", measure(_normalize_history, raw, "SYN")),
+        ("serialize", "before", measure(payload_before, stored)),
+        ("serialize", "after", measure(payload_after, stored)),
+    ]
+    print(f"{'stage':<10} {'version':<8} {'peak KiB':>10} {'result KiB':>11} {'blocks':>9} {'ms':>8}")
+    for stage, version, stats in rows:
+        print(f"{stage:<10} {version:<8} {stats['peak_kb']:>10.0f} {stats['retained_kb']:>11.0f} "
+              f"{stats['blocks']:>9} {stats['ms']:>8.2f}")
+
+    assert normalize_before(raw, "SYN").equals(_normalize_history(raw, "SYN"))
+    assert payload_before(stored)["data"] == payload_after(stored)["data"]
+
+
+if __name__ == "__main__":
+    main()
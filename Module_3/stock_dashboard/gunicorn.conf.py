@@ -0,0 +1,63 @@
+"""
+Gunicorn settings for the production API server (PRODUCTION_MODE=true in
+start.sh).
+
+The app is imported once in the master process (preload_app) together with
+the read-only assets every worker needs: the transformer pipelines and the
+symbol directory. Workers are forked from that master and share those pages
+copy-on-write; gc.freeze() before each fork keeps the garbage collector
+from touching (and so copying) the preloaded objects.
+
+Fetched series live in the node-local shared cache (SHARED_CACHE_DIR), so a
+graceful reload (`kill -HUP <master pid>`) replaces workers one generation
+at a time while the new workers start with warm models, directory and
+series.
+
+Each worker still runs the app's lifespan. Background jobs that poll the
+providers (watchlist prefetch, screener refresh) only start in the worker
+holding the leader lock in SHARED_CACHE_DIR (src/utils/leader.py), and
+quote polls are shared between workers through the same directory.
+"""
+import gc
+import multiprocessing
+import os
+
+bind = "0.0.0.0:8000"
+workers = int(os.getenv("API_WORKERS") or multiprocessing.cpu_count())
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+# Summaries of long articles can take minutes on CPU
+timeout = int(os.getenv("API_TIMEOUT", "300"))
+graceful_timeout = int(os.getenv("API_GRACEFUL_TIMEOUT", "60"))
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+
+# Workers share fetched series through a node-local cache on tmpfs
+os.environ.setdefault("SHARED_CACHE_DIR", "/dev/shm/stock_dashboard")
+
+
+def on_starting(server):
+    """Load shared read-only assets in the master before any worker exists"""
+    from src.data.models import preload
+    from src.data.symbols import directory
+
+    server.log.info("Preloading transformer pipelines and the symbol directory")
+    preload()
+    server.log.info("Symbol directory: %d symbols", len(directory().entries))
+
+
+def pre_fork(server, worker):
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Split the cores between workers instead of every worker's torch
+    # thread pool claiming all of them
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(max(1, multiprocessing.cpu_count() // workers))
@@ -0,0 +1,250 @@
+"""
+Online detection of volume spikes and price gaps.
+
+Every (symbol, interval) series keeps two running statistics: one over log
+volume and one over close-to-close log returns. The first ANOMALY_WARMUP
+bars seed them with Welford's mean/variance; after that they follow an
+exponentially weighted mean/variance with span ANOMALY_SPAN, so they adapt
+to regime changes. Each bar is scored against the statistics as they stood
+before it, then folded in, which is O(1) per bar whatever the history length.
+
+- volume_spike: log volume z-score >= ANOMALY_Z
+- gap_up / gap_down: the open's log gap from the previous close, scored
+  against the return statistics, with |z| >= ANOMALY_Z
+
+Bars are pushed by the store as they are ingested (see store.add_listener).
+Only bars after the last one folded in are processed; the newest bar is
+scored provisionally and folded in once a newer bar arrives, since the
+provider may still revise it. When older bars change (new history merged
+in, split-adjusted prices) the series is rescored from scratch.
+"""
+import math
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data import store
+from src.data.compact import PRICE_DECIMALS, CompactFrame
+from src.data.stock_data import INTRADAY_INTERVALS, get_compact_data
+
+# Span of the exponentially weighted statistics, in bars
+ANOMALY_SPAN = int(os.getenv("ANOMALY_SPAN", "20"))
+
+# Bars needed before anything is flagged
+ANOMALY_WARMUP = int(os.getenv("ANOMALY_WARMUP", "20"))
+
+# z-score at which a bar is flagged
+ANOMALY_Z = float(os.getenv("ANOMALY_Z", "3.0"))
+
+# Flagged events kept per series
+ANOMALY_HISTORY_SIZE = int(os.getenv("ANOMALY_HISTORY_SIZE", "500"))
+
+
+class RunningStat:
+    """Welford mean/variance for the first `warmup` values, EWMA after that"""
+    __slots__ = ("alpha", "warmup", "count", "mean", "var", "_m2")
+
+    def __init__(self, span: int = ANOMALY_SPAN, warmup: int = ANOMALY_WARMUP):
+        self.alpha = 2.0 / (span + 1)
+        self.warmup = max(warmup, 2)
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self._m2 = 0.0
+
+    def zscore(self, x: float) -> Optional[float]:
+        if self.count < self.warmup or self.var <= 0:
+            return None
+        return (x - self.mean) / math.sqrt(self.var)
+
+    def update(self, x: float):
+        self.count += 1
+        if self.count <= self.warmup:
+            delta = x - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (x - self.mean)
+            self.var = self._m2 / (self.count - 1) if self.count > 1 else 0.0
+        else:
+            diff = x - self.mean
+            increment = self.alpha * diff
+            self.mean += increment
+            self.var = (1 - self.alpha) * (self.var + diff * increment)
+
+
+class SeriesDetector:
+    """Running statistics and flagged events of one symbol/interval"""
+
+    def __init__(self):
+        self.volume = RunningStat()
+        self.returns = RunningStat()
+        self.first_ts: Optional[int] = None
+        self.last_ts: Optional[int] = None   # last bar folded into the statistics
+        self.last_close: Optional[float] = None
+        self.tz: Optional[str] = None
+        self.events = deque(maxlen=ANOMALY_HISTORY_SIZE)
+        self.provisional: List[dict] = []
+
+    def _score(self, t: int, open_: float, close: float, volume: float) -> List[dict]:
+        events = []
+        shown = round(close, PRICE_DECIMALS)
+        if volume > 0:
+            z = self.volume.zscore(math.log(volume))
+            if z is not None and z >= ANOMALY_Z:
+                events.append({"t": t, "kind": "volume_spike", "z": round(z, 2),
+                               "value": volume, "close": shown, "volume": volume})
+        if self.last_close and open_ > 0:
+            gap = math.log(open_ / self.last_close)
+            z = self.returns.zscore(gap)
+            if z is not None and abs(z) >= ANOMALY_Z:
+                events.append({"t": t, "kind": "gap_up" if z > 0 else "gap_down", "z": round(z, 2),
+                               "value": round(gap * 100, 3), "close": shown, "volume": volume})
+        return events
+
+    def _fold(self, t: int, close: float, volume: float):
+        if volume > 0:
+            self.volume.update(math.log(volume))
+        if self.last_close and close > 0:
+            self.returns.update(math.log(close / self.last_close))
+        if close > 0:
+            self.last_close = close
+        self.last_ts = t
+
+    def consistent_with(self, frame: CompactFrame) -> bool:
+        """False when `frame` revises history the statistics already contain"""
+        if self.last_ts is None:
+            return True
+        if frame.timestamps[0] < self.first_ts:
+            return False
+        i = int(np.searchsorted(frame.timestamps, self.last_ts))
+        if i < len(frame) and frame.timestamps[i] == self.last_ts:
+            return float(frame.prices[i, 3]) == self.last_close
+        return True
+
+    def ingest(self, frame: CompactFrame) -> int:
+        """Score the bars of `frame` not seen yet; returns the bars processed"""
+        timestamps = frame.timestamps
+        if not len(timestamps):
+            return 0
+        if self.first_ts is None:
+            self.first_ts = int(timestamps[0])
+            self.tz = frame.tz
+        lo = int(np.searchsorted(timestamps, self.last_ts, "right")) if self.last_ts is not None else 0
+        hi = len(timestamps) - 1
+        if lo > hi:
+            return 0
+        prices, volume = frame.prices, frame.volume
+        for i in range(lo, hi):
+            close = float(prices[i, 3])
+            self.events.extend(self._score(int(timestamps[i]), float(prices[i, 0]), close, float(volume[i])))
+            self._fold(int(timestamps[i]), close, float(volume[i]))
+        # The newest bar may still be revised, so it is only scored for now
+        self.provisional = [
+            {**event, "provisional": True}
+            for event in self._score(int(timestamps[hi]), float(prices[hi, 0]),
+                                     float(prices[hi, 3]), float(volume[hi]))
+        ]
+        return hi - lo + 1
+
+    def flagged(self, start: Optional[int] = None, end: Optional[int] = None) -> List[dict]:
+        events = list(self.events) + self.provisional
+        return [
+            event for event in events
+            if (start is None or event["t"] >= start) and (end is None or event["t"] <= end)
+        ]
+
+
+def _stored_series(symbol: str, interval: str) -> Optional[CompactFrame]:
+    """Everything the store currently holds for symbol/interval"""
+    if interval in INTRADAY_INTERVALS:
+        buffer = store.intraday_buffer(symbol, interval)
+        return CompactFrame.from_frame(buffer.to_frame()) if len(buffer) else None
+    entry = store.peek(symbol, interval)
+    return entry.frame if entry is not None and not entry.frame.empty else None
+
+
+class AnomalyMonitor:
+    def __init__(self):
+        self._series: Dict[tuple, SeriesDetector] = {}
+        self._lock = threading.Lock()
+        self.bars_scored = 0
+        self.rescans = 0
+
+    def on_bars(self, symbol: str, interval: str, frame: CompactFrame):
+        """Store listener: score newly ingested bars"""
+        if frame.empty:
+            return
+        key = (symbol.upper(), interval)
+        with self._lock:
+            detector = self._series.get(key)
+            if detector is not None and not detector.consistent_with(frame):
+                full = _stored_series(symbol, interval)
+                frame = full if full is not None else frame
+                detector = None
+                self.rescans += 1
+            if detector is None:
+                detector = self._series[key] = SeriesDetector()
+            self.bars_scored += detector.ingest(frame)
+
+    def sync(self, symbol: str, interval: str):
+        """Catch up with whatever the store holds (e.g. bars saved before registration)"""
+        frame = _stored_series(symbol, interval)
+        if frame is not None:
+            self.on_bars(symbol, interval, frame)
+
+    def events(self, symbol: str, interval: str, start: Optional[int] = None,
+               end: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            detector = self._series.get((symbol.upper(), interval))
+            return detector.flagged(start, end) if detector is not None else []
+
+    def timezone(self, symbol: str, interval: str) -> Optional[str]:
+        with self._lock:
+            detector = self._series.get((symbol.upper(), interval))
+            return detector.tz if detector is not None else None
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "series": len(self._series),
+                "bars_scored": self.bars_scored,
+                "rescans": self.rescans,
+                "events": sum(len(d.events) for d in self._series.values()),
+                "span": ANOMALY_SPAN,
+                "warmup": ANOMALY_WARMUP,
+                "z": ANOMALY_Z,
+            }
+
+
+anomaly_monitor = AnomalyMonitor()
+
+
+def _format_time(t: int, tz: Optional[str]) -> str:
+    ts = pd.Timestamp(t, tz="UTC").tz_convert(tz) if tz else pd.Timestamp(t)
+    return str(ts)
+
+
+def detect_anomalies(symbol: str, period: str = "1y", start=None, end=None,
+                     interval: str = "1d") -> dict:
+    """
+    Volume spikes and price gaps flagged within the requested period.
+    Loads the series if needed; only bars not seen before are scored.
+    """
+    symbol = symbol.upper()
+    frame = get_compact_data(symbol, period, start, end, interval)
+    anomaly_monitor.sync(symbol, interval)
+    events = []
+    if not frame.empty:
+        tz = anomaly_monitor.timezone(symbol, interval)
+        for event in anomaly_monitor.events(symbol, interval, int(frame.timestamps[0]), int(frame.timestamps[-1])):
+            events.append({**event, "t": _format_time(event["t"], tz), "provisional": event.get("provisional", False)})
+    return {
+        "symbol": symbol,
+        "period": period,
+        "interval": interval,
+        "tz": frame.tz,
+        "events": events,
+    }
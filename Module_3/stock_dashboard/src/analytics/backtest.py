@@ -0,0 +1,307 @@
+"""
+Vectorised backtests of simple long/flat strategies.
+
+Every parameter combination of a strategy is one row of a (combos x bars)
+position matrix. Indicators are computed for all distinct parameter values
+at once with cumulative sums and sliding windows, and signals, positions,
+P&L and metrics are whole-matrix NumPy operations; nothing loops over bars.
+
+A signal on bar t's close is traded at that close and earns bar t+1's
+return. Transaction costs are charged on every change in position.
+
+Large parameter sweeps are split into chunks evaluated in a process pool.
+The pool's workers are started from a forkserver rather than forked from
+the calling process, which in the API is multi-threaded (provider hedging,
+quote pollers, torch) and could hand a child a lock held by another thread.
+
+Strategies:
+- ma_crossover: long while the `fast` moving average is above the `slow` one
+- rsi: enter when RSI(`period`) drops below `lower`, exit above `upper`
+  (simple-average RSI so it can be computed with cumulative sums)
+- breakout: enter on a close above the prior `lookback`-bar high, exit on a
+  close below the prior `exit_lookback`-bar low
+"""
+import itertools
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.data.stock_data import get_stock_data
+
+TRADING_DAYS = 252
+
+# Combos per chunk; bounds each chunk's (combos x bars) working set
+SWEEP_CHUNK_SIZE = int(os.getenv("BACKTEST_CHUNK_SIZE", "250"))
+
+# Worker processes for sweeps (default: one per CPU)
+SWEEP_WORKERS = int(os.getenv("BACKTEST_WORKERS", str(os.cpu_count() or 1)))
+
+# Largest sweep accepted by the API
+MAX_SWEEP_COMBOS = int(os.getenv("BACKTEST_MAX_COMBOS", "20000"))
+
+STRATEGY_PARAMS = {
+    "ma_crossover": ["fast", "slow"],
+    "rsi": ["period", "lower", "upper"],
+    "breakout": ["lookback", "exit_lookback"],
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _rolling_means(values: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    """(len(windows) x bars) trailing means, NaN until each window fills"""
+    cumsum = np.concatenate([[0.0], np.cumsum(values)])
+    end = np.arange(1, len(values) + 1)[None, :]
+    start = end - windows[:, None]
+    means = (cumsum[end] - cumsum[np.clip(start, 0, None)]) / windows[:, None]
+    means[start < 0] = np.nan
+    return means
+
+
+def _prior_extreme(close: np.ndarray, window: int, fn) -> np.ndarray:
+    """max/min of the `window` closes before each bar (NaN when not available)"""
+    out = np.full(len(close), np.nan)
+    if window < len(close):
+        out[window:] = fn(sliding_window_view(close, window), axis=-1)[:-1]
+    return out
+
+
+def _hold_between(entry: np.ndarray, exit_: np.ndarray) -> np.ndarray:
+    """
+    Positions that go long on entry and flat on exit, holding in between.
+    Forward-fills the most recent event along each row.
+    """
+    events = np.where(entry, 1.0, np.where(exit_, 0.0, np.nan))
+    bars = np.arange(events.shape[1])
+    last = np.maximum.accumulate(np.where(np.isnan(events), -1, bars), axis=1)
+    held = np.take_along_axis(events, np.clip(last, 0, None), axis=1)
+    return np.where(last >= 0, held, 0.0)
+
+
+def _ma_crossover_positions(close: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    windows, inverse = np.unique(np.concatenate([params["fast"], params["slow"]]), return_inverse=True)
+    means = _rolling_means(close, windows)
+    count = len(params["fast"])
+    fast, slow = means[inverse[:count]], means[inverse[count:]]
+    return (fast > slow).astype(np.float64)
+
+
+def _rsi_positions(close: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    periods, inverse = np.unique(params["period"], return_inverse=True)
+    delta = np.diff(close, prepend=close[0])
+    gains = _rolling_means(np.maximum(delta, 0.0), periods)
+    losses = _rolling_means(np.maximum(-delta, 0.0), periods)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + gains / losses)
+    rsi = np.where(losses == 0, 100.0, rsi)[inverse]
+    return _hold_between(rsi < params["lower"][:, None], rsi > params["upper"][:, None])
+
+
+def _breakout_positions(close: np.ndarray, params: Dict[str, np.ndarray]) -> np.ndarray:
+    highs = {n: _prior_extreme(close, int(n), np.max) for n in np.unique(params["lookback"])}
+    lows = {n: _prior_extreme(close, int(n), np.min) for n in np.unique(params["exit_lookback"])}
+    high = np.stack([highs[n] for n in params["lookback"]])
+    low = np.stack([lows[n] for n in params["exit_lookback"]])
+    return _hold_between(close > high, close < low)
+
+
+POSITION_BUILDERS = {
+    "ma_crossover": _ma_crossover_positions,
+    "rsi": _rsi_positions,
+    "breakout": _breakout_positions,
+}
+
+
+def _strategy_returns(close: np.ndarray, positions: np.ndarray, cost_bps: float) -> np.ndarray:
+    """(combos x bars-1) per-bar returns net of costs"""
+    returns = close[1:] / close[:-1] - 1.0
+    turnover = np.abs(np.diff(positions, axis=1, prepend=0.0))
+    return positions[:, :-1] * returns - turnover[:, :-1] * cost_bps / 10_000
+
+
+def evaluate_positions(close: np.ndarray, positions: np.ndarray,
+                       cost_bps: float = 1.0) -> Dict[str, np.ndarray]:
+    """Metrics for every row of a (combos x bars) 0/1 position matrix"""
+    strategy = _strategy_returns(close, positions, cost_bps)
+    equity = np.cumprod(1.0 + strategy, axis=1)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=1)
+    std = strategy.std(axis=1, ddof=1)
+    total = equity[:, -1] - 1.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = strategy.mean(axis=1) / std * np.sqrt(TRADING_DAYS)
+        annual = (1.0 + total) ** (TRADING_DAYS / strategy.shape[1]) - 1.0
+    return {
+        "total_return": total,
+        "annual_return": annual,
+        "sharpe": sharpe,
+        "max_drawdown": (equity / peak - 1.0).min(axis=1),
+        "trades": (np.diff(positions, axis=1, prepend=0.0) > 0).sum(axis=1),
+        "exposure": positions[:, :-1].mean(axis=1),
+    }
+
+
+def _evaluate_chunk(strategy: str, close: np.ndarray, params: Dict[str, np.ndarray],
+                    cost_bps: float) -> Dict[str, np.ndarray]:
+    positions = POSITION_BUILDERS[strategy](close, params)
+    return evaluate_positions(close, positions, cost_bps)
+
+
+def _param_grid(strategy: str, grid: Dict[str, List[float]]) -> Dict[str, np.ndarray]:
+    """Cartesian product of the grid as one array per parameter, invalid combos dropped"""
+    if strategy not in STRATEGY_PARAMS:
+        raise ValueError(f"Unknown strategy '{strategy}'. Choose from {list(STRATEGY_PARAMS)}")
+    names = STRATEGY_PARAMS[strategy]
+    missing = [name for name in names if not grid.get(name)]
+    if missing:
+        raise ValueError(f"Missing values for parameters {missing}")
+
+    combos = np.array(list(itertools.product(*(grid[name] for name in names))), dtype=np.float64)
+    params = {name: combos[:, i] for i, name in enumerate(names)}
+    if strategy == "ma_crossover":
+        valid = (params["fast"] >= 1) & (params["fast"] < params["slow"])
+    elif strategy == "rsi":
+        valid = (params["period"] >= 2) & (params["lower"] < params["upper"])
+    else:
+        valid = (params["lookback"] >= 1) & (params["exit_lookback"] >= 1)
+    params = {name: values[valid] for name, values in params.items()}
+    for name in ("fast", "slow", "period", "lookback", "exit_lookback"):
+        if name in params:
+            params[name] = params[name].astype(np.int64)
+    return params
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Process pool shared by all sweeps, started on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=SWEEP_WORKERS,
+                mp_context=multiprocessing.get_context("forkserver")
+            )
+        return _executor
+
+
+def shutdown_executor():
+    """Stop the sweep pool's worker processes, if it was ever started"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def run_sweep(close: np.ndarray, strategy: str, grid: Dict[str, List[float]],
+              cost_bps: float = 1.0, parallel: bool = True):
+    """
+    Evaluate every combo of the grid. Returns (params, metrics, workers used),
+    with params and metrics as dicts of equal-length arrays.
+    """
+    params = _param_grid(strategy, grid)
+    count = len(next(iter(params.values())))
+    if count == 0:
+        raise ValueError("No valid parameter combinations in the grid")
+    if count > MAX_SWEEP_COMBOS:
+        raise ValueError(f"Sweep of {count} combos exceeds the limit of {MAX_SWEEP_COMBOS}")
+
+    chunks = [
+        {name: values[i:i + SWEEP_CHUNK_SIZE] for name, values in params.items()}
+        for i in range(0, count, SWEEP_CHUNK_SIZE)
+    ]
+    workers = min(SWEEP_WORKERS, len(chunks)) if parallel else 1
+    if workers > 1:
+        results = list(_get_executor().map(
+            _evaluate_chunk,
+            itertools.repeat(strategy),
+            itertools.repeat(close),
+            chunks,
+            itertools.repeat(cost_bps)
+        ))
+    else:
+        results = [_evaluate_chunk(strategy, close, chunk, cost_bps) for chunk in chunks]
+
+    metrics = {name: np.concatenate([r[name] for r in results]) for name in results[0]}
+    return params, metrics, workers
+
+
+def _clean(value) -> Optional[float]:
+    value = float(value)
+    return round(value, 6) if np.isfinite(value) else None
+
+
+def _load_close(symbol: str, period: str):
+    df = get_stock_data(symbol, period)
+    if df is None or len(df) < 3:
+        raise ValueError(f"Not enough history for {symbol}")
+    return df.index, df["Close"].to_numpy(dtype=np.float64)
+
+
+def backtest(symbol: str, strategy: str, params: Dict[str, float], period: str = "max",
+             cost_bps: float = 1.0) -> dict:
+    """Single strategy run with its equity curve next to buy-and-hold"""
+    dates, close = _load_close(symbol, period)
+    grid = {name: [value] for name, value in params.items()}
+    combo = _param_grid(strategy, grid)
+    if len(next(iter(combo.values()))) == 0:
+        raise ValueError(f"Invalid parameters for {strategy}: {params}")
+
+    positions = np.vstack([POSITION_BUILDERS[strategy](close, combo), np.ones(len(close))])
+    metrics = evaluate_positions(close, positions, cost_bps)
+    strategy_returns = _strategy_returns(close, positions, cost_bps)
+    equity = np.concatenate([np.ones((2, 1)), np.cumprod(1.0 + strategy_returns, axis=1)], axis=1)
+
+    return {
+        "symbol": symbol.upper(),
+        "strategy": strategy,
+        "params": params,
+        "bars": len(close),
+        "metrics": {name: _clean(values[0]) for name, values in metrics.items()},
+        "buy_and_hold": {name: _clean(values[1]) for name, values in metrics.items()},
+        "equity": {
+            "dates": [str(d) for d in dates],
+            "strategy": np.round(equity[0], 6).tolist(),
+            "buy_and_hold": np.round(equity[1], 6).tolist(),
+        },
+    }
+
+
+def sweep(symbol: str, strategy: str, grid: Dict[str, List[float]], period: str = "max",
+          cost_bps: float = 1.0, top: int = 20, sort_by: str = "sharpe") -> dict:
+    """Run a parameter sweep and return the best combos by `sort_by`"""
+    dates, close = _load_close(symbol, period)
+    started = time.time()
+    params, metrics, workers = run_sweep(close, strategy, grid, cost_bps)
+    if sort_by not in metrics:
+        raise ValueError(f"Cannot sort by '{sort_by}'. Choose from {list(metrics)}")
+
+    score = np.nan_to_num(metrics[sort_by], nan=-np.inf)
+    order = np.argsort(-score, kind="stable")
+    if top:
+        order = order[:top]
+    results = [
+        {
+            **{name: int(values[i]) if values.dtype.kind == "i" else float(values[i])
+               for name, values in params.items()},
+            **{name: _clean(values[i]) for name, values in metrics.items()},
+        }
+        for i in order
+    ]
+    return {
+        "symbol": symbol.upper(),
+        "strategy": strategy,
+        "start": str(dates[0]),
+        "end": str(dates[-1]),
+        "bars": len(close),
+        "combos": len(score),
+        "workers": workers,
+        "seconds": round(time.time() - started, 3),
+        "sort_by": sort_by,
+        "results": results,
+    }
@@ -0,0 +1,164 @@
+"""
+Correlation and covariance matrices over an aligned returns matrix.
+
+The full-period matrices are one (N x bars) @ (bars x N) product. The
+rolling-window matrices come from a RollingCovariance that keeps running
+sums of returns and of their outer products, so each new bar costs one
+O(N^2) rank-one update instead of recomputing the window.
+
+Results are cached per (universe, period, window, interval). When the
+underlying series gain bars, only the new return rows are pushed into the
+cached rolling state.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+
+from src.analytics.portfolio import align_closes, simple_returns
+
+CORRELATION_CACHE_SIZE = int(os.getenv("CORRELATION_CACHE_SIZE", "32"))
+
+
+class RollingCovariance:
+    # Recompute the sums from the window every this many updates to stop
+    # floating point drift from the add/subtract updates accumulating
+    RESYNC_EVERY = 1000
+
+    def __init__(self, window: int, columns: int):
+        self.window = window
+        self.rows = np.zeros((window, columns))
+        self.count = 0
+        self.next = 0
+        self.sum = np.zeros(columns)
+        self.outer = np.zeros((columns, columns))
+        self._updates = 0
+
+    def push(self, row: np.ndarray):
+        if self.count == self.window:
+            old = self.rows[self.next]
+            self.sum -= old
+            self.outer -= np.outer(old, old)
+        else:
+            self.count += 1
+        self.rows[self.next] = row
+        self.sum += row
+        self.outer += np.outer(row, row)
+        self.next = (self.next + 1) % self.window
+
+        self._updates += 1
+        if self._updates % self.RESYNC_EVERY == 0:
+            live = self.rows[:self.count]
+            self.sum = live.sum(axis=0)
+            self.outer = live.T @ live
+
+    def extend(self, rows: np.ndarray):
+        for row in rows:
+            self.push(row)
+
+    def covariance(self) -> np.ndarray:
+        n = self.count
+        if n < 2:
+            return np.full(self.outer.shape, np.nan)
+        return (self.outer - np.outer(self.sum, self.sum) / n) / (n - 1)
+
+
+def correlation_from_covariance(cov: np.ndarray) -> np.ndarray:
+    std = np.sqrt(np.diag(cov))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = cov / np.outer(std, std)
+    np.fill_diagonal(corr, 1.0)
+    return corr
+
+
+def full_covariance(returns: np.ndarray) -> np.ndarray:
+    centered = returns - returns.mean(axis=0)
+    return centered.T @ centered / (len(returns) - 1)
+
+
+def _matrix(values: np.ndarray) -> list:
+    rounded = np.round(values, 6).astype(object)
+    rounded[~np.isfinite(values)] = None
+    return rounded.tolist()
+
+
+class _CorrelationState:
+    def __init__(self, dates, prices: np.ndarray, window: int):
+        self.dates = dates
+        self.prices = prices
+        self.rolling = RollingCovariance(window, prices.shape[1])
+        self.rolling.extend(simple_returns(prices)[-window:])
+        self.full_cov = full_covariance(simple_returns(prices))
+
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def _update_state(state: Optional[_CorrelationState], dates, prices: np.ndarray, window: int):
+    """
+    Bring a cached state up to date. Returns (state, rows pushed incrementally);
+    rows is None when the state had to be rebuilt.
+    """
+    if state is not None and len(state.dates) and state.dates[-1] in dates:
+        last = dates.get_loc(state.dates[-1])
+        # Incremental only if the bars we already used are unchanged
+        if np.array_equal(prices[last], state.prices[-1]):
+            new_returns = simple_returns(prices[last:])
+            if len(new_returns):
+                state.rolling.extend(new_returns)
+                state.full_cov = full_covariance(simple_returns(prices))
+            state.dates, state.prices = dates, prices
+            return state, len(new_returns)
+    return _CorrelationState(dates, prices, window), None
+
+
+def correlation_matrices(symbols: List[str], period: str = "1y", window: int = 60,
+                         interval: str = "1d") -> dict:
+    """
+    Full-period and latest rolling-window correlation/covariance matrices
+    for a universe of symbols
+    """
+    if len(symbols) < 2:
+        raise ValueError("At least two symbols are required")
+    if window < 2:
+        raise ValueError("Window must be at least 2 bars")
+
+    dates, symbols, prices = align_closes(symbols, period, interval=interval)
+    if len(dates) <= window:
+        raise ValueError(f"Need more than {window} overlapping bars, got {len(dates)}")
+
+    key = (tuple(symbols), period, window, interval)
+    with _lock:
+        state = _cache.get(key)
+        state, pushed = _update_state(state, dates, prices, window)
+        _cache[key] = state
+        _cache.move_to_end(key)
+        while len(_cache) > CORRELATION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+        rolling_cov = state.rolling.covariance()
+        full_cov = state.full_cov
+
+    return {
+        "symbols": symbols,
+        "period": period,
+        "window": window,
+        "interval": interval,
+        "start": str(dates[0].date()),
+        "end": str(dates[-1].date()),
+        "bars": len(dates),
+        "incremental_rows": pushed,
+        "full": {
+            "correlation": _matrix(correlation_from_covariance(full_cov)),
+            "covariance": _matrix(full_cov),
+        },
+        "rolling": {
+            "start": str(dates[-window].date()),
+            "end": str(dates[-1].date()),
+            "correlation": _matrix(correlation_from_covariance(rolling_cov)),
+            "covariance": _matrix(rolling_cov),
+        },
+    }
@@ -0,0 +1,159 @@
+"""
+Vectorised risk metrics for many symbols at once.
+
+Closing prices for N symbols are aligned on their common dates into one
+(bars x N) NumPy matrix; every metric is then a single array pass over that
+matrix instead of a per-symbol loop.
+"""
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.stock_data import ensure_stored, get_stock_data
+
+PERIODS_PER_YEAR = {
+    "1d": 252,
+    "1wk": 52,
+    "1mo": 12,
+}
+
+
+def align_closes(symbols: List[str], period: str = "1y", start=None, end=None,
+                 interval: str = "1d"):
+    """
+    Fetch closing prices and align them on the dates every symbol traded.
+
+    Returns (dates, symbols, prices) where prices has shape (bars, len(symbols)).
+    """
+    symbols = [s.upper() for s in symbols]
+    # One download for every symbol not already stored
+    ensure_stored(symbols, period, start=start, interval=interval)
+    closes = {}
+    for symbol in symbols:
+        df = get_stock_data(symbol, period, start=start, end=end, interval=interval)
+        if df is None or df.empty:
+            raise ValueError(f"No data available for {symbol}")
+        # Align on calendar dates so symbols from different exchanges line up
+        dates = pd.DatetimeIndex(df.index).tz_localize(None).normalize()
+        close = pd.Series(df["Close"].to_numpy(), index=dates)
+        closes[symbol] = close[~close.index.duplicated(keep="last")]
+
+    frame = pd.concat(closes, axis=1, join="inner").dropna()
+    if len(frame) < 3:
+        raise ValueError("Not enough overlapping history to compute risk metrics")
+    return frame.index, symbols, frame[symbols].to_numpy(dtype=np.float64)
+
+
+def simple_returns(prices: np.ndarray) -> np.ndarray:
+    return prices[1:] / prices[:-1] - 1.0
+
+
+def risk_metrics(prices: np.ndarray, benchmark_returns: Optional[np.ndarray] = None,
+                 risk_free_rate: float = 0.0, periods_per_year: int = 252) -> dict:
+    """
+    Metrics for every column of a (bars x N) price matrix.
+
+    Returns a dict of length-N arrays: total_return, annual_return,
+    volatility, max_drawdown, sharpe, sortino and (with a benchmark) beta.
+    """
+    returns = simple_returns(prices)
+    bars = returns.shape[0]
+    excess = returns - risk_free_rate / periods_per_year
+    scale = np.sqrt(periods_per_year)
+
+    total_return = prices[-1] / prices[0] - 1.0
+    annual_return = (1.0 + total_return) ** (periods_per_year / bars) - 1.0
+    std = returns.std(axis=0, ddof=1)
+    volatility = std * scale
+
+    running_peak = np.maximum.accumulate(prices, axis=0)
+    max_drawdown = (prices / running_peak - 1.0).min(axis=0)
+
+    mean_excess = excess.mean(axis=0)
+    downside = np.sqrt(np.mean(np.minimum(excess, 0.0) ** 2, axis=0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = mean_excess / std * scale
+        sortino = mean_excess / downside * scale
+
+    metrics = {
+        "total_return": total_return,
+        "annual_return": annual_return,
+        "volatility": volatility,
+        "max_drawdown": max_drawdown,
+        "sharpe": sharpe,
+        "sortino": sortino,
+    }
+
+    if benchmark_returns is not None:
+        centered = returns - returns.mean(axis=0)
+        bench = benchmark_returns - benchmark_returns.mean()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            metrics["beta"] = centered.T @ bench / (bench @ bench)
+    return metrics
+
+
+def normalize_weights(weights: Optional[List[float]], count: int) -> np.ndarray:
+    """Equal weights by default; otherwise scaled to sum to 1"""
+    if weights is None:
+        return np.full(count, 1.0 / count)
+    w = np.asarray(weights, dtype=np.float64)
+    if w.shape != (count,):
+        raise ValueError(f"Expected {count} weights, got {len(weights)}")
+    if w.sum() == 0:
+        raise ValueError("Weights must not sum to zero")
+    return w / w.sum()
+
+
+def _clean(value: float) -> Optional[float]:
+    return None if not np.isfinite(value) else round(float(value), 6)
+
+
+def portfolio_risk(symbols: List[str], period: str = "1y", weights: Optional[List[float]] = None,
+                   benchmark: Optional[str] = "SPY", risk_free_rate: float = 0.0,
+                   interval: str = "1d") -> dict:
+    """
+    Per-symbol and portfolio-level risk metrics.
+
+    The portfolio is rebalanced to `weights` every bar; its value series is
+    appended to the price matrix so it goes through the same vectorised pass.
+    """
+    if not symbols:
+        raise ValueError("At least one symbol is required")
+    if interval not in PERIODS_PER_YEAR:
+        raise ValueError(f"Risk metrics support intervals {list(PERIODS_PER_YEAR)}")
+
+    symbols = [s.upper() for s in symbols]
+    benchmark = benchmark.upper() if benchmark else None
+    fetch = symbols + ([benchmark] if benchmark and benchmark not in symbols else [])
+    dates, fetched, prices = align_closes(fetch, period, interval=interval)
+
+    w = normalize_weights(weights, len(symbols))
+    asset_prices = prices[:, :len(symbols)]
+    portfolio_value = np.concatenate([[1.0], np.cumprod(1.0 + simple_returns(asset_prices) @ w)])
+    matrix = np.column_stack([asset_prices, portfolio_value])
+
+    benchmark_returns = None
+    if benchmark:
+        benchmark_returns = simple_returns(prices[:, fetched.index(benchmark)])
+
+    metrics = risk_metrics(
+        matrix,
+        benchmark_returns,
+        risk_free_rate,
+        PERIODS_PER_YEAR[interval]
+    )
+    per_column = [
+        {name: _clean(values[i]) for name, values in metrics.items()}
+        for i in range(matrix.shape[1])
+    ]
+    return {
+        "symbols": symbols,
+        "benchmark": benchmark,
+        "weights": [round(float(x), 6) for x in w],
+        "start": str(dates[0].date()),
+        "end": str(dates[-1].date()),
+        "bars": len(dates),
+        "metrics": dict(zip(symbols, per_column[:-1])),
+        "portfolio": per_column[-1],
+    }
@@ -0,0 +1,316 @@
+"""
+Precomputed screener over a large symbol universe.
+
+Per-symbol metrics (52-week range, volume spike, RSI, recent returns) are
+kept in one column array per metric, one row per symbol. Queries are a few
+vectorised comparisons over those columns, so screening thousands of
+tickers never touches the provider or the stored bars.
+
+Rows are refreshed incrementally from the local OHLCV store: only symbols
+whose stored series changed since their row was computed are recomputed,
+and those are computed together from one padded (symbols x bars) matrix.
+A background task keeps the store itself current by bulk-fetching stale
+universe symbols in batches.
+
+The universe is read from SCREENER_UNIVERSE_FILE (one ticker per line, or
+a CSV whose first column is the ticker); without it the watchlist is used.
+Background refresh is disabled unless SCREENER_ENABLED=true.
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.data import store
+from src.data.stock_data import get_stock_data_bulk
+from src.data.watchlist import watchlist
+
+SCREENER_ENABLED = os.getenv("SCREENER_ENABLED", "false").lower() == "true"
+SCREENER_UNIVERSE_FILE = os.getenv("SCREENER_UNIVERSE_FILE", "")
+SCREENER_REFRESH_SECONDS = int(os.getenv("SCREENER_REFRESH_SECONDS", "300"))
+
+# Symbols per bulk download, and most symbols fetched per refresh cycle
+SCREENER_BATCH_SIZE = int(os.getenv("SCREENER_BATCH_SIZE", "200"))
+SCREENER_FETCH_BUDGET = int(os.getenv("SCREENER_FETCH_BUDGET", "1000"))
+SCREENER_PERIOD = os.getenv("SCREENER_PERIOD", "1y")
+
+YEAR_BARS = 252
+MONTH_BARS = 21
+VOLUME_WINDOW = 20
+RSI_PERIOD = 14
+
+METRICS = [
+    "close",
+    "change",
+    "return_1m",
+    "high_52w",
+    "low_52w",
+    "from_high",
+    "from_low",
+    "volume",
+    "avg_volume",
+    "volume_ratio",
+    "rsi",
+    "bars",
+]
+
+
+def load_universe(path: str = SCREENER_UNIVERSE_FILE) -> List[str]:
+    """Tickers from the universe file, or the watchlist when none is configured"""
+    if not path:
+        return watchlist()
+    symbols = []
+    with open(path) as f:
+        for line in f:
+            ticker = line.split(",")[0].strip().upper()
+            if ticker and not ticker.startswith("#") and ticker not in ("SYMBOL", "TICKER"):
+                symbols.append(ticker)
+    return list(dict.fromkeys(symbols))
+
+
+def _padded(rows: List[np.ndarray], width: int) -> np.ndarray:
+    """Right-align variable-length rows in a (len(rows) x width) NaN-padded matrix"""
+    matrix = np.full((len(rows), width), np.nan)
+    for i, row in enumerate(rows):
+        row = row[-width:]
+        if len(row):
+            matrix[i, width - len(row):] = row
+    return matrix
+
+
+def compute_metrics(closes: np.ndarray, highs: np.ndarray, lows: np.ndarray,
+                    volumes: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Metrics for every row of right-aligned, NaN-padded (symbols x bars)
+    matrices, the last column being each symbol's latest bar
+    """
+    width = closes.shape[1]
+    close = closes[:, -1]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        year = slice(max(width - YEAR_BARS, 0), width)
+        high_52w = np.nanmax(highs[:, year], axis=1)
+        low_52w = np.nanmin(lows[:, year], axis=1)
+
+        volume = volumes[:, -1]
+        avg_volume = np.nanmean(volumes[:, -VOLUME_WINDOW - 1:-1], axis=1)
+
+        deltas = np.diff(closes[:, -RSI_PERIOD - 1:], axis=1)
+        gains = np.nanmean(np.maximum(deltas, 0.0), axis=1)
+        losses = np.nanmean(np.maximum(-deltas, 0.0), axis=1)
+        rsi = np.where(losses == 0, 100.0, 100.0 - 100.0 / (1.0 + gains / losses))
+        # Too little history for a full RSI window
+        rsi[np.isnan(closes[:, -RSI_PERIOD - 1])] = np.nan
+
+        return {
+            "close": close,
+            "change": close / closes[:, -2] - 1.0,
+            "return_1m": close / closes[:, -MONTH_BARS - 1] - 1.0,
+            "high_52w": high_52w,
+            "low_52w": low_52w,
+            "from_high": close / high_52w - 1.0,
+            "from_low": close / low_52w - 1.0,
+            "volume": volume,
+            "avg_volume": avg_volume,
+            "volume_ratio": volume / avg_volume,
+            "rsi": rsi,
+            "bars": np.sum(~np.isnan(closes), axis=1).astype(np.float64),
+        }
+
+
+class ScreenerIndex:
+    def __init__(self, capacity: int = 1024):
+        self.symbols: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.columns = {name: np.full(capacity, np.nan) for name in METRICS}
+        self.as_of = np.zeros(capacity, dtype=np.int64)
+        # (version, bars, last timestamp) of the stored series each row came from
+        self.signatures: List[Optional[tuple]] = []
+        self.last_refresh = None
+        self._task = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def _row(self, symbol: str) -> int:
+        row = self.rows.get(symbol)
+        if row is None:
+            row = len(self.symbols)
+            if row == len(self.as_of):
+                for name, values in self.columns.items():
+                    self.columns[name] = np.concatenate([values, np.full(len(values), np.nan)])
+                self.as_of = np.concatenate([self.as_of, np.zeros(len(self.as_of), dtype=np.int64)])
+            self.symbols.append(symbol)
+            self.signatures.append(None)
+            self.rows[symbol] = row
+        return row
+
+    def refresh(self, symbols: Optional[List[str]] = None) -> dict:
+        """
+        Recompute the rows of symbols whose stored daily series changed.
+        Symbols with nothing stored are skipped.
+        """
+        started = time.time()
+        symbols = [s.upper() for s in (symbols if symbols is not None else load_universe())]
+        changed, frames = [], []
+        for symbol in symbols:
+            entry = store.peek(symbol, "1d")
+            if entry is None or entry.frame.empty:
+                continue
+            frame = entry.frame
+            signature = (entry.version, len(frame), int(frame.timestamps[-1]))
+            row = self.rows.get(symbol)
+            if row is not None and self.signatures[row] == signature:
+                continue
+            changed.append((symbol, signature))
+            frames.append(frame.slice(max(len(frame) - YEAR_BARS - 1, 0), len(frame)))
+
+        if frames:
+            width = YEAR_BARS + 1
+            metrics = compute_metrics(
+                _padded([f.prices[:, 3].astype(np.float64) for f in frames], width),
+                _padded([f.prices[:, 1].astype(np.float64) for f in frames], width),
+                _padded([f.prices[:, 2].astype(np.float64) for f in frames], width),
+                _padded([f.volume.astype(np.float64) for f in frames], width),
+            )
+            with self._lock:
+                rows = np.array([self._row(symbol) for symbol, _ in changed])
+                for name, values in metrics.items():
+                    self.columns[name][rows] = values
+                self.as_of[rows] = [int(f.timestamps[-1]) for f in frames]
+                for row, (_, signature) in zip(rows, changed):
+                    self.signatures[row] = signature
+
+        self.last_refresh = {
+            "at": started,
+            "seconds": round(time.time() - started, 3),
+            "universe": len(symbols),
+            "updated": len(changed),
+        }
+        return self.last_refresh
+
+    def needs_refresh(self) -> bool:
+        """Whether the rows are missing or older than one refresh cycle"""
+        return self.last_refresh is None or time.time() - self.last_refresh["at"] > SCREENER_REFRESH_SECONDS
+
+    def query(self, filters: Optional[Dict[str, Dict[str, float]]] = None,
+              sort_by: Optional[str] = None, descending: bool = True,
+              limit: int = 100) -> dict:
+        """
+        Symbols whose metrics satisfy every filter, e.g.
+        {"from_high": {"min": -0.05}, "volume_ratio": {"min": 2}, "rsi": {"min": 30, "max": 70}}.
+        Rows missing a filtered metric never match.
+        """
+        started = time.perf_counter()
+        filters = filters or {}
+        for name in list(filters) + ([sort_by] if sort_by else []):
+            if name not in self.columns:
+                raise ValueError(f"Unknown metric '{name}'. Choose from {METRICS}")
+
+        with self._lock:
+            count = len(self.symbols)
+            columns = {name: values[:count].copy() for name, values in self.columns.items()}
+            as_of = self.as_of[:count].copy()
+            symbols = np.array(self.symbols, dtype=object)
+
+        mask = np.ones(count, dtype=bool)
+        for name, bounds in filters.items():
+            values = columns[name]
+            mask &= ~np.isnan(values)
+            if bounds.get("min") is not None:
+                mask &= values >= bounds["min"]
+            if bounds.get("max") is not None:
+                mask &= values <= bounds["max"]
+
+        matches = np.flatnonzero(mask)
+        if sort_by:
+            keys = columns[sort_by][matches]
+            order = np.argsort(-keys if descending else keys, kind="stable")
+            matches = matches[order]
+        total = len(matches)
+        matches = matches[:limit]
+
+        dates = as_of.view("datetime64[ns]").astype("datetime64[D]").astype(str)
+        results = []
+        for i in matches:
+            row = {"symbol": symbols[i], "as_of": str(dates[i])}
+            for name in METRICS:
+                value = columns[name][i]
+                row[name] = round(float(value), 6) if np.isfinite(value) else None
+            results.append(row)
+
+        return {
+            "universe": count,
+            "matches": total,
+            "results": results,
+            "query_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+    def stale_symbols(self, symbols: List[str]) -> List[str]:
+        """Universe symbols with no fresh stored series, missing ones first"""
+        expiring = sorted((store.expires_in(symbol, "1d"), symbol) for symbol in symbols)
+        return [symbol for remaining, symbol in expiring if remaining <= 0]
+
+    async def run_once(self) -> dict:
+        universe = load_universe()
+        due = self.stale_symbols(universe)[:SCREENER_FETCH_BUDGET]
+        fetched = 0
+        for i in range(0, len(due), SCREENER_BATCH_SIZE):
+            try:
+                stored = await asyncio.to_thread(
+                    get_stock_data_bulk, due[i:i + SCREENER_BATCH_SIZE], SCREENER_PERIOD
+                )
+                fetched += len(stored)
+            except Exception as e:
+                print(f"Screener fetch failed: {str(e)}")
+        summary = await asyncio.to_thread(self.refresh, universe)
+        summary.update({"requested": len(due), "fetched": fetched})
+        return summary
+
+    def refresh_in_background(self) -> bool:
+        """
+        Run one refresh cycle, fetching stale symbols, in a daemon thread,
+        for processes without the background task. False if one is still
+        running.
+        """
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(
+                target=lambda: asyncio.run(self.run_once()), name="screener-refresh", daemon=True
+            )
+            self._thread.start()
+        return True
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(SCREENER_REFRESH_SECONDS)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._task is not None,
+            "symbols": len(self),
+            "metrics": METRICS,
+            "last_refresh": self.last_refresh,
+        }
+
+
+screener_index = ScreenerIndex()
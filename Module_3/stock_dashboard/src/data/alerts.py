@@ -0,0 +1,170 @@
+"""
+Price and percent-move alerts checked on every quote.
+
+Every alert is reduced to a price threshold when it is created: "above"
+alerts fire once the price reaches their threshold, "below" alerts once it
+drops to it. Percent-move alerts are converted using a reference price
+(the latest quote when none is given), e.g. +5% from 100 is "above 105".
+
+Each symbol keeps its "above" and "below" thresholds in two sorted lists.
+On a tick every crossed "above" threshold is in the prefix up to
+bisect_right(price) and every crossed "below" threshold in the suffix from
+bisect_left(price), so a tick costs two binary searches plus the alerts it
+actually fires, however many alerts are registered. Alerts fire once and
+are then removed.
+
+Triggered alerts are kept in a short history and pushed to every alert
+subscriber (see the /ws/alerts endpoint). Alerts live in memory only.
+"""
+import itertools
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections import deque
+from typing import Dict, List, Optional, Set
+
+from src.data.quote_stream import Subscriber
+
+ALERT_KINDS = ["price_above", "price_below", "pct_up", "pct_down"]
+
+# Triggered alerts kept for /api/alerts/triggered
+ALERT_HISTORY_SIZE = int(os.getenv("ALERT_HISTORY_SIZE", "200"))
+
+
+class _SymbolBook:
+    """Sorted thresholds of one symbol with the alert ids in matching order"""
+
+    def __init__(self):
+        self.above: List[tuple] = []  # (threshold, id), ascending
+        self.below: List[tuple] = []
+
+    def __len__(self) -> int:
+        return len(self.above) + len(self.below)
+
+    def add(self, direction: str, threshold: float, alert_id: int):
+        insort(self.above if direction == "above" else self.below, (threshold, alert_id))
+
+    def remove(self, direction: str, threshold: float, alert_id: int):
+        side = self.above if direction == "above" else self.below
+        i = bisect_left(side, (threshold, alert_id))
+        if i < len(side) and side[i] == (threshold, alert_id):
+            del side[i]
+
+    def crossed(self, price: float) -> List[int]:
+        """Pop and return the ids of every alert `price` triggers"""
+        # (price, inf) sorts after every (price, id), so thresholds equal to
+        # the price count as reached
+        hi = bisect_right(self.above, (price, float("inf")))
+        lo = bisect_left(self.below, (price, -1))
+        fired = [alert_id for _, alert_id in self.above[:hi]]
+        fired += [alert_id for _, alert_id in self.below[lo:]]
+        del self.above[:hi]
+        del self.below[lo:]
+        return fired
+
+
+class AlertEngine:
+    def __init__(self, history_size: int = ALERT_HISTORY_SIZE):
+        self._alerts: Dict[int, dict] = {}
+        self._books: Dict[str, _SymbolBook] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self.history = deque(maxlen=history_size)
+        self.subscribers: Set[Subscriber] = set()
+        self.checks = 0
+
+    def add(self, symbol: str, kind: str, value: float,
+            reference: Optional[float] = None, note: str = "") -> dict:
+        """
+        Register an alert. `value` is a price for price_above/price_below and
+        a percentage for pct_up/pct_down, measured from `reference`.
+        """
+        if kind not in ALERT_KINDS:
+            raise ValueError(f"Unknown alert kind '{kind}'. Choose from {ALERT_KINDS}")
+        if kind.startswith("pct"):
+            if reference is None or reference <= 0:
+                raise ValueError("Percent alerts need a positive reference price")
+            if value <= 0:
+                raise ValueError("Percent move must be positive")
+            sign = 1 if kind == "pct_up" else -1
+            threshold = reference * (1 + sign * value / 100)
+        else:
+            if value <= 0:
+                raise ValueError("Price threshold must be positive")
+            threshold = float(value)
+        direction = "above" if kind in ("price_above", "pct_up") else "below"
+
+        symbol = symbol.upper()
+        with self._lock:
+            alert_id = next(self._ids)
+            alert = {
+                "id": alert_id,
+                "symbol": symbol,
+                "kind": kind,
+                "value": value,
+                "reference": reference,
+                "direction": direction,
+                "threshold": round(threshold, 4),
+                "note": note,
+                "created_at": time.time(),
+            }
+            self._alerts[alert_id] = alert
+            self._books.setdefault(symbol, _SymbolBook()).add(direction, alert["threshold"], alert_id)
+        return alert
+
+    def remove(self, alert_id: int) -> Optional[dict]:
+        with self._lock:
+            alert = self._alerts.pop(alert_id, None)
+            if alert is not None:
+                book = self._books[alert["symbol"]]
+                book.remove(alert["direction"], alert["threshold"], alert_id)
+                if not len(book):
+                    del self._books[alert["symbol"]]
+        return alert
+
+    def alerts(self, symbol: Optional[str] = None) -> List[dict]:
+        with self._lock:
+            alerts = list(self._alerts.values())
+        if symbol:
+            alerts = [a for a in alerts if a["symbol"] == symbol.upper()]
+        return alerts
+
+    def check(self, symbol: str, price: float, t: Optional[int] = None) -> List[dict]:
+        """Fire and return every alert on symbol that `price` has reached"""
+        with self._lock:
+            self.checks += 1
+            book = self._books.get(symbol)
+            if book is None:
+                return []
+            fired = [self._alerts.pop(alert_id) for alert_id in book.crossed(price)]
+            if not len(book):
+                del self._books[symbol]
+
+        triggered = []
+        for alert in fired:
+            event = {"type": "alert", **alert, "price": price, "t": t, "triggered_at": time.time()}
+            self.history.append(event)
+            triggered.append(event)
+            for subscriber in list(self.subscribers):
+                subscriber.offer(event, lambda symbols: [])
+        return triggered
+
+    def on_quote(self, symbol: str, quote: dict) -> List[dict]:
+        """Quote hub listener"""
+        if "p" not in quote:
+            return []
+        return self.check(symbol, quote["p"], quote.get("t"))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "alerts": len(self._alerts),
+                "symbols": {symbol: len(book) for symbol, book in self._books.items()},
+                "checks": self.checks,
+                "triggered": len(self.history),
+                "subscribers": len(self.subscribers),
+            }
+
+
+alert_engine = AlertEngine()
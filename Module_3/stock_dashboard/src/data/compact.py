@@ -0,0 +1,139 @@
+"""
+Memory-compact, column-array representation of an OHLCV series.
+
+A DataFrame from the provider holds float64 prices, int64/float64 volume and
+a datetime index, ~48 bytes per bar before pandas overhead. Cached series are
+kept instead as:
+
+- float32 Open/High/Low/Close (plenty for prices quoted to the cent)
+- int32 Volume when every value fits, uint64 otherwise
+- int64 epoch-nanosecond timestamps plus one timezone name
+
+That is 28-32 bytes per bar. Slices are taken on the arrays by position, so
+every period of a symbol shares the same buffers and only the requested rows
+are expanded back into a DataFrame.
+"""
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+COLUMNS = PRICE_COLUMNS + ["Volume"]
+
+# Decimals kept when prices are expanded back to float64
+PRICE_DECIMALS = 4
+
+# Bytes per bar of the equivalent float64 frame (5 columns + int64 index)
+FLOAT64_BYTES_PER_BAR = 8 * len(COLUMNS) + 8
+
+
+def _compact_volume(volume: np.ndarray) -> np.ndarray:
+    """Narrow volume to int32 where safe, uint64 for large integral counts"""
+    volume = np.nan_to_num(volume, nan=0.0)
+    if len(volume) == 0 or volume.min() < 0 or not np.array_equal(volume, np.floor(volume)):
+        return volume.astype(np.float64)
+    if volume.max() < np.iinfo(np.int32).max:
+        return volume.astype(np.int32)
+    return volume.astype(np.uint64)
+
+
+class CompactFrame:
+    def __init__(self, timestamps: np.ndarray, prices: np.ndarray,
+                 volume: np.ndarray, tz: Optional[str]):
+        self.timestamps = timestamps  # int64 epoch ns (UTC when tz is set)
+        self.prices = prices          # float32, shape (bars, 4)
+        self.volume = volume
+        self.tz = tz
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "CompactFrame":
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        return cls(
+            timestamps=index.as_unit("ns").asi8.copy(),
+            prices=df[PRICE_COLUMNS].to_numpy(dtype=np.float32),
+            volume=_compact_volume(df["Volume"].to_numpy(dtype=np.float64)),
+            tz=tz,
+        )
+
+    @classmethod
+    def from_arrays(cls, timestamps: np.ndarray, prices: np.ndarray,
+                    volume: np.ndarray, tz: Optional[str]) -> "CompactFrame":
+        """Build from plain arrays, narrowing prices and volume like from_frame"""
+        return cls(
+            timestamps=np.asarray(timestamps, dtype=np.int64),
+            prices=np.asarray(prices, dtype=np.float32),
+            volume=_compact_volume(np.asarray(volume, dtype=np.float64)),
+            tz=tz,
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.timestamps.nbytes + self.prices.nbytes + self.volume.nbytes
+
+    @property
+    def bytes_per_bar(self) -> float:
+        return self.nbytes / len(self) if len(self) else 0.0
+
+    def equals(self, other: "CompactFrame") -> bool:
+        return (
+            self.tz == other.tz
+            and np.array_equal(self.timestamps, other.timestamps)
+            and np.array_equal(self.prices, other.prices)
+            and np.array_equal(self.volume, other.volume)
+        )
+
+    def position(self, ts: pd.Timestamp, side: str = "left") -> int:
+        """Row position of ts in the sorted timestamps (np.searchsorted semantics)"""
+        if self.tz is not None:
+            ts = ts.tz_localize(self.tz) if ts.tzinfo is None else ts.tz_convert(self.tz)
+        elif ts.tzinfo is not None:
+            ts = ts.tz_convert(None)
+        return int(np.searchsorted(self.timestamps, ts.value, side=side))
+
+    def slice(self, lo: int, hi: int) -> "CompactFrame":
+        """Rows lo:hi as a CompactFrame sharing this frame's arrays"""
+        return CompactFrame(self.timestamps[lo:hi], self.prices[lo:hi], self.volume[lo:hi], self.tz)
+
+    def concat(self, other: "CompactFrame") -> "CompactFrame":
+        """This frame's rows followed by other's (both must share one time zone)"""
+        if self.tz != other.tz:
+            # Naive timestamps are wall-clock, aware ones UTC: mixing them shifts bars
+            raise ValueError(f"Cannot concatenate bars in time zone {self.tz} with bars in {other.tz}")
+        volume = np.concatenate([self.volume.astype(np.float64), other.volume.astype(np.float64)])
+        return CompactFrame(
+            timestamps=np.concatenate([self.timestamps, other.timestamps]),
+            prices=np.concatenate([self.prices, other.prices]),
+            volume=_compact_volume(volume),
+            tz=self.tz,
+        )
+
+    def between(self, start: Optional[pd.Timestamp], end: Optional[pd.Timestamp]) -> pd.DataFrame:
+        """Bars with start <= timestamp <= end (either bound may be None)"""
+        lo = self.position(start, "left") if start is not None else 0
+        hi = self.position(end, "right") if end is not None else len(self)
+        return self.to_frame(lo, hi)
+
+    def tail(self, count: int) -> pd.DataFrame:
+        return self.to_frame(max(len(self) - count, 0), len(self))
+
+    def to_frame(self, lo: int = 0, hi: Optional[int] = None) -> pd.DataFrame:
+        """Expand rows lo:hi back into a float64 OHLCV DataFrame"""
+        timestamps = self.timestamps[lo:hi]
+        if self.tz is not None:
+            index = pd.to_datetime(timestamps, utc=True).tz_convert(self.tz)
+        else:
+            index = pd.to_datetime(timestamps)
+        prices = self.prices[lo:hi].astype(np.float64)
+        np.round(prices, PRICE_DECIMALS, out=prices)
+        df = pd.DataFrame(prices, index=index, columns=PRICE_COLUMNS)
+        df["Volume"] = self.volume[lo:hi]
+        return df
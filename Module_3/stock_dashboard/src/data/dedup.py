@@ -0,0 +1,113 @@
+"""
+Near-duplicate clustering of texts with MinHash and LSH banding.
+
+Each text is reduced to its set of word shingles (DEDUP_SHINGLE words long,
+lowercased, punctuation dropped). Texts with no ASCII words (CJK, emoji or
+punctuation-only headlines) use character shingles of DEDUP_CHAR_SHINGLE
+non-space characters instead, and a text with no shingles at all is a
+cluster of its own. A MinHash signature of DEDUP_PERMUTATIONS
+universal hashes estimates the Jaccard similarity of two shingle sets as
+the fraction of signature slots they agree on.
+
+Signatures are cut into DEDUP_BANDS bands; texts sharing any whole band
+become candidate pairs, which avoids comparing every pair. Candidates whose
+estimated similarity reaches DEDUP_THRESHOLD are joined with union-find, so
+a syndicated story and its lightly edited copies end up in one cluster.
+"""
+import os
+import re
+import zlib
+from typing import List, Optional
+
+import numpy as np
+
+DEDUP_SHINGLE = int(os.getenv("DEDUP_SHINGLE", "3"))
+DEDUP_CHAR_SHINGLE = int(os.getenv("DEDUP_CHAR_SHINGLE", "3"))
+DEDUP_PERMUTATIONS = int(os.getenv("DEDUP_PERMUTATIONS", "128"))
+DEDUP_BANDS = int(os.getenv("DEDUP_BANDS", "16"))
+
+# Estimated Jaccard similarity at which two texts count as the same story
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+
+# Prime just above 2**32 for the (a * x + b) mod p hash family
+_PRIME = np.uint64(4294967311)
+
+_rng = np.random.default_rng(1)
+# a < 2**31 keeps a * x below 2**63 for 32-bit shingle hashes
+_A = _rng.integers(1, 2**31, DEDUP_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, 2**31, DEDUP_PERMUTATIONS, dtype=np.uint64)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _grams(tokens, size: int, sep: str) -> List[str]:
+    if len(tokens) < size:
+        return [sep.join(tokens)] if tokens else []
+    return [sep.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+
+def shingles(text: str, size: int = DEDUP_SHINGLE) -> np.ndarray:
+    """
+    32-bit hashes of the text's distinct word shingles, or of its character
+    shingles when it has no words (empty only for a blank text)
+    """
+    text = text.lower()
+    grams = _grams(_WORD.findall(text), size, " ")
+    if not grams:
+        grams = _grams(list("".join(text.split())), DEDUP_CHAR_SHINGLE, "")
+    return np.unique(np.array([zlib.crc32(g.encode()) for g in grams], dtype=np.uint64))
+
+
+def _minhash(hashes: np.ndarray) -> np.ndarray:
+    return ((np.outer(hashes, _A) + _B) % _PRIME).min(axis=0)
+
+
+def signature(text: str) -> Optional[np.ndarray]:
+    """
+    MinHash signature: per permutation, the smallest hash of any shingle.
+    None for a text with nothing to fingerprint.
+    """
+    hashes = shingles(text)
+    return _minhash(hashes) if len(hashes) else None
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster(texts: List[str], threshold: float = DEDUP_THRESHOLD) -> List[List[int]]:
+    """
+    Group near-duplicate texts. Returns clusters of input positions, each in
+    input order, ordered by their first member. Texts with nothing to
+    fingerprint are never grouped with another.
+    """
+    if not texts:
+        return []
+    fingerprinted = [(i, sig) for i, sig in enumerate(map(signature, texts)) if sig is not None]
+    positions = [i for i, _ in fingerprinted]
+    signatures = np.full((len(texts), DEDUP_PERMUTATIONS), _PRIME, dtype=np.uint64)
+    for i, sig in fingerprinted:
+        signatures[i] = sig
+    rows = DEDUP_PERMUTATIONS // DEDUP_BANDS
+    parent = list(range(len(texts)))
+
+    for band in range(DEDUP_BANDS):
+        buckets = {}
+        for i in positions:
+            buckets.setdefault(bytes(signatures[i, band * rows:(band + 1) * rows]), []).append(i)
+        for members in buckets.values():
+            first = members[0]
+            for other in members[1:]:
+                root_a, root_b = _find(parent, first), _find(parent, other)
+                if root_a == root_b:
+                    continue
+                if np.mean(signatures[first] == signatures[other]) >= threshold:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    clusters = {}
+    for i in range(len(texts)):
+        clusters.setdefault(_find(parent, i), []).append(i)
+    return list(clusters.values())
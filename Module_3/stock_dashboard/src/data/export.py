@@ -0,0 +1,148 @@
+"""
+Streaming bulk export of stored OHLCV history.
+
+Symbols are exported one after another. Each symbol's rows are taken as a
+CompactFrame view and expanded EXPORT_CHUNK_ROWS at a time, so only one
+chunk is ever materialised as a DataFrame and encoded output is yielded as
+soon as each chunk is written. Stored series are reused, but symbols
+fetched only for the export are not saved, so a large export does not
+leave its whole universe resident in the store.
+
+Formats:
+- csv: one header line, then symbol,timestamp,open,high,low,close,volume rows
+- ndjson: one JSON object per bar, missing values as null
+- parquet: one row group per chunk (requires pyarrow)
+"""
+import io
+import json
+import os
+from typing import Iterator, List, Optional
+
+import pandas as pd
+
+from src.data.stock_data import SUPPORTED_INTERVALS, get_compact_data
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "50000"))
+
+# Largest symbol list accepted per export
+EXPORT_MAX_SYMBOLS = int(os.getenv("EXPORT_MAX_SYMBOLS", "1000"))
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+FIELDS = ["symbol", "timestamp", "open", "high", "low", "close", "volume"]
+
+
+def _chunks(symbols: List[str], period: str, start, end, interval: str) -> Iterator[pd.DataFrame]:
+    """Export rows as DataFrames of at most EXPORT_CHUNK_ROWS bars"""
+    for symbol in symbols:
+        try:
+            frame = get_compact_data(symbol, period, start, end, interval, keep=False)
+        except Exception as e:
+            # A bad symbol must not abort a stream that is already under way
+            print(f"Export skipped {symbol}: {str(e)}")
+            continue
+        for lo in range(0, len(frame), EXPORT_CHUNK_ROWS):
+            df = frame.to_frame(lo, min(lo + EXPORT_CHUNK_ROWS, len(frame)))
+            df.columns = [name.lower() for name in df.columns]
+            df.index.name = "timestamp"
+            df = df.reset_index()
+            df.insert(0, "symbol", symbol)
+            yield df
+
+
+def _csv(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    yield (",".join(FIELDS) + "\n").encode()
+    for df in chunks:
+        yield df.to_csv(index=False, header=False).encode()
+
+
+def _ndjson(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    for df in chunks:
+        df["timestamp"] = df["timestamp"].map(pd.Timestamp.isoformat)
+        # Missing prices or volume as null: bare NaN is not valid JSON
+        df = df.astype(object).where(df.notna(), None)
+        lines = (json.dumps(record) for record in df.to_dict(orient="records"))
+        yield ("\n".join(lines) + "\n").encode()
+
+
+class _Drain(io.RawIOBase):
+    """Write-only file that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._parts = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def _parquet(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    sink = _Drain()
+    writer = None
+    for df in chunks:
+        # One schema per file: instants as UTC, volume as float64 whatever
+        # width each symbol's volume was stored in
+        df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
+        df["volume"] = df["volume"].astype("float64")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema)
+        else:
+            table = table.cast(writer.schema)
+        writer.write_table(table)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+        yield sink.drain()
+
+
+ENCODERS = {
+    "csv": _csv,
+    "ndjson": _ndjson,
+    "parquet": _parquet,
+}
+
+
+def export_stream(symbols: List[str], fmt: str = "csv", period: str = "max",
+                  start: Optional[str] = None, end: Optional[str] = None,
+                  interval: str = "1d") -> Iterator[bytes]:
+    """
+    Encoded export of every symbol's bars, yielded chunk by chunk.
+    Raises ValueError up front for bad arguments; symbols that fail to load
+    once streaming has started are skipped.
+    """
+    if fmt not in ENCODERS:
+        raise ValueError(f"Unsupported format '{fmt}'. Choose from {list(ENCODERS)}")
+    if fmt == "parquet":
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow")
+    if interval not in SUPPORTED_INTERVALS:
+        raise ValueError(f"Unsupported interval '{interval}'. Choose from {SUPPORTED_INTERVALS}")
+    symbols = list(dict.fromkeys(s.strip().upper() for s in symbols if s.strip()))
+    if not symbols:
+        raise ValueError("At least one symbol is required")
+    if len(symbols) > EXPORT_MAX_SYMBOLS:
+        raise ValueError(f"Export of {len(symbols)} symbols exceeds the limit of {EXPORT_MAX_SYMBOLS}")
+    return ENCODERS[fmt](_chunks(symbols, period, start, end, interval))
@@ -0,0 +1,209 @@
+"""
+Hedged provider requests.
+
+Without hedging, Alpha Vantage is only asked after yfinance has failed,
+which can take yfinance's whole timeout. With HEDGE_ENABLED=true a daily
+fetch starts on yfinance and, if it has not answered within the
+HEDGE_PERCENTILE latency of recent yfinance fetches, the same request is
+also sent to Alpha Vantage; whichever succeeds first is used. Only
+requests within reach of Alpha Vantage's compact (~100 session) output
+are hedged, since a longer window would be answered short.
+
+Alpha Vantage's free tier allows only a handful of calls, so hedges are
+limited per minute and per day (fallback calls count against the same
+budget), and to HEDGE_MAX_RATIO of primary fetches.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Optional
+
+import numpy as np
+
+HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+
+# Hedge once the primary is slower than this percentile of its recent fetches
+HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))
+HEDGE_MIN_DELAY = float(os.getenv("HEDGE_MIN_DELAY", "0.5"))
+# Delay used until enough primary latencies have been seen
+HEDGE_DEFAULT_DELAY = float(os.getenv("HEDGE_DEFAULT_DELAY", "2.0"))
+HEDGE_MIN_SAMPLES = 20
+HEDGE_WINDOW = 200
+
+# Alpha Vantage budget (free tier: 5 calls per minute, 25 per day)
+HEDGE_MAX_PER_MINUTE = int(os.getenv("HEDGE_MAX_PER_MINUTE", "5"))
+HEDGE_MAX_PER_DAY = int(os.getenv("HEDGE_MAX_PER_DAY", "25"))
+# Most hedges as a fraction of primary fetches
+HEDGE_MAX_RATIO = float(os.getenv("HEDGE_MAX_RATIO", "0.1"))
+
+
+class HedgeFailed(Exception):
+    """Raised when a hedge was sent and both providers failed"""
+
+
+class LatencyTracker:
+    """Latencies of the last `window` successful calls"""
+
+    def __init__(self, window: int = HEDGE_WINDOW):
+        self.samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self.samples) < HEDGE_MIN_SAMPLES:
+                return None
+            return float(np.percentile(self.samples, q))
+
+
+class CallBudget:
+    """Sliding per-minute and per-day limits on calls to a metered provider"""
+
+    def __init__(self, per_minute: int = HEDGE_MAX_PER_MINUTE, per_day: int = HEDGE_MAX_PER_DAY):
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.calls = deque()
+        self._lock = threading.Lock()
+
+    def _used(self, now: float, seconds: float) -> int:
+        return sum(1 for at in self.calls if at > now - seconds)
+
+    def _trim(self, now: float):
+        while self.calls and self.calls[0] <= now - 86400:
+            self.calls.popleft()
+
+    def record(self):
+        """Count a call made regardless of the budget (e.g. a plain fallback)"""
+        with self._lock:
+            self.calls.append(time.time())
+
+    def try_acquire(self) -> bool:
+        """Count a call if both limits allow it"""
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            if len(self.calls) >= self.per_day or self._used(now, 60) >= self.per_minute:
+                return False
+            self.calls.append(now)
+            return True
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._lock:
+            self._trim(now)
+            return {
+                "last_minute": self._used(now, 60),
+                "last_day": len(self.calls),
+                "per_minute": self.per_minute,
+                "per_day": self.per_day,
+            }
+
+
+class HedgedFetcher:
+    def __init__(self):
+        self.latency = LatencyTracker()
+        self.budget = CallBudget()
+        self.primary_calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.skipped = 0
+        self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+
+    def delay(self) -> float:
+        observed = self.latency.percentile(HEDGE_PERCENTILE)
+        if observed is None:
+            return HEDGE_DEFAULT_DELAY
+        return max(observed, HEDGE_MIN_DELAY)
+
+    def timed(self, primary: Callable):
+        """Run the primary, recording its latency when it succeeds"""
+        started = time.time()
+        result = primary()
+        self.latency.record(time.time() - started)
+        return result
+
+    def _may_hedge(self) -> bool:
+        with self._lock:
+            # One hedge of headroom so a cold start can still hedge
+            if self.hedges >= HEDGE_MAX_RATIO * self.primary_calls + 1:
+                self.skipped += 1
+                return False
+        if not self.budget.try_acquire():
+            with self._lock:
+                self.skipped += 1
+            return False
+        with self._lock:
+            self.hedges += 1
+        return True
+
+    @staticmethod
+    def _late(callback: Callable):
+        def done(future):
+            if future.exception() is None:
+                try:
+                    callback(future.result())
+                except Exception as e:
+                    print(f"Late primary result was not kept: {str(e)}")
+        return done
+
+    def fetch(self, primary: Callable, secondary: Callable,
+              on_late_primary: Optional[Callable] = None):
+        """
+        Run primary, hedging with secondary once it is slower than the
+        hedge delay. Returns (result, "primary" | "secondary").
+
+        Errors from the primary are raised unchanged when no hedge was sent,
+        so the caller's normal fallback still applies. `on_late_primary` is
+        called with the primary's result if it completes after losing.
+        """
+        with self._lock:
+            self.primary_calls += 1
+        primary_future = self._executor.submit(self.timed, primary)
+        done, _ = wait([primary_future], timeout=self.delay())
+        if done or not self._may_hedge():
+            return primary_future.result(), "primary"
+
+        secondary_future = self._executor.submit(secondary)
+        labels = {primary_future: "primary", secondary_future: "secondary"}
+        pending = set(labels)
+        errors = {}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if labels[future] == "secondary":
+                        with self._lock:
+                            self.hedge_wins += 1
+                        if on_late_primary is not None and primary_future in pending:
+                            primary_future.add_done_callback(self._late(on_late_primary))
+                    return future.result(), labels[future]
+                errors[labels[future]] = future.exception()
+        raise HedgeFailed(
+            f"Both providers failed. primary error: {str(errors['primary'])}, "
+            f"secondary error: {str(errors['secondary'])}"
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = {
+                "enabled": HEDGE_ENABLED,
+                "primary_calls": self.primary_calls,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "skipped_over_budget": self.skipped,
+            }
+        return {
+            **counts,
+            "delay_seconds": round(self.delay(), 3),
+            "samples": len(self.latency.samples),
+            "alpha_vantage_budget": self.budget.stats(),
+        }
+
+
+hedged_fetcher = HedgedFetcher()
@@ -0,0 +1,86 @@
+"""
+Resident transformer pipelines shared by every NLP feature.
+
+Loading a HuggingFace pipeline reads hundreds of megabytes of weights, so
+each (task, model) pipeline is built once per process on first use and
+kept for the life of the process. Concurrent first requests wait for the
+same load instead of each building their own copy.
+"""
+import os
+import threading
+import time
+from typing import Dict, Tuple
+
+from src.utils.profiling import stage
+
+SUMMARIZATION_MODEL = os.getenv("SUMMARIZATION_MODEL", "facebook/bart-large-cnn")
+
+# Small (82M parameter) classifier fine-tuned on financial news
+SENTIMENT_MODEL = os.getenv(
+    "SENTIMENT_MODEL",
+    "mrm8488/distilroberta-finetuned-financial-news-sentiment-analysis"
+)
+
+_pipelines: Dict[Tuple[str, str], object] = {}
+_load_seconds: Dict[Tuple[str, str], float] = {}
+_load_locks: Dict[Tuple[str, str], threading.Lock] = {}
+_lock = threading.Lock()
+
+
+def get_pipeline(task: str, model: str):
+    """The resident pipeline for task/model, loading it on first use"""
+    key = (task, model)
+    pipe = _pipelines.get(key)
+    if pipe is not None:
+        return pipe
+    with _lock:
+        load_lock = _load_locks.setdefault(key, threading.Lock())
+    with load_lock:
+        pipe = _pipelines.get(key)
+        if pipe is None:
+            from transformers import pipeline
+
+            started = time.perf_counter()
+            with stage("model_load"):
+                pipe = pipeline(task, model=model)
+            _load_seconds[key] = round(time.perf_counter() - started, 2)
+            _pipelines[key] = pipe
+    return pipe
+
+
+def summarizer():
+    return get_pipeline("summarization", SUMMARIZATION_MODEL)
+
+
+def sentiment_classifier():
+    return get_pipeline("text-classification", SENTIMENT_MODEL)
+
+
+# Pipelines loaded by preload(), comma-separated ("summarization", "sentiment")
+PRELOAD_MODELS = [m.strip() for m in os.getenv("PRELOAD_MODELS", "summarization,sentiment").split(",") if m.strip()]
+
+_LOADERS = {
+    "summarization": summarizer,
+    "sentiment": sentiment_classifier,
+}
+
+
+def preload(names=None):
+    """
+    Load pipelines up front, e.g. in a server's master process before it
+    forks workers so they all share the weights copy-on-write
+    """
+    for name in PRELOAD_MODELS if names is None else names:
+        if name not in _LOADERS:
+            raise ValueError(f"Unknown model '{name}'. Choose from {list(_LOADERS)}")
+        _LOADERS[name]()
+
+
+def stats() -> dict:
+    """Pipelines currently resident and how long each took to load"""
+    return {
+        "loaded": [
+            {"task": task, "model": model, "load_seconds": _load_seconds.get((task, model))}
+            for task, model in list(_pipelines)
+        ]
+    }
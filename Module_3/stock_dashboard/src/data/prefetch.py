@@ -0,0 +1,95 @@
+"""
+Background refresh of the watchlist so user requests hit a warm store.
+
+While the market is open the scheduler wakes every PREFETCH_OPEN_SECONDS and
+refreshes the watchlist symbols whose stored series would go stale before the
+next wake-up, soonest first. At most PREFETCH_BUDGET symbols are fetched per
+cycle, all in one bulk download. While the market is closed a single fetch
+after the close keeps a series fresh until the next open, so the scheduler
+only checks in every PREFETCH_CLOSED_SECONDS.
+
+Disabled unless PREFETCH_ENABLED=true.
+"""
+import asyncio
+import os
+import time
+
+from src.data import store
+from src.data.stock_data import get_stock_data_bulk
+from src.data.watchlist import watchlist
+from src.utils.market_hours import is_market_open
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+PREFETCH_OPEN_SECONDS = int(os.getenv("PREFETCH_OPEN_SECONDS", "60"))
+PREFETCH_CLOSED_SECONDS = int(os.getenv("PREFETCH_CLOSED_SECONDS", "900"))
+PREFETCH_BUDGET = int(os.getenv("PREFETCH_BUDGET", "50"))
+PREFETCH_PERIOD = os.getenv("PREFETCH_PERIOD", "1y")
+
+
+class PrefetchScheduler:
+    def __init__(self, budget: int = PREFETCH_BUDGET, period: str = PREFETCH_PERIOD):
+        self.budget = budget
+        self.period = period
+        self._task = None
+        self.last_run = None
+
+    def cadence(self) -> int:
+        return PREFETCH_OPEN_SECONDS if is_market_open() else PREFETCH_CLOSED_SECONDS
+
+    def due_symbols(self, horizon: float) -> list:
+        """Watchlist symbols going stale within `horizon` seconds, soonest first"""
+        expiring = []
+        for symbol in watchlist():
+            remaining = store.expires_in(symbol, "1d")
+            if remaining <= horizon:
+                expiring.append((remaining, symbol))
+        expiring.sort()
+        return [symbol for _, symbol in expiring[:self.budget]]
+
+    async def run_once(self) -> dict:
+        started = time.time()
+        # Leave headroom for the fetch itself so nothing expires mid-cycle
+        due = await asyncio.to_thread(self.due_symbols, self.cadence() * 1.5)
+        stored = {}
+        if due:
+            try:
+                stored = await asyncio.to_thread(get_stock_data_bulk, due, self.period)
+            except Exception as e:
+                print(f"Prefetch failed: {str(e)}")
+        self.last_run = {
+            "at": started,
+            "seconds": round(time.time() - started, 3),
+            "requested": due,
+            "refreshed": sorted(stored)
+        }
+        return self.last_run
+
+    async def _loop(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.cadence())
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._task is not None,
+            "budget": self.budget,
+            "cadence_seconds": self.cadence(),
+            "watchlist": watchlist(),
+            "last_run": self.last_run
+        }
+
+
+prefetch_scheduler = PrefetchScheduler()
@@ -0,0 +1,171 @@
+"""
+Multi-resolution pyramid of OHLCV aggregates per symbol.
+
+Each stored daily series gets weekly, monthly and quarterly levels, built
+with one reduceat pass per level over the compact daily arrays. A bucket is
+labelled with the timestamp of its first daily bar.
+
+Levels are updated incrementally: when the daily series only gained or
+revised bars at its end, every completed bucket is kept and just the daily
+bars from the start of each level's last bucket onwards are re-aggregated.
+Any other change (e.g. older history merged in) rebuilds the levels.
+
+Pyramids are brought up to date when daily bars are ingested (on_bars is a
+store listener), so reads find them current. A symbol's first pyramid is
+built on its first read, and levels_for still catches up with a series
+another worker stored through the shared cache.
+
+choose_level picks the coarsest level that still gives at least one bar
+per pixel of the chart, so zoomed-out charts of long histories stay small.
+"""
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data import store
+from src.data.compact import CompactFrame
+
+LEVELS = ["1d", "1wk", "1mo", "3mo"]
+
+# Bars per calendar day at each level
+BARS_PER_DAY = {
+    "1d": 252 / 365.25,
+    "1wk": 52 / 365.25,
+    "1mo": 12 / 365.25,
+    "3mo": 4 / 365.25,
+}
+
+NS_PER_DAY = 86_400 * 10**9
+
+
+def _bucket_ids(frame: CompactFrame, level: str) -> np.ndarray:
+    """Bucket number of every daily bar at `level`, in exchange-local dates"""
+    index = pd.to_datetime(frame.timestamps, utc=frame.tz is not None)
+    if frame.tz is not None:
+        index = index.tz_convert(frame.tz).tz_localize(None)
+    if level == "1wk":
+        # 1970-01-01 was a Thursday; shift so weeks start on Monday
+        days = index.normalize().asi8 // NS_PER_DAY
+        return (days + 3) // 7
+    months = index.year.to_numpy() * 12 + index.month.to_numpy() - 1
+    if level == "1mo":
+        return months
+    return months // 3
+
+
+def aggregate(frame: CompactFrame, level: str) -> CompactFrame:
+    """Daily bars rolled up to `level`"""
+    if level == "1d" or frame.empty:
+        return frame
+    ids = _bucket_ids(frame, level)
+    starts = np.flatnonzero(np.concatenate([[True], ids[1:] != ids[:-1]]))
+    ends = np.concatenate([starts[1:], [len(ids)]]) - 1
+    prices = frame.prices
+    return CompactFrame.from_arrays(
+        timestamps=frame.timestamps[starts],
+        prices=np.column_stack([
+            prices[starts, 0],
+            np.maximum.reduceat(prices[:, 1], starts),
+            np.minimum.reduceat(prices[:, 2], starts),
+            prices[ends, 3],
+        ]),
+        volume=np.add.reduceat(frame.volume.astype(np.float64), starts),
+        tz=frame.tz,
+    )
+
+
+def choose_level(start: pd.Timestamp, end: pd.Timestamp, width: int) -> str:
+    """Coarsest level with at least one bar per pixel over start..end"""
+    days = max((end - start).total_seconds() / 86_400, 1.0)
+    for level in reversed(LEVELS):
+        if days * BARS_PER_DAY[level] >= width:
+            return level
+    return "1d"
+
+
+class Pyramid:
+    def __init__(self):
+        self.daily: Optional[CompactFrame] = None
+        self.levels: Dict[str, CompactFrame] = {}
+        # Daily row where each level's last (possibly incomplete) bucket starts
+        self._last_bucket: Dict[str, int] = {}
+
+    def _prefix_unchanged(self, daily: CompactFrame, rows: int) -> bool:
+        old = self.daily
+        return (
+            old is not None
+            and old.tz == daily.tz
+            and len(daily) >= rows
+            and np.array_equal(old.timestamps[:rows], daily.timestamps[:rows])
+            and np.array_equal(old.prices[:rows], daily.prices[:rows])
+            and np.array_equal(old.volume[:rows], daily.volume[:rows])
+        )
+
+    def update(self, daily: CompactFrame) -> Dict[str, int]:
+        """
+        Bring every level in line with `daily`. Returns the number of daily
+        bars re-aggregated per level.
+        """
+        work = {}
+        for level in LEVELS[1:]:
+            keep_from = self._last_bucket.get(level)
+            if keep_from is not None and self._prefix_unchanged(daily, keep_from):
+                tail = aggregate(daily.slice(keep_from, len(daily)), level)
+                kept = self.levels[level]
+                self.levels[level] = kept.slice(0, len(kept) - 1).concat(tail)
+                work[level] = len(daily) - keep_from
+            else:
+                self.levels[level] = aggregate(daily, level)
+                work[level] = len(daily)
+            last = self.levels[level]
+            self._last_bucket[level] = int(np.searchsorted(daily.timestamps, last.timestamps[-1])) if len(last) else 0
+        self.levels["1d"] = daily
+        self.daily = daily
+        return work
+
+
+_pyramids: Dict[str, tuple] = {}
+_lock = threading.Lock()
+
+
+def _update(key: str, entry: store.StoreEntry, create: bool) -> Dict[str, CompactFrame]:
+    """
+    Bring key's pyramid in line with entry, creating it only if `create`.
+    Returns its levels (empty when there is no pyramid).
+    """
+    signature = (entry.version, len(entry.frame), int(entry.frame.timestamps[-1]))
+    with _lock:
+        pyramid, built_from = _pyramids.get(key, (None, None))
+        if pyramid is None:
+            if not create:
+                return {}
+            pyramid = Pyramid()
+        if built_from != signature:
+            pyramid.update(entry.frame)
+            _pyramids[key] = (pyramid, signature)
+        return dict(pyramid.levels)
+
+
+def on_bars(symbol: str, interval: str, frame: CompactFrame):
+    """
+    Store listener: update the symbol's pyramid, if it has one, as soon as
+    its daily series changes instead of on the next zoomed read
+    """
+    if interval != "1d" or symbol.upper() not in _pyramids:
+        return
+    entry = store.peek(symbol, "1d")
+    if entry is not None and not entry.frame.empty:
+        _update(symbol.upper(), entry, create=False)
+
+
+def levels_for(symbol: str) -> Dict[str, CompactFrame]:
+    """
+    Pyramid levels for a symbol's stored daily series, built on first use.
+    Empty when nothing is stored.
+    """
+    entry = store.peek(symbol, "1d")
+    if entry is None or entry.frame.empty:
+        return {}
+    return _update(symbol.upper(), entry, create=True)
@@ -0,0 +1,169 @@
+"""
+Live quote fan-out for WebSocket subscribers.
+
+Each symbol has exactly one poller per worker no matter how many clients
+watch it, and the workers of a node share each poll through the shared
+cache. The poller asks the provider for the latest quote and, when price or
+volume changed, publishes a compact delta frame to every subscriber of the
+symbol.
+
+Listeners (e.g. the alert engine) are called with every published quote,
+and symbols can be pinned so they keep being polled with no subscribers.
+
+Every subscriber owns a bounded queue. A client that falls behind does not
+hold up the others: when its queue overflows the queued deltas are dropped
+and replaced with one snapshot per symbol, so it resynchronises without the
+server buffering an unbounded backlog.
+"""
+import asyncio
+import os
+from typing import Callable, Dict, List, Optional, Set
+
+from src.data import shared_cache
+from src.data.stock_data import get_latest_quote
+
+# Seconds between provider polls for a watched symbol
+QUOTE_POLL_SECONDS = float(os.getenv("QUOTE_POLL_SECONDS", "5"))
+
+# Frames a subscriber may have queued before it is resynchronised
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("QUOTE_QUEUE_SIZE", "100"))
+
+QUOTE_FIELDS = ("p", "v")
+
+
+class Subscriber:
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.symbols: Set[str] = set()
+        self.resyncs = 0
+
+    def offer(self, frame: dict, snapshots: Callable[[Set[str]], list]):
+        """Queue a frame, resynchronising with snapshots if the queue is full"""
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.resyncs += 1
+            for snapshot in snapshots(self.symbols)[:self.queue.maxsize]:
+                self.queue.put_nowait(snapshot)
+
+    async def next_frame(self) -> dict:
+        return await self.queue.get()
+
+
+class QuoteHub:
+    def __init__(self, fetch_quote: Callable[[str], dict] = get_latest_quote,
+                 poll_seconds: float = QUOTE_POLL_SECONDS):
+        self.fetch_quote = fetch_quote
+        self.poll_seconds = poll_seconds
+        self._subscribers: Dict[str, Set[Subscriber]] = {}
+        self._pollers: Dict[str, asyncio.Task] = {}
+        self._last: Dict[str, dict] = {}
+        self._pinned: Dict[str, int] = {}
+        self._listeners: List[Callable[[str, dict], None]] = []
+
+    def add_listener(self, listener: Callable[[str, dict], None]):
+        """Call listener(symbol, quote) for every quote that changed"""
+        self._listeners.append(listener)
+
+    def _ensure_poller(self, symbol: str):
+        if symbol not in self._pollers:
+            self._pollers[symbol] = asyncio.create_task(self._poll(symbol))
+
+    def _release_poller(self, symbol: str):
+        if symbol in self._subscribers or self._pinned.get(symbol):
+            return
+        poller = self._pollers.pop(symbol, None)
+        if poller:
+            poller.cancel()
+
+    def pin(self, symbol: str):
+        """Keep polling symbol until a matching unpin, even with no subscribers"""
+        symbol = symbol.upper()
+        self._pinned[symbol] = self._pinned.get(symbol, 0) + 1
+        self._ensure_poller(symbol)
+
+    def unpin(self, symbol: str):
+        symbol = symbol.upper()
+        count = self._pinned.get(symbol, 0) - 1
+        if count > 0:
+            self._pinned[symbol] = count
+        else:
+            self._pinned.pop(symbol, None)
+            self._release_poller(symbol)
+
+    def snapshot(self, symbol: str) -> Optional[dict]:
+        quote = self._last.get(symbol)
+        if quote is None:
+            return None
+        return {"type": "snapshot", "s": symbol, **quote}
+
+    def _snapshots(self, symbols: Set[str]) -> list:
+        return [frame for frame in (self.snapshot(s) for s in symbols) if frame]
+
+    def subscribe(self, subscriber: Subscriber, symbol: str):
+        symbol = symbol.upper()
+        subscriber.symbols.add(symbol)
+        self._subscribers.setdefault(symbol, set()).add(subscriber)
+        snapshot = self.snapshot(symbol)
+        if snapshot:
+            subscriber.offer(snapshot, self._snapshots)
+        self._ensure_poller(symbol)
+
+    def unsubscribe(self, subscriber: Subscriber, symbol: Optional[str] = None):
+        """Drop one symbol, or every symbol when none is given"""
+        symbols = [symbol.upper()] if symbol else list(subscriber.symbols)
+        for sym in symbols:
+            subscriber.symbols.discard(sym)
+            watchers = self._subscribers.get(sym)
+            if watchers is None:
+                continue
+            watchers.discard(subscriber)
+            if not watchers:
+                # Last watcher gone: stop polling the provider for it
+                del self._subscribers[sym]
+                self._release_poller(sym)
+
+    def publish(self, symbol: str, quote: dict):
+        """Record a quote and fan out whatever changed since the last one"""
+        previous = self._last.get(symbol)
+        changed = {
+            field: quote[field] for field in QUOTE_FIELDS
+            if previous is None or previous.get(field) != quote[field]
+        }
+        if not changed:
+            return
+        self._last[symbol] = quote
+        frame = {"type": "delta", "s": symbol, "t": quote["t"], **changed}
+        for subscriber in list(self._subscribers.get(symbol, ())):
+            subscriber.offer(frame, self._snapshots)
+        for listener in self._listeners:
+            try:
+                listener(symbol, quote)
+            except Exception as e:
+                print(f"Quote listener failed for {symbol}: {str(e)}")
+
+    async def _poll(self, symbol: str):
+        while True:
+            try:
+                # Workers watching the same symbol share one provider poll
+                quote = await asyncio.to_thread(
+                    shared_cache.shared_quote, symbol, self.poll_seconds, self.fetch_quote
+                )
+                self.publish(symbol, quote)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Quote poll failed for {symbol}: {str(e)}")
+            await asyncio.sleep(self.poll_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "symbols": sorted(self._pollers),
+            "subscribers": {s: len(w) for s, w in self._subscribers.items()},
+            "pinned": dict(self._pinned)
+        }
+
+
+quote_hub = QuoteHub()
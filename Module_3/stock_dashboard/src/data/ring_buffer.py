@@ -0,0 +1,102 @@
+"""
+Fixed-capacity ring buffer of OHLCV bars.
+
+Intraday series grow all day long, so each symbol/interval keeps its bars in
+preallocated NumPy arrays. Once the buffer is full the oldest bars are
+overwritten, which keeps memory flat no matter how many symbols are tracked.
+"""
+import time
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+class BarRingBuffer:
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Ring buffer capacity must be positive")
+        self.capacity = capacity
+        # Epoch nanoseconds (UTC) and one row of OHLCV per bar
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, len(COLUMNS)), dtype=np.float64)
+        self.start = 0
+        self.size = 0
+        self.tz: Optional[str] = None
+        self.updated_at = 0.0
+        # Bumped whenever a bar is appended or revised
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        if self.size == 0:
+            return None
+        return int(self.timestamps[(self.start + self.size - 1) % self.capacity])
+
+    def extend(self, df: pd.DataFrame):
+        """
+        Append bars newer than the last stored one. A bar with the same
+        timestamp as the last stored bar replaces it, since the provider
+        keeps revising the bar that is still forming.
+        """
+        with self._lock:
+            self.updated_at = time.time()
+            if df is not None and not df.empty:
+                self._append(df)
+
+    def _append(self, df: pd.DataFrame):
+        index = pd.DatetimeIndex(df.index)
+        if self.tz is None and index.tz is not None:
+            self.tz = str(index.tz)
+        timestamps = index.as_unit("ns").asi8
+        values = df[COLUMNS].to_numpy(dtype=np.float64)
+
+        last = self.last_timestamp
+        if last is not None:
+            newer = timestamps >= last
+            timestamps, values = timestamps[newer], values[newer]
+            if len(timestamps) and timestamps[0] == last:
+                slot = (self.start + self.size - 1) % self.capacity
+                if not np.array_equal(self.values[slot], values[0]):
+                    self.values[slot] = values[0]
+                    self.version += 1
+                timestamps, values = timestamps[1:], values[1:]
+
+        count = len(timestamps)
+        if count == 0:
+            return
+        self.version += 1
+        if count >= self.capacity:
+            self.timestamps[:] = timestamps[-self.capacity:]
+            self.values[:] = values[-self.capacity:]
+            self.start, self.size = 0, self.capacity
+            return
+
+        end = (self.start + self.size) % self.capacity
+        positions = (end + np.arange(count)) % self.capacity
+        self.timestamps[positions] = timestamps
+        self.values[positions] = values
+        new_size = self.size + count
+        if new_size > self.capacity:
+            self.start = (self.start + new_size - self.capacity) % self.capacity
+            new_size = self.capacity
+        self.size = new_size
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the stored bars, oldest first, as an OHLCV DataFrame"""
+        with self._lock:
+            order = (self.start + np.arange(self.size)) % self.capacity
+            timestamps = self.timestamps[order]
+            values = self.values[order]
+        if self.tz is not None:
+            index = pd.to_datetime(timestamps, utc=True).tz_convert(self.tz)
+        else:
+            index = pd.to_datetime(timestamps)
+        return pd.DataFrame(values, index=index, columns=COLUMNS)
@@ -0,0 +1,109 @@
+"""
+Batched sentiment scoring of financial news.
+
+Texts are keyed by a SHA-256 of their whitespace-normalised content. Repeats
+within a request and texts scored by earlier requests are answered from an
+in-memory LRU cache; only the remaining texts go through the resident
+classifier, SENTIMENT_BATCH_SIZE at a time.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import List
+
+from src.data.models import sentiment_classifier
+from src.utils import deadline
+from src.utils.deadline import DeadlineExceeded
+from src.utils.profiling import stage
+
+SENTIMENT_BATCH_SIZE = int(os.getenv("SENTIMENT_BATCH_SIZE", "32"))
+
+# Scored texts remembered across requests
+SENTIMENT_CACHE_SIZE = int(os.getenv("SENTIMENT_CACHE_SIZE", "10000"))
+
+# Most texts accepted per request
+SENTIMENT_MAX_TEXTS = int(os.getenv("SENTIMENT_MAX_TEXTS", "500"))
+
+_cache: "OrderedDict[str, dict]" = OrderedDict()
+_lock = threading.Lock()
+_counts = {"hits": 0, "scored": 0}
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(" ".join(text.split()).encode()).hexdigest()
+
+
+def _cached(key: str):
+    with _lock:
+        result = _cache.get(key)
+        if result is not None:
+            _cache.move_to_end(key)
+        return result
+
+
+def _remember(key: str, result: dict):
+    with _lock:
+        _cache[key] = result
+        _cache.move_to_end(key)
+        while len(_cache) > SENTIMENT_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def score_sentiment(texts: List[str]) -> dict:
+    """
+    Sentiment label ("positive", "negative" or "neutral") and confidence for
+    each text, in input order, plus how many were served from the cache.
+    """
+    if not texts:
+        raise ValueError("At least one text is required")
+    if len(texts) > SENTIMENT_MAX_TEXTS:
+        raise ValueError(f"{len(texts)} texts exceeds the limit of {SENTIMENT_MAX_TEXTS} per request")
+    if any(not text.strip() for text in texts):
+        raise ValueError("Texts must not be empty")
+
+    keys = [content_hash(text) for text in texts]
+    results = {}
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key in results or key in pending:
+            continue
+        cached = _cached(key)
+        if cached is not None:
+            results[key] = cached
+        else:
+            pending[key] = text
+    hits = len(results)
+
+    if pending:
+        try:
+            deadline.check("sentiment scoring")
+            classifier = sentiment_classifier()
+            with stage("sentiment"):
+                outputs = classifier(
+                    list(pending.values()),
+                    batch_size=SENTIMENT_BATCH_SIZE,
+                    truncation=True
+                )
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise Exception(f"Sentiment scoring failed: {str(e)}")
+        for key, output in zip(pending, outputs):
+            result = {"label": output["label"].lower(), "score": round(float(output["score"]), 4)}
+            _remember(key, result)
+            results[key] = result
+
+    with _lock:
+        _counts["hits"] += hits
+        _counts["scored"] += len(pending)
+    return {
+        "results": [results[key] for key in keys],
+        "cached": hits,
+        "scored": len(pending),
+    }
+
+
+def stats() -> dict:
+    with _lock:
+        return {"cache_entries": len(_cache), **_counts}
@@ -0,0 +1,225 @@
+"""
+Node-local cache of stored series shared by every API worker process.
+
+Each series is written as three .npy arrays (timestamps, prices, volume) in
+SHARED_CACHE_DIR, ideally on a tmpfs such as /dev/shm, next to a small
+per-series JSON metadata file naming the current files plus coverage, fetch
+time and data version. Readers memory-map the arrays, so all workers share
+one copy of the bytes in the page cache and a series fetched by one worker
+is served by the others without another provider round trip.
+
+Readers keep each parsed metadata file until its mtime changes and only map
+the arrays when the shared copy is newer than the one they already hold, so
+a lookup usually costs one stat. Writers take an exclusive flock, write a
+new generation of files and then atomically replace that series' metadata;
+saving one series never rewrites anything belonging to the others. Files of
+the previous generation are unlinked; workers that still have them mapped
+keep reading them until they let go.
+
+Latest quotes are shared the same way: shared_quote() lets one worker per
+poll interval ask the provider and hands its answer to the others. Symbol
+access counts are summed across workers in one small JSON file, so the
+prefetch leader ranks the watchlist by the whole node's traffic.
+
+Disabled unless SHARED_CACHE_DIR is set.
+"""
+import fcntl
+import glob
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.data.compact import CompactFrame
+
+SHARED_CACHE_DIR = os.getenv("SHARED_CACHE_DIR", "")
+
+META_SUFFIX = ".meta.json"
+LOCK_FILE = ".lock"
+QUOTES_DIR = "quotes"
+ACCESS_COUNTS_FILE = "access_counts.json"
+ARRAYS = ("timestamps", "prices", "volume")
+
+# Parsed metadata per file, reused until the file's mtime changes
+_meta_cache = {}
+
+
+def enabled() -> bool:
+    return bool(SHARED_CACHE_DIR)
+
+
+def _path(name: str) -> str:
+    return os.path.join(SHARED_CACHE_DIR, name)
+
+
+def _stem(symbol: str, interval: str) -> str:
+    return re.sub(r"[^A-Za-z0-9._^=-]", "_", f"{symbol.upper()}_{interval}")
+
+
+@contextmanager
+def _locked():
+    os.makedirs(SHARED_CACHE_DIR, exist_ok=True)
+    with open(_path(LOCK_FILE), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _read_meta(stem: str) -> Optional[dict]:
+    path = _path(stem + META_SUFFIX)
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _meta_cache.get(stem)
+    if cached is None or cached[0] != mtime:
+        try:
+            with open(path) as f:
+                cached = (mtime, json.load(f))
+        except FileNotFoundError:
+            return None
+        _meta_cache[stem] = cached
+    return cached[1]
+
+
+def _write_meta(stem: str, meta: dict):
+    tmp = _path(f"{stem}{META_SUFFIX}.{os.getpid()}.tmp")
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, _path(stem + META_SUFFIX))
+
+
+def load(symbol: str, interval: str, newer_than: Optional[float] = None) -> Optional[dict]:
+    """
+    Return {"frame", "coverage_start", "fetched_at", "version",
+    "history_version"} for a shared series, with the arrays memory-mapped
+    read-only, or None if absent or not fetched after `newer_than`
+    """
+    if not enabled():
+        return None
+    meta = _read_meta(_stem(symbol, interval))
+    if meta is None or (newer_than is not None and meta["fetched_at"] <= newer_than):
+        return None
+    try:
+        arrays = {name: np.load(_path(meta["files"][name]), mmap_mode="r") for name in ARRAYS}
+    except FileNotFoundError:
+        # Replaced by another worker between reading the metadata and the files
+        return None
+    coverage_start = meta["coverage_start"]
+    return {
+        "frame": CompactFrame(arrays["timestamps"], arrays["prices"], arrays["volume"], meta["tz"]),
+        "coverage_start": pd.Timestamp(coverage_start) if coverage_start else None,
+        "fetched_at": meta["fetched_at"],
+        "version": meta["version"],
+        "history_version": meta.get("history_version", 1),
+    }
+
+
+def save(symbol: str, interval: str, frame: CompactFrame,
+         coverage_start: Optional[pd.Timestamp], fetched_at: float, version: int,
+         history_version: int = 1):
+    """Publish a series to the other workers"""
+    if not enabled():
+        return
+    stem = _stem(symbol, interval)
+    generation = uuid.uuid4().hex[:12]
+    files = {name: f"{stem}.{generation}.{name}.npy" for name in ARRAYS}
+
+    with _locked():
+        for name in ARRAYS:
+            np.save(_path(files[name]), np.ascontiguousarray(getattr(frame, name)))
+        previous = _read_meta(stem)
+        _write_meta(stem, {
+            "files": files,
+            "tz": frame.tz,
+            "coverage_start": coverage_start.isoformat() if coverage_start is not None else None,
+            "fetched_at": fetched_at,
+            "version": version,
+            "history_version": history_version,
+        })
+        if previous is not None:
+            for old in previous["files"].values():
+                try:
+                    os.unlink(_path(old))
+                except FileNotFoundError:
+                    pass
+
+
+def shared_quote(symbol: str, max_age: float, fetch: Callable[[str], dict]) -> dict:
+    """
+    fetch(symbol), unless another worker fetched it less than `max_age`
+    seconds ago, in which case its quote is returned. Workers polling the
+    same symbol wait on one per-symbol lock, so the provider is asked at
+    most once per `max_age` however many workers poll.
+    """
+    if not enabled():
+        return fetch(symbol)
+    os.makedirs(_path(QUOTES_DIR), exist_ok=True)
+    path = _path(os.path.join(QUOTES_DIR, re.sub(r"[^A-Za-z0-9._^=-]", "_", symbol.upper())))
+    with open(f"{path}.lock", "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(f"{path}.json") as f:
+                    cached = json.load(f)
+                if time.time() - cached["fetched_at"] < max_age:
+                    return cached["quote"]
+            except (FileNotFoundError, ValueError, KeyError):
+                pass
+            quote = fetch(symbol)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w") as f:
+                json.dump({"fetched_at": time.time(), "quote": quote}, f)
+            os.replace(tmp, f"{path}.json")
+            return quote
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def access_counts() -> Dict[str, int]:
+    """Symbol access counts every worker has added so far"""
+    if not enabled():
+        return {}
+    try:
+        with open(_path(ACCESS_COUNTS_FILE)) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def add_access_counts(counts: Dict[str, int]):
+    """Add one worker's new symbol accesses to the node-wide counts"""
+    if not enabled() or not counts:
+        return
+    with _locked():
+        totals = access_counts()
+        for symbol, count in counts.items():
+            totals[symbol] = totals.get(symbol, 0) + count
+        tmp = _path(f"{ACCESS_COUNTS_FILE}.{os.getpid()}.tmp")
+        with open(tmp, "w") as f:
+            json.dump(totals, f)
+        os.replace(tmp, _path(ACCESS_COUNTS_FILE))
+
+
+def stats() -> dict:
+    if not enabled():
+        return {"enabled": False}
+    stems = [os.path.basename(path)[:-len(META_SUFFIX)]
+             for path in glob.glob(_path("*" + META_SUFFIX))]
+    metas = [meta for meta in map(_read_meta, stems) if meta is not None]
+    nbytes = 0
+    for meta in metas:
+        for name in meta["files"].values():
+            try:
+                nbytes += os.path.getsize(_path(name))
+            except FileNotFoundError:
+                pass
+    return {"enabled": True, "directory": SHARED_CACHE_DIR, "entries": len(metas), "bytes": nbytes}
@@ -3,98 +3,596 @@ import requests
 import pandas as pd
 import yfinance as yf
 from dotenv import load_dotenv
+from typing import Optional
+
+from src.data import store
+from src.data.hedging import HEDGE_ENABLED, HedgeFailed, hedged_fetcher
+from src.data.compact import CompactFrame
+from src.data import pyramid
+from src.utils import deadline
+from src.utils.deadline import DeadlineExceeded
+from src.utils.market_hours import MARKET_TZ
+from src.utils.profiling import stage
 
 load_dotenv()
 
-def get_stock_data(symbol: str, period: str) -> pd.DataFrame:
+# Intervals served by get_stock_data
+DAILY_INTERVALS = ["1d", "1wk", "1mo"]
+INTRADAY_INTERVALS = list(store.INTRADAY_MINUTES)
+SUPPORTED_INTERVALS = DAILY_INTERVALS + INTRADAY_INTERVALS
+
+# Longest history yfinance serves in one intraday request (calendar days)
+INTRADAY_MAX_FETCH_DAYS = {
+    "1m": 7,
+    "5m": 60,
+    "15m": 60,
+}
+
+# Provider request timeouts in seconds, capped by the request deadline
+YFINANCE_TIMEOUT = 10
+ALPHA_VANTAGE_TIMEOUT = 10
+
+# Sessions Alpha Vantage's free "compact" output reliably reaches back
+# (it returns the last 100 daily bars; a few are allowed for holidays)
+ALPHA_VANTAGE_COMPACT_SESSIONS = 95
+
+# Periods meaning the last N trading sessions
+PERIOD_SESSIONS = {
+    "1d": 1,
+    "5d": 5,
+}
+
+# Periods answered by slicing from a start date
+PERIOD_OFFSETS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+SUPPORTED_PERIODS = list(PERIOD_SESSIONS) + list(PERIOD_OFFSETS) + ["ytd", "max"]
+
+# Windows actually requested from the provider, smallest first. Every period
+# up to a year shares the "1y" fetch; longer ranges step up to the next window.
+FETCH_PERIODS = [
+    ("1y", pd.DateOffset(years=1)),
+    ("2y", pd.DateOffset(years=2)),
+    ("5y", pd.DateOffset(years=5)),
+    ("10y", pd.DateOffset(years=10)),
+    ("max", None),
+]
+
+
+def _to_naive(value) -> Optional[pd.Timestamp]:
+    """Parse a date/timestamp into a tz-naive Timestamp (None passes through)"""
+    if value is None:
+        return None
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert(None)
+    return ts
+
+
+def _check_period(period: str):
+    if period not in SUPPORTED_PERIODS:
+        raise ValueError(f"Unsupported period '{period}'. Choose from {SUPPORTED_PERIODS}")
+
+
+def _resolve_start(period: str, start) -> Optional[pd.Timestamp]:
+    """Earliest date a request needs; None means the full history"""
+    if start is not None:
+        return _to_naive(start)
+    today = pd.Timestamp.now().normalize()
+    if period == "max":
+        return None
+    if period == "ytd":
+        return today.replace(month=1, day=1)
+    if period in PERIOD_SESSIONS:
+        # A handful of bars is always inside the base window
+        return today - pd.DateOffset(days=7)
+    return today - PERIOD_OFFSETS[period]
+
+
+def _fetch_window(required_start: Optional[pd.Timestamp]):
+    """Pick the smallest provider window reaching back to required_start"""
+    today = pd.Timestamp.now().normalize()
+    for fetch_period, offset in FETCH_PERIODS:
+        if offset is None:
+            return fetch_period, None
+        coverage_start = today - offset
+        if required_start is not None and coverage_start <= required_start:
+            return fetch_period, coverage_start
+    return "max", None
+
+
+def _slice(df: pd.DataFrame, period: str, start, end, intraday: bool = False) -> pd.DataFrame:
+    """Cut a stored frame down to the requested period or date range"""
+    if start is None and end is None and period in PERIOD_SESSIONS:
+        if intraday:
+            # "1d"/"5d" mean the last one or five sessions, not bars
+            sessions = df.index.normalize()
+            first_session = sessions.unique()[-PERIOD_SESSIONS[period]:][0]
+            return df[sessions >= first_session]
+        return df.iloc[-PERIOD_SESSIONS[period]:]
+
+    start_ts = _resolve_start(period, start)
+    end_ts = _to_naive(end)
+    tz = getattr(df.index, "tz", None)
+    if tz is not None:
+        start_ts = start_ts.tz_localize(tz) if start_ts is not None else None
+        end_ts = end_ts.tz_localize(tz) if end_ts is not None else None
+    return df.loc[start_ts:end_ts]
+
+
+def _session_row(frame: CompactFrame, period: str, interval: str) -> int:
     """
-    Fetch stock data using yfinance (primary) with Alpha Vantage as fallback
-    yfinance is more reliable and doesn't have rate limits
+    First row of a "1d"/"5d" request. Daily bars are one per session, so the
+    last N rows are taken; weekly and monthly bars are clipped by date to
+    the bars overlapping the last N sessions.
+    """
+    sessions = PERIOD_SESSIONS[period]
+    if interval not in ("1wk", "1mo"):
+        return max(len(frame) - sessions, 0)
+    first_session = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=sessions)[0]
+    # The bar already open on that session overlaps it too
+    return max(frame.position(first_session, "right") - 1, 0)
+
+
+def _slice_compact(frame: CompactFrame, period: str, start, end, interval: str = "1d") -> pd.DataFrame:
+    """Expand only the requested rows of a stored compact frame"""
+    if start is None and end is None and period in PERIOD_SESSIONS:
+        return frame.to_frame(_session_row(frame, period, interval))
+    return frame.between(_resolve_start(period, start), _to_naive(end))
+
+
+def bars_since(df: pd.DataFrame, since) -> pd.DataFrame:
+    """
+    Rows at or after `since`. The bar at `since` itself is included because
+    the provider may still have revised it (e.g. today's forming bar).
+    """
+    since_ts = pd.Timestamp(since)
+    tz = getattr(df.index, "tz", None)
+    if tz is not None:
+        since_ts = since_ts.tz_localize(tz) if since_ts.tzinfo is None else since_ts.tz_convert(tz)
+    elif since_ts.tzinfo is not None:
+        since_ts = since_ts.tz_convert(None)
+    return df.loc[since_ts:]
+
+
+def _exchange_tz(symbol: str, interval: str) -> str:
+    """Zone of the symbol's stored bars, which tz-naive provider dates are read in"""
+    entry = store.peek(symbol, interval)
+    if entry is not None and entry.frame.tz is not None:
+        return entry.frame.tz
+    return MARKET_TZ
+
+
+def _fetch_yfinance(symbol: str, fetch_period: str, interval: str) -> pd.DataFrame:
+    """Fetch history from yfinance and keep only the OHLCV columns"""
+    deadline.check(f"fetching {symbol} from yfinance")
+    ticker = yf.Ticker(symbol)
+    with stage("provider"):
+        df = ticker.history(period=fetch_period, interval=interval,
+                            timeout=deadline.timeout(YFINANCE_TIMEOUT))
+    with stage("normalize"):
+        return _normalize_history(df, symbol)
+
+
+def _normalize_history(df: pd.DataFrame, symbol: str, tz: str = MARKET_TZ) -> pd.DataFrame:
     """
-    # Map period to yfinance format
-    period_map = {
-        "1d": "1d",
-        "5d": "5d",
-        "1mo": "1mo",
-        "3mo": "3mo",
-        "6mo": "6mo",
-        "1y": "1y",
-        "ytd": "ytd",
-        "max": "max"
+    Reduce a provider history frame to sorted OHLCV columns on an exchange
+    time zone index.
+
+    yfinance's Ticker.history is already in the exchange's zone; tz-naive
+    dates (Alpha Vantage, yf.download's daily bars) are exchange-local and
+    are localized to `tz`, so every stored frame carries the same zone.
+
+    Selecting the columns is the only full copy; the index is only parsed
+    when it is not already datetime and only re-sorted when out of order.
+    """
+    if df is None or df.empty:
+        raise ValueError(f"No data returned for {symbol}")
+
+    # Ensure we have the required columns
+    required_cols = ["Open", "High", "Low", "Close", "Volume"]
+    if not all(col in df.columns for col in required_cols):
+        raise ValueError(f"Missing required columns in data for {symbol}")
+
+    # Column selection already returns a new frame, so no extra copy is needed
+    df = df[required_cols]
+    if not isinstance(df.index, pd.DatetimeIndex):
+        df.index = pd.to_datetime(df.index)
+    if df.index.tz is None:
+        df.index = df.index.tz_localize(tz)
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+
+    return df
+
+
+def _fetch_alpha_vantage(symbol: str) -> pd.DataFrame:
+    """Fetch the compact daily series from Alpha Vantage"""
+    API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
+    if not API_KEY:
+        raise ValueError("ALPHA_VANTAGE_API_KEY not set and yfinance failed")
+
+    function = "TIME_SERIES_DAILY"
+    outputsize = "compact"  # Free API only supports compact
+
+    url = "https://www.alphavantage.co/query"
+    params = {
+        "function": function,
+        "symbol": symbol,
+        "outputsize": outputsize,
+        "apikey": API_KEY,
+        "datatype": "json"
     }
-    
-    yf_period = period_map.get(period, "1mo")
-    
+
+    deadline.check(f"fetching {symbol} from Alpha Vantage")
+    with stage("alpha_vantage"):
+        response = requests.get(url, params=params, timeout=deadline.timeout(ALPHA_VANTAGE_TIMEOUT))
+        data = response.json()
+
+    if "Time Series (Daily)" not in data:
+        error_msg = data.get('Note') or data.get('Error Message') or 'Unknown error'
+        raise ValueError(f"Alpha Vantage error: {error_msg}")
+
+    # Parse JSON into DataFrame
+    df = pd.DataFrame.from_dict(data["Time Series (Daily)"], orient="index", dtype=float)
+    df = df.rename(columns={
+        "1. open": "Open",
+        "2. high": "High",
+        "3. low": "Low",
+        "4. close": "Close",
+        "5. volume": "Volume"
+    })
+    # Dates are US exchange-local, like yfinance's daily index
+    return _normalize_history(df, symbol)
+
+
+def _fetch_and_store(symbol: str, required_start: Optional[pd.Timestamp], interval: str) -> store.StoreEntry:
+    """
+    Fetch the smallest window covering required_start using yfinance
+    (primary) with Alpha Vantage as fallback, and save it to the store
+    """
+    fetch_period, coverage_start = _fetch_window(required_start)
+
+    if (HEDGE_ENABLED and interval == "1d" and os.getenv("ALPHA_VANTAGE_API_KEY")
+            and _alpha_vantage_covers(required_start)):
+        return _fetch_hedged(symbol, fetch_period, coverage_start, interval)
+
     try:
         # Use yfinance as primary source (more reliable, no API key needed)
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(period=yf_period)
-        
-        if df is None or df.empty:
-            raise ValueError(f"No data returned for {symbol}")
-        
-        # Rename columns to match expected format
-        df = df.rename(columns={
-            "Open": "Open",
-            "High": "High",
-            "Low": "Low",
-            "Close": "Close",
-            "Volume": "Volume"
-        })
-        
-        # Ensure we have the required columns
-        required_cols = ["Open", "High", "Low", "Close", "Volume"]
-        if not all(col in df.columns for col in required_cols):
-            raise ValueError(f"Missing required columns in data for {symbol}")
-        
-        # Select only required columns and ensure proper data types
-        df = df[required_cols].copy()
-        df.index = pd.to_datetime(df.index)
-        df.sort_index(inplace=True)
-        
-        return df
-        
+        df = hedged_fetcher.timed(lambda: _fetch_yfinance(symbol, fetch_period, interval))
+        return store.save(symbol, interval, df, coverage_start)
+
+    except DeadlineExceeded:
+        raise
     except Exception as yf_error:
         # Fallback to Alpha Vantage if yfinance fails
         print(f"yfinance failed for {symbol}, trying Alpha Vantage fallback: {str(yf_error)}")
-        
+
+        try:
+            if interval != "1d":
+                raise ValueError(f"Alpha Vantage fallback only serves daily bars, not {interval}")
+            return _save_alpha_vantage(symbol, interval)
+
+        except DeadlineExceeded:
+            raise
+        except Exception as av_error:
+            raise Exception(f"Both yfinance and Alpha Vantage failed for {symbol}. yfinance error: {str(yf_error)}, Alpha Vantage error: {str(av_error)}")
+
+
+def _alpha_vantage_covers(required_start: Optional[pd.Timestamp]) -> bool:
+    """
+    Whether Alpha Vantage's compact output reaches back to required_start.
+    Only then can it stand in for yfinance as a hedge; a longer window
+    would be answered with a fraction of the requested history.
+    """
+    if required_start is None:
+        return False
+    reach = pd.Timestamp.now().normalize() - pd.offsets.BDay(ALPHA_VANTAGE_COMPACT_SESSIONS)
+    return required_start >= reach
+
+
+def _save_alpha_vantage(symbol: str, interval: str) -> store.StoreEntry:
+    # No point spending Alpha Vantage budget on a request nobody waits for
+    deadline.check(f"the Alpha Vantage fallback for {symbol}")
+    hedged_fetcher.budget.record()
+    df = _fetch_alpha_vantage(symbol)
+    # Compact output only reaches back ~100 trading days
+    return store.save(symbol, interval, df, df.index[0].tz_localize(None))
+
+
+def _fetch_hedged(symbol: str, fetch_period: str, coverage_start: Optional[pd.Timestamp],
+                  interval: str) -> store.StoreEntry:
+    """
+    Race Alpha Vantage against a slow yfinance fetch. A yfinance result that
+    arrives after losing is still saved, since it reaches further back.
+    """
+    def save_primary(df):
+        return store.save(symbol, interval, df, coverage_start)
+
+    try:
+        df, source = hedged_fetcher.fetch(
+            deadline.bind(lambda: _fetch_yfinance(symbol, fetch_period, interval)),
+            deadline.bind(lambda: _fetch_alpha_vantage(symbol)),
+            on_late_primary=save_primary
+        )
+    except DeadlineExceeded:
+        raise
+    except HedgeFailed as e:
+        raise Exception(f"Both yfinance and Alpha Vantage failed for {symbol}: {str(e)}")
+    except Exception as yf_error:
+        # yfinance failed before the hedge delay; fall back as usual
+        print(f"yfinance failed for {symbol}, trying Alpha Vantage fallback: {str(yf_error)}")
+        try:
+            return _save_alpha_vantage(symbol, interval)
+        except DeadlineExceeded:
+            raise
+        except Exception as av_error:
+            raise Exception(f"Both yfinance and Alpha Vantage failed for {symbol}. yfinance error: {str(yf_error)}, Alpha Vantage error: {str(av_error)}")
+
+    if source == "primary":
+        return save_primary(df)
+    # Alpha Vantage only covers the rows it returned, not the whole window
+    return store.save(symbol, interval, df, df.index[0].tz_localize(None))
+
+
+def _get_intraday_data(symbol: str, period: str, start, end, interval: str) -> pd.DataFrame:
+    """
+    Serve intraday bars from the symbol's ring buffer, topping it up from
+    yfinance once it goes stale
+    """
+    buffer = store.intraday_buffer(symbol, interval)
+    if not store.intraday_is_fresh(buffer):
+        max_days = INTRADAY_MAX_FETCH_DAYS[interval]
+        last = buffer.last_timestamp
+        if last is None:
+            days = min(store.INTRADAY_RETENTION_DAYS, max_days)
+        else:
+            # Only the sessions since the last stored bar need refetching
+            elapsed = pd.Timestamp.now(tz="UTC") - pd.Timestamp(last, tz="UTC")
+            days = min(max(elapsed.days + 1, 1), max_days)
         try:
-            API_KEY = os.getenv("ALPHA_VANTAGE_API_KEY")
-            if not API_KEY:
-                raise ValueError("ALPHA_VANTAGE_API_KEY not set and yfinance failed")
-            
-            function = "TIME_SERIES_DAILY"
-            outputsize = "compact"  # Free API only supports compact
-            
-            url = "https://www.alphavantage.co/query"
-            params = {
-                "function": function,
-                "symbol": symbol,
-                "outputsize": outputsize,
-                "apikey": API_KEY,
-                "datatype": "json"
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            data = response.json()
-            
-            if "Time Series (Daily)" not in data:
-                error_msg = data.get('Note') or data.get('Error Message') or 'Unknown error'
-                raise ValueError(f"Alpha Vantage error: {error_msg}")
-            
-            # Parse JSON into DataFrame
-            df = pd.DataFrame.from_dict(data["Time Series (Daily)"], orient="index", dtype=float)
-            df = df.rename(columns={
-                "1. open": "Open",
-                "2. high": "High",
-                "3. low": "Low",
-                "4. close": "Close",
-                "5. volume": "Volume"
-            })
-            df.index = pd.to_datetime(df.index)
-            df.sort_index(inplace=True)
-            
+            fetched = _fetch_yfinance(symbol, f"{days}d", interval)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            raise Exception(f"yfinance failed for {symbol} {interval} bars: {str(e)}")
+        buffer.extend(fetched)
+        store.publish(symbol, interval, CompactFrame.from_frame(fetched))
+
+    with stage("slice"):
+        df = buffer.to_frame()
+        if df.empty:
             return df
-            
+        return _slice(df, period, start, end, intraday=True)
+
+
+def get_stock_data(symbol: str, period: str = "1mo", start=None, end=None,
+                   interval: str = "1d") -> pd.DataFrame:
+    """
+    Fetch stock data using yfinance (primary) with Alpha Vantage as fallback
+    yfinance is more reliable and doesn't have rate limits
+
+    Either `period` or an explicit `start`/`end` date range selects the rows.
+    Requests are answered from the local store whenever a previously fetched
+    longer window already covers them, so "1mo", "6mo" and "1y" for the same
+    symbol share a single provider round trip.
+
+    Intraday intervals ("1m", "5m", "15m") are kept in a bounded ring buffer
+    per symbol, so periods beyond the retention window are clamped to it.
+    """
+    if interval not in SUPPORTED_INTERVALS:
+        raise ValueError(f"Unsupported interval '{interval}'. Choose from {SUPPORTED_INTERVALS}")
+
+    _check_period(period)
+
+    required_start = _resolve_start(period, start)
+    if start is not None and end is not None and required_start > _to_naive(end):
+        raise ValueError("start must be before end")
+
+    if interval in INTRADAY_INTERVALS:
+        return _get_intraday_data(symbol, period, start, end, interval)
+
+    entry = store.lookup(symbol, interval, required_start)
+    if entry is None:
+        entry = _fetch_and_store(symbol, required_start, interval)
+
+    with stage("slice"):
+        return _slice_compact(entry.frame, period, start, end, interval)
+
+
+def get_compact_data(symbol: str, period: str = "max", start=None, end=None,
+                     interval: str = "1d", keep: bool = True) -> CompactFrame:
+    """
+    Like get_stock_data, but returns the requested rows as a CompactFrame
+    sharing the stored arrays, so callers can expand it a chunk at a time.
+
+    With keep=False rows that are not already stored are fetched without
+    being saved, so one-off reads of many symbols (exports) do not grow
+    the store.
+    """
+    if interval not in SUPPORTED_INTERVALS:
+        raise ValueError(f"Unsupported interval '{interval}'. Choose from {SUPPORTED_INTERVALS}")
+    _check_period(period)
+    if interval in INTRADAY_INTERVALS:
+        if keep:
+            return CompactFrame.from_frame(get_stock_data(symbol, period, start, end, interval))
+        days = min(store.INTRADAY_RETENTION_DAYS, INTRADAY_MAX_FETCH_DAYS[interval])
+        df = _fetch_yfinance(symbol, f"{days}d", interval)
+        return CompactFrame.from_frame(_slice(df, period, start, end, intraday=True))
+
+    required_start = _resolve_start(period, start)
+    entry = store.lookup(symbol, interval, required_start)
+    if entry is not None:
+        frame = entry.frame
+    elif keep:
+        frame = _fetch_and_store(symbol, required_start, interval).frame
+    else:
+        frame = _fetch_unstored(symbol, required_start, interval)
+
+    if start is None and end is None and period in PERIOD_SESSIONS:
+        return frame.slice(_session_row(frame, period, interval), len(frame))
+    end_ts = _to_naive(end)
+    lo = frame.position(required_start) if required_start is not None else 0
+    hi = frame.position(end_ts, "right") if end_ts is not None else len(frame)
+    return frame.slice(lo, hi)
+
+
+def _fetch_unstored(symbol: str, required_start: Optional[pd.Timestamp], interval: str) -> CompactFrame:
+    """
+    Fetch the window covering required_start like _fetch_and_store, but
+    hand it back without saving it
+    """
+    fetch_period, _ = _fetch_window(required_start)
+    try:
+        df = _fetch_yfinance(symbol, fetch_period, interval)
+    except DeadlineExceeded:
+        raise
+    except Exception as yf_error:
+        if interval != "1d":
+            raise Exception(f"yfinance failed for {symbol} {interval} bars: {str(yf_error)}")
+        print(f"yfinance failed for {symbol}, trying Alpha Vantage fallback: {str(yf_error)}")
+        try:
+            deadline.check(f"the Alpha Vantage fallback for {symbol}")
+            hedged_fetcher.budget.record()
+            df = _fetch_alpha_vantage(symbol)
+        except DeadlineExceeded:
+            raise
         except Exception as av_error:
             raise Exception(f"Both yfinance and Alpha Vantage failed for {symbol}. yfinance error: {str(yf_error)}, Alpha Vantage error: {str(av_error)}")
+    with stage("compact"):
+        return CompactFrame.from_frame(df)
+
+
+def get_stock_data_resolution(symbol: str, period: str = "max", start=None, end=None,
+                              resolution: str = "auto", width: int = 1000):
+    """
+    Daily history served from the symbol's aggregate pyramid.
+
+    `resolution` is a pyramid level ("1d", "1wk", "1mo", "3mo") or "auto" to
+    pick the coarsest level with at least one bar per pixel of a `width`
+    pixel chart. Returns (DataFrame, level).
+    """
+    if resolution != "auto" and resolution not in pyramid.LEVELS:
+        raise ValueError(f"Unsupported resolution '{resolution}'. Choose from {['auto'] + pyramid.LEVELS}")
+    if width < 1:
+        raise ValueError("width must be positive")
+
+    # Makes sure the store covers the range
+    get_stock_data(symbol, period, start=start, end=end, interval="1d")
+    levels = pyramid.levels_for(symbol)
+    daily = levels["1d"]
+
+    _check_period(period)
+    if start is None and end is None and period in PERIOD_SESSIONS:
+        return daily.tail(PERIOD_SESSIONS[period]), "1d"
+
+    start_ts = _resolve_start(period, start)
+    end_ts = _to_naive(end)
+    level = resolution
+    if level == "auto":
+        lo = daily.position(start_ts) if start_ts is not None else 0
+        hi = daily.position(end_ts, "right") if end_ts is not None else len(daily)
+        if hi <= lo:
+            level = "1d"
+        else:
+            first = pd.Timestamp(int(daily.timestamps[lo]))
+            last = pd.Timestamp(int(daily.timestamps[hi - 1]))
+            level = pyramid.choose_level(first, last, width)
+    return levels[level].between(start_ts, end_ts), level
+
+
+def get_stock_data_bulk(symbols, period: str = "1y", interval: str = "1d", start=None) -> dict:
+    """
+    Fetch several symbols in one yfinance download and save each to the store.
+
+    Returns {symbol: bars stored} for the symbols that came back with data.
+    """
+    if interval not in DAILY_INTERVALS:
+        raise ValueError(f"Bulk fetch only supports {DAILY_INTERVALS}")
+    symbols = [s.upper() for s in symbols]
+    if not symbols:
+        return {}
+
+    fetch_period, coverage_start = _fetch_window(_resolve_start(period, start))
+    data = yf.download(
+        symbols,
+        period=fetch_period,
+        interval=interval,
+        group_by="ticker",
+        auto_adjust=True,  # Match Ticker.history
+        threads=True,
+        progress=False
+    )
+
+    stored = {}
+    for symbol in symbols:
+        try:
+            if isinstance(data.columns, pd.MultiIndex):
+                df = data[symbol]
+            else:
+                df = data
+            # yf.download's daily index is tz-naive, unlike Ticker.history's
+            df = _normalize_history(df.dropna(how="all"), symbol, _exchange_tz(symbol, interval))
+            stored[symbol] = len(store.save(symbol, interval, df, coverage_start).frame)
+        except Exception as e:
+            print(f"Bulk fetch returned no usable data for {symbol}: {str(e)}")
+    return stored
+
+
+def ensure_stored(symbols, period: str = "1y", start=None, interval: str = "1d") -> list:
+    """
+    Fetch every symbol whose stored bars are stale or do not reach back to
+    `period`/`start` in one bulk download, so multi-symbol analytics do not
+    pay a provider round trip per symbol. Returns the symbols it fetched;
+    any the download leaves out are fetched one at a time by get_stock_data.
+    """
+    if interval not in DAILY_INTERVALS:
+        return []
+    _check_period(period)
+    required_start = _resolve_start(period, start)
+    missing = [symbol for symbol in dict.fromkeys(s.upper() for s in symbols)
+               if store.lookup(symbol, interval, required_start) is None]
+    # A single symbol gains nothing from the bulk path
+    if len(missing) < 2:
+        return []
+    deadline.check("the bulk fetch")
+    try:
+        get_stock_data_bulk(missing, period, interval, start=start)
+    except Exception as e:
+        print(f"Bulk fetch of {len(missing)} symbols failed, fetching one at a time: {str(e)}")
+    return missing
+
+
+def get_latest_quote(symbol: str) -> dict:
+    """
+    Fetch the latest trade for a symbol as {"p": price, "v": volume, "t": epoch ms}.
+    Uses yfinance's quote snapshot, falling back to the last 1m bar.
+    """
+    try:
+        info = yf.Ticker(symbol).fast_info
+        price = info.last_price
+        volume = info.last_volume
+        if price is None:
+            raise ValueError(f"No quote returned for {symbol}")
+        return {
+            "p": round(float(price), 4),
+            "v": int(volume or 0),
+            "t": int(pd.Timestamp.now(tz="UTC").value // 1_000_000)
+        }
+    except Exception as quote_error:
+        print(f"Quote snapshot failed for {symbol}, using last 1m bar: {str(quote_error)}")
+        df = get_stock_data(symbol, "1d", interval="1m")
+        if df.empty:
+            raise ValueError(f"No quote available for {symbol}")
+        return {
+            "p": round(float(df["Close"].iloc[-1]), 4),
+            "v": int(df["Volume"].sum()),
+            "t": int(df.index[-1].value // 1_000_000)
+        }
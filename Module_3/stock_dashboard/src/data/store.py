@@ -0,0 +1,267 @@
+"""
+In-process store for fetched OHLCV frames.
+
+One frame is kept per (symbol, interval): the widest window fetched so far,
+held as a memory-compact CompactFrame. Shorter periods and explicit date
+ranges are answered by slicing that frame instead of going back to the
+provider.
+
+When SHARED_CACHE_DIR is set, daily frames are also published to a
+node-local shared cache so other API workers can serve them without
+refetching (see shared_cache).
+
+Intraday intervals are held separately in one fixed-capacity ring buffer
+per (symbol, interval), sized from a configurable retention window.
+
+Listeners registered with add_listener see every batch of ingested bars,
+so online consumers (e.g. anomaly detection) can process just the new bars.
+"""
+import os
+import time
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import pandas as pd
+
+from src.data import shared_cache
+from src.data.compact import FLOAT64_BYTES_PER_BAR, CompactFrame
+from src.data.ring_buffer import BarRingBuffer
+from src.utils.market_hours import is_market_open, last_close
+from src.utils.profiling import stage
+
+# How long a stored frame is considered fresh (matches the dashboard cache)
+CACHE_TTL_SECONDS = int(os.getenv("STOCK_CACHE_TTL", "300"))
+
+# Intraday bars go stale much faster than daily history
+INTRADAY_TTL_SECONDS = int(os.getenv("INTRADAY_CACHE_TTL", "60"))
+
+# Trading days of intraday bars kept per symbol
+INTRADAY_RETENTION_DAYS = int(os.getenv("INTRADAY_RETENTION_DAYS", "5"))
+
+# Minutes per bar for each intraday interval
+INTRADAY_MINUTES = {
+    "1m": 1,
+    "5m": 5,
+    "15m": 15,
+}
+
+# Regular US session length in minutes
+SESSION_MINUTES = 390
+
+
+@dataclass
+class StoreEntry:
+    frame: CompactFrame
+    # Earliest date the fetch asked for; None means the full ("max") history
+    coverage_start: Optional[pd.Timestamp]
+    fetched_at: float = field(default_factory=time.time)
+    # Bumped whenever a refetch changes the stored bars
+    version: int = 1
+    # Bumped only when bars before the latest one are revised (e.g. split or
+    # dividend adjustment), so clients know appending deltas is not enough
+    history_version: int = 1
+
+    def expires_in(self) -> float:
+        """
+        Seconds until the entry goes stale. Daily bars cannot change while
+        the market is closed, so a fetch made after the last close stays
+        fresh until the next session opens.
+        """
+        if not is_market_open() and self.fetched_at >= last_close().timestamp():
+            return float("inf")
+        return self.fetched_at + CACHE_TTL_SECONDS - time.time()
+
+    def is_fresh(self) -> bool:
+        return self.expires_in() > 0
+
+    def covers(self, start: Optional[pd.Timestamp]) -> bool:
+        if self.coverage_start is None:
+            return True
+        if start is None:
+            return False
+        return self.coverage_start <= start
+
+
+_entries = {}
+_buffers = {}
+_listeners = []
+_lock = threading.Lock()
+
+
+def _key(symbol: str, interval: str):
+    return (symbol.upper(), interval)
+
+
+def _current(symbol: str, interval: str) -> Optional[StoreEntry]:
+    """
+    Local entry for symbol/interval, replaced by the shared cache's copy when
+    another worker has fetched it more recently
+    """
+    key = _key(symbol, interval)
+    with _lock:
+        entry = _entries.get(key)
+    shared = shared_cache.load(symbol, interval, newer_than=entry.fetched_at if entry is not None else None)
+    if shared is not None:
+        entry = StoreEntry(**shared)
+        with _lock:
+            _entries[key] = entry
+    return entry
+
+
+def add_listener(listener: Callable[[str, str, CompactFrame], None]):
+    """
+    Call listener(symbol, interval, frame) whenever bars are ingested. The
+    frame holds at least every new or revised bar and may start earlier.
+    """
+    _listeners.append(listener)
+
+
+def publish(symbol: str, interval: str, frame: CompactFrame):
+    """Hand freshly ingested bars to every listener"""
+    for listener in _listeners:
+        try:
+            listener(symbol.upper(), interval, frame)
+        except Exception as e:
+            # A broken listener must not fail the fetch that fed it
+            print(f"Store listener failed for {symbol} {interval}: {str(e)}")
+
+
+def lookup(symbol: str, interval: str, start: Optional[pd.Timestamp]) -> Optional[StoreEntry]:
+    """
+    Return the stored entry for symbol/interval if it is fresh and reaches
+    back to `start` (None asks for the full history), otherwise None.
+    """
+    entry = _current(symbol, interval)
+    if entry is None or not entry.is_fresh() or not entry.covers(start):
+        return None
+    return entry
+
+
+def peek(symbol: str, interval: str) -> Optional[StoreEntry]:
+    """Stored entry for symbol/interval whether or not it is still fresh"""
+    return _current(symbol, interval)
+
+
+def expires_in(symbol: str, interval: str) -> float:
+    """Seconds until the stored symbol/interval goes stale (0 when missing)"""
+    entry = _current(symbol, interval)
+    return max(entry.expires_in(), 0.0) if entry is not None else 0.0
+
+
+def _revises_history(previous: CompactFrame, frame: CompactFrame) -> bool:
+    """
+    Whether `frame` changed any of `previous`'s bars other than its last one,
+    which may still be forming and is expected to be revised
+    """
+    settled = previous.slice(0, len(previous) - 1)
+    if settled.empty:
+        return False
+    lo = frame.position(pd.Timestamp(int(settled.timestamps[0]), tz="UTC"))
+    return not settled.equals(frame.slice(lo, lo + len(settled)))
+
+
+def save(symbol: str, interval: str, df: pd.DataFrame,
+         coverage_start: Optional[pd.Timestamp]) -> StoreEntry:
+    """
+    Store a freshly fetched frame.
+
+    Rows of an older entry that reach further back than the new frame are
+    kept, so refreshing a short window never throws away a longer history.
+    """
+    key = _key(symbol, interval)
+    with stage("compact"):
+        frame = CompactFrame.from_frame(df)
+    previous = _current(symbol, interval)
+    version = previous.version + 1 if previous is not None else 1
+    history_version = previous.history_version if previous is not None else 1
+    if previous is not None and previous.frame.tz != frame.tz:
+        # Bars from another time zone cannot be merged without shifting them
+        print(f"Replacing stored {symbol} {interval} bars in {previous.frame.tz} with bars in {frame.tz}")
+        previous = None
+        history_version += 1
+    with _lock:
+        if previous is not None and not previous.frame.empty and not frame.empty:
+            older = previous.frame.slice(0, previous.frame.position(df.index[0]))
+            if len(older):
+                frame = older.concat(frame)
+            if previous.coverage_start is None:
+                coverage_start = None
+            elif coverage_start is not None:
+                coverage_start = min(coverage_start, previous.coverage_start)
+            if previous.frame.equals(frame):
+                version = previous.version
+            elif _revises_history(previous.frame, frame):
+                history_version += 1
+        entry = StoreEntry(frame=frame, coverage_start=coverage_start, version=version,
+                           history_version=history_version)
+        _entries[key] = entry
+    shared_cache.save(symbol, interval, entry.frame, entry.coverage_start, entry.fetched_at,
+                      entry.version, entry.history_version)
+    publish(symbol, interval, entry.frame)
+    return entry
+
+
+def intraday_capacity(interval: str) -> int:
+    """Number of bars needed to hold the retention window at this interval"""
+    return INTRADAY_RETENTION_DAYS * SESSION_MINUTES // INTRADAY_MINUTES[interval]
+
+
+def intraday_buffer(symbol: str, interval: str) -> BarRingBuffer:
+    """Return the ring buffer for symbol/interval, creating it on first use"""
+    key = _key(symbol, interval)
+    with _lock:
+        buffer = _buffers.get(key)
+        if buffer is None:
+            buffer = BarRingBuffer(intraday_capacity(interval))
+            _buffers[key] = buffer
+    return buffer
+
+
+def intraday_is_fresh(buffer: BarRingBuffer) -> bool:
+    return len(buffer) > 0 and time.time() - buffer.updated_at < INTRADAY_TTL_SECONDS
+
+
+def data_version(symbol: str, interval: str) -> int:
+    """Current version of the stored series for symbol/interval (0 if none)"""
+    key = _key(symbol, interval)
+    with _lock:
+        if interval in INTRADAY_MINUTES:
+            buffer = _buffers.get(key)
+            return buffer.version if buffer is not None else 0
+        entry = _entries.get(key)
+        return entry.version if entry is not None else 0
+
+
+def history_version(symbol: str, interval: str) -> int:
+    """
+    Version of the stored daily series' settled bars, unchanged by appended
+    bars or a revised latest bar (0 if none or intraday)
+    """
+    with _lock:
+        entry = _entries.get(_key(symbol, interval))
+        return entry.history_version if entry is not None else 0
+
+
+def stats() -> dict:
+    """Size of the stored daily frames, compared with plain float64 frames"""
+    with _lock:
+        frames = [entry.frame for entry in _entries.values()]
+    bars = sum(len(frame) for frame in frames)
+    nbytes = sum(frame.nbytes for frame in frames)
+    return {
+        "entries": len(frames),
+        "bars": bars,
+        "bytes": nbytes,
+        "bytes_per_bar": round(nbytes / bars, 2) if bars else 0.0,
+        "float64_bytes_per_bar": FLOAT64_BYTES_PER_BAR,
+        "intraday_buffers": len(_buffers),
+        "shared": shared_cache.stats(),
+    }
+
+
+def clear():
+    """Drop every stored frame and intraday buffer."""
+    with _lock:
+        _entries.clear()
+        _buffers.clear()
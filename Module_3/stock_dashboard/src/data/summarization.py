@@ -1,4 +1,38 @@
-from transformers import pipeline
+import os
+import threading
+from contextlib import contextmanager
+from typing import List
+
+from src.data.dedup import cluster
+from src.data.models import summarizer
+from src.utils import deadline
+from src.utils.deadline import DeadlineExceeded
+from src.utils.profiling import stage
+
+# Most texts accepted per batch summarization request
+SUMMARY_MAX_TEXTS = int(os.getenv("SUMMARY_MAX_TEXTS", "100"))
+
+# Generations run at once per process; further requests queue for a slot
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "1"))
+
+_slots = threading.BoundedSemaphore(SUMMARY_CONCURRENCY)
+
+
+@contextmanager
+def _generation_slot():
+    """
+    Hold one of the summarizer's slots. Waiting gives up when the request's
+    deadline passes, so queued work nobody is waiting for is dropped.
+    """
+    left = deadline.remaining()
+    if not _slots.acquire(timeout=max(left, 0) if left is not None else None):
+        raise DeadlineExceeded("Deadline exceeded while queued for the summarizer")
+    try:
+        deadline.check("summarization")
+        yield
+    finally:
+        _slots.release()
+
 
 def summarize_text(text: str, max_length: int, min_length: int) -> str:
     """
@@ -13,13 +47,69 @@ def summarize_text(text: str, max_length: int, min_length: int) -> str:
         Summarized text
     """
     try:
-        summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-        summary = summarizer(
-            text,
-            max_length=max_length,
-            min_length=min_length,
-            do_sample=False
-        )[0]['summary_text']
+        pipe = summarizer()
+        with _generation_slot(), stage("summarize"):
+            summary = pipe(
+                text,
+                max_length=max_length,
+                min_length=min_length,
+                do_sample=False
+            )[0]['summary_text']
         return summary
+    except DeadlineExceeded:
+        raise
     except Exception as e:
-        raise Exception(f"Summarization failed: {str(e)}")
\ No newline at end of file
+        raise Exception(f"Summarization failed: {str(e)}")
+
+
+def summarize_batch(texts: List[str], max_length: int, min_length: int) -> dict:
+    """
+    Summarize many texts, generating once per cluster of near-duplicates.
+
+    The longest text of each cluster is summarized and its summary returned
+    for every member, since syndicated copies are often trimmed versions of
+    the same story.
+
+    Returns:
+        summaries in input order, the clusters (input positions) and how
+        many generations the clustering saved
+    """
+    if not texts:
+        raise ValueError("At least one text is required")
+    if len(texts) > SUMMARY_MAX_TEXTS:
+        raise ValueError(f"{len(texts)} texts exceeds the limit of {SUMMARY_MAX_TEXTS} per request")
+    if any(not text.strip() for text in texts):
+        raise ValueError("Texts must not be empty")
+
+    with stage("dedup"):
+        clusters = cluster(texts)
+    representatives = [max(members, key=lambda i: len(texts[i])) for members in clusters]
+    try:
+        pipe = summarizer()
+        outputs = []
+        with _generation_slot(), stage("summarize"):
+            for i in representatives:
+                # Stop between articles once the client has given up
+                deadline.check("summarizing the remaining articles")
+                outputs.extend(pipe(
+                    texts[i],
+                    max_length=max_length,
+                    min_length=min_length,
+                    do_sample=False
+                ))
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        raise Exception(f"Summarization failed: {str(e)}")
+
+    summaries = [None] * len(texts)
+    for members, output in zip(clusters, outputs):
+        for i in members:
+            summaries[i] = output['summary_text']
+    return {
+        "summaries": summaries,
+        "clusters": clusters,
+        "representatives": representatives,
+        "generations": len(clusters),
+        "generations_saved": len(texts) - len(clusters)
+    }
@@ -0,0 +1,195 @@
+"""
+Directory of listed symbols (ticker, name, exchange) with prefix search.
+
+The directory is loaded once per process, from SYMBOL_DIRECTORY_FILE when
+set (CSV with symbol,name,exchange columns) or else from NASDAQ Trader's
+public listings of NASDAQ and other US exchange securities. If neither can
+be read, the dashboard's default symbols are used.
+
+Searches use sorted key arrays: every ticker, every lower-cased name and
+every later word of each name is a key, and a prefix matches the contiguous
+run found by two binary searches, so a lookup is O(log n) plus the results.
+"""
+import csv
+import io
+import os
+import threading
+from bisect import bisect_left
+from typing import List, Optional, Tuple
+
+import requests
+
+from src.data.watchlist import DEFAULT_SYMBOLS
+
+SYMBOL_DIRECTORY_FILE = os.getenv("SYMBOL_DIRECTORY_FILE", "")
+
+NASDAQ_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/nasdaqlisted.txt"
+OTHER_LISTED_URL = "https://www.nasdaqtrader.com/dynamic/SymDir/otherlisted.txt"
+
+# Exchange codes used in otherlisted.txt
+EXCHANGE_CODES = {
+    "A": "NYSE American",
+    "N": "NYSE",
+    "P": "NYSE Arca",
+    "Z": "Cboe BZX",
+    "V": "IEX",
+}
+
+# Used when no listing can be loaded
+FALLBACK_NAMES = {
+    "AAPL": "Apple Inc.",
+    "MSFT": "Microsoft Corporation",
+    "GOOGL": "Alphabet Inc. Class A",
+    "AMZN": "Amazon.com, Inc.",
+    "TSLA": "Tesla, Inc.",
+    "META": "Meta Platforms, Inc.",
+    "NVDA": "NVIDIA Corporation",
+    "NFLX": "Netflix, Inc.",
+}
+
+# Sorts after any character that can follow a prefix
+_PREFIX_END = "\uffff"
+
+Entry = Tuple[str, str, str]
+
+
+class SymbolDirectory:
+    def __init__(self, entries: List[Entry]):
+        # Last listing wins for duplicate tickers
+        by_symbol = {symbol.upper(): (symbol.upper(), name, exchange) for symbol, name, exchange in entries}
+        self.entries = sorted(by_symbol.values())
+        self._rows = {entry[0]: i for i, entry in enumerate(self.entries)}
+
+        # Tickers are already sorted, so row i has the i-th ticker key
+        self._ticker_keys = [entry[0] for entry in self.entries]
+
+        names, words = [], []
+        for i, (_, name, _) in enumerate(self.entries):
+            lowered = name.lower()
+            names.append((lowered, i))
+            for word in lowered.split()[1:]:
+                words.append((word, i))
+        names.sort()
+        words.sort()
+        self._name_keys = [key for key, _ in names]
+        self._name_rows = [row for _, row in names]
+        self._word_keys = [key for key, _ in words]
+        self._word_rows = [row for _, row in words]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @staticmethod
+    def _prefix_range(keys: List[str], prefix: str) -> range:
+        return range(bisect_left(keys, prefix), bisect_left(keys, prefix + _PREFIX_END))
+
+    def get(self, symbol: str) -> Optional[dict]:
+        row = self._rows.get(symbol.upper())
+        return self._entry(row) if row is not None else None
+
+    def _entry(self, row: int) -> dict:
+        symbol, name, exchange = self.entries[row]
+        return {"symbol": symbol, "name": name, "exchange": exchange}
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        """
+        Symbols whose ticker, name or any word of the name starts with query.
+        Ticker matches come first (an exact ticker before longer ones), then
+        name matches, then word matches.
+        """
+        query = query.strip()
+        if not query or limit <= 0:
+            return []
+
+        rows = []
+        seen = set()
+
+        def take(candidates):
+            for row in candidates:
+                if len(rows) == limit:
+                    return
+                if row not in seen:
+                    seen.add(row)
+                    rows.append(row)
+
+        take(self._prefix_range(self._ticker_keys, query.upper()))
+        lowered = query.lower()
+        for keys, key_rows in ((self._name_keys, self._name_rows), (self._word_keys, self._word_rows)):
+            if len(rows) == limit:
+                break
+            take(key_rows[i] for i in self._prefix_range(keys, lowered))
+        return [self._entry(row) for row in rows]
+
+
+def _parse_nasdaq_listed(text: str) -> List[Entry]:
+    entries = []
+    for row in csv.DictReader(io.StringIO(text), delimiter="|"):
+        symbol = row.get("Symbol") or ""
+        if not symbol or symbol.startswith("File Creation Time") or row.get("Test Issue") == "Y":
+            continue
+        # Names read like "Apple Inc. - Common Stock"
+        entries.append((symbol, row["Security Name"].split(" - ")[0], "NASDAQ"))
+    return entries
+
+
+def _parse_other_listed(text: str) -> List[Entry]:
+    entries = []
+    for row in csv.DictReader(io.StringIO(text), delimiter="|"):
+        symbol = row.get("ACT Symbol") or ""
+        if not symbol or symbol.startswith("File Creation Time") or row.get("Test Issue") == "Y":
+            continue
+        # Preferred shares and warrants use characters Yahoo tickers don't
+        if "$" in symbol or "=" in symbol:
+            continue
+        exchange = EXCHANGE_CODES.get(row.get("Exchange"), row.get("Exchange") or "")
+        # Class shares are BRK.B in the listing but BRK-B on Yahoo
+        entries.append((symbol.replace(".", "-"), row["Security Name"], exchange))
+    return entries
+
+
+def _load_file(path: str) -> List[Entry]:
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        return [
+            (row["symbol"].strip(), row.get("name", "").strip(), row.get("exchange", "").strip())
+            for row in reader
+            if row.get("symbol", "").strip()
+        ]
+
+
+def _download_listings() -> List[Entry]:
+    entries = []
+    for url, parse in ((NASDAQ_LISTED_URL, _parse_nasdaq_listed), (OTHER_LISTED_URL, _parse_other_listed)):
+        response = requests.get(url, timeout=15)
+        response.raise_for_status()
+        entries.extend(parse(response.text))
+    return entries
+
+
+def load_directory() -> SymbolDirectory:
+    try:
+        entries = _load_file(SYMBOL_DIRECTORY_FILE) if SYMBOL_DIRECTORY_FILE else _download_listings()
+        if entries:
+            return SymbolDirectory(entries)
+        print("Symbol directory is empty, using the default symbols")
+    except Exception as e:
+        print(f"Could not load symbol directory, using the default symbols: {str(e)}")
+    return SymbolDirectory([(symbol, FALLBACK_NAMES.get(symbol, ""), "") for symbol in DEFAULT_SYMBOLS])
+
+
+_directory = None
+_lock = threading.Lock()
+
+
+def directory() -> SymbolDirectory:
+    """The process-wide directory, loaded on first use"""
+    global _directory
+    if _directory is None:
+        with _lock:
+            if _directory is None:
+                _directory = load_directory()
+    return _directory
+
+
+def search_symbols(query: str, limit: int = 10) -> List[dict]:
+    return directory().search(query, limit)
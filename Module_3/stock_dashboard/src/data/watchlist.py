@@ -0,0 +1,79 @@
+"""
+Symbols the dashboard cares about: the default picker list, any configured
+extras and the symbols users request most often.
+
+With a shared cache, request counts are node-wide: each worker counts its
+own requests in memory and flush_access_counts() adds them to the shared
+totals, which is what the ranking reads. Otherwise counts are per process.
+"""
+import os
+import threading
+from collections import Counter
+from typing import List
+
+from src.data import shared_cache
+
+# Symbols offered by the visualization page out of the box
+DEFAULT_SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "NFLX"]
+
+# Extra symbols to keep warm, comma-separated
+PREFETCH_SYMBOLS = [s.strip().upper() for s in os.getenv("PREFETCH_SYMBOLS", "").split(",") if s.strip()]
+
+# How many of the most requested symbols join the watchlist
+PREFETCH_TOP_N = int(os.getenv("PREFETCH_TOP_N", "20"))
+
+# Seconds between flushes of a worker's counts to the shared totals
+ACCESS_FLUSH_SECONDS = int(os.getenv("ACCESS_FLUSH_SECONDS", "10"))
+
+_access_counts = Counter()
+# Counted here but not yet added to the shared totals
+_unflushed = Counter()
+_lock = threading.Lock()
+
+
+def record_access(symbol: str):
+    """Count a user request for symbol"""
+    with _lock:
+        _access_counts[symbol.upper()] += 1
+        if shared_cache.enabled():
+            _unflushed[symbol.upper()] += 1
+
+
+def flush_access_counts():
+    """Add this worker's new requests to the node-wide counts"""
+    with _lock:
+        counts = dict(_unflushed)
+        _unflushed.clear()
+    try:
+        shared_cache.add_access_counts(counts)
+    except OSError as e:
+        print(f"Could not share access counts: {str(e)}")
+        with _lock:
+            _unflushed.update(counts)
+
+
+def _counts() -> Counter:
+    if not shared_cache.enabled():
+        with _lock:
+            return Counter(_access_counts)
+    counts = Counter(shared_cache.access_counts())
+    with _lock:
+        counts.update(_unflushed)
+    return counts
+
+
+def top_symbols(count: int = PREFETCH_TOP_N) -> List[str]:
+    return [symbol for symbol, _ in _counts().most_common(count)]
+
+
+def access_stats() -> dict:
+    return dict(_counts().most_common())
+
+
+def watchlist() -> List[str]:
+    """Configured and default symbols first, then the most requested ones"""
+    symbols = []
+    for symbol in PREFETCH_SYMBOLS + DEFAULT_SYMBOLS + top_symbols():
+        if symbol not in symbols:
+            symbols.append(symbol)
+    return symbols
@@ -2,49 +2,169 @@
 API client utility to switch between direct function calls and FastAPI backend
 """
 import os
+import threading
 import requests
 import pandas as pd
+from collections import OrderedDict
 from typing import Optional
 
 # Check if we should use API (set USE_API=true in environment)
 USE_API = os.getenv("USE_API", "false").lower() == "true"
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8000")
+# URL the browser uses to reach the API (live charts connect from the client side)
+PUBLIC_API_URL = os.getenv("PUBLIC_API_URL", API_BASE_URL)
 
 
-def get_stock_data_via_api(symbol: str, period: str) -> pd.DataFrame:
-    """Get stock data via FastAPI"""
-    try:
-        response = requests.post(
-            f"{API_BASE_URL}/api/stock-data",
-            json={"symbol": symbol, "period": period},
-            timeout=30
-        )
-        
-        # Check for HTTP errors
-        if response.status_code == 404:
-            raise ValueError(f"No data available for {symbol}")
-        elif response.status_code == 400:
-            error_data = response.json() if response.content else {}
-            raise ValueError(error_data.get("detail", f"Bad request for {symbol}"))
-        elif response.status_code >= 400:
-            error_data = response.json() if response.content else {}
-            error_msg = error_data.get("detail", f"Server error: {response.status_code}")
-            raise Exception(f"API error: {error_msg}")
-        
-        response.raise_for_status()
-        data = response.json()
-        
-        if not data.get("data"):
-            raise ValueError(f"No data returned for {symbol}")
-        
-        # Convert back to DataFrame
-        df = pd.DataFrame.from_dict(data["data"], orient="index")
+def _public_ws_base() -> str:
+    return PUBLIC_API_URL.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+
+
+def quote_stream_url(symbols) -> str:
+    """WebSocket URL streaming live quotes for the given symbols"""
+    return f"{_public_ws_base()}/ws/quotes?symbols={','.join(symbols)}"
+
+
+def alert_stream_url() -> str:
+    """WebSocket URL pushing triggered alerts"""
+    return f"{_public_ws_base()}/ws/alerts"
+
+
+# ETag validators of recent stock-data responses: query -> (etag, history, DataFrame)
+VALIDATOR_CACHE_SIZE = int(os.getenv("VALIDATOR_CACHE_SIZE", "64"))
+_validator_cache = OrderedDict()
+_validator_lock = threading.Lock()
+
+
+def _deadline(timeout: float) -> dict:
+    """Tell the API how long we will wait, so it stops working for us after that"""
+    return {"X-Request-Timeout": str(timeout)}
+
+
+def _cached_validator(key):
+    with _validator_lock:
+        cached = _validator_cache.get(key)
+        if cached is not None:
+            _validator_cache.move_to_end(key)
+        return cached
+
+
+def _remember_validator(key, etag: str, history, df: pd.DataFrame):
+    with _validator_lock:
+        _validator_cache[key] = (etag, history, df)
+        _validator_cache.move_to_end(key)
+        while len(_validator_cache) > VALIDATOR_CACHE_SIZE:
+            _validator_cache.popitem(last=False)
+
+
+def _merge_delta(local: pd.DataFrame, history, delta: pd.DataFrame, payload: dict) -> Optional[pd.DataFrame]:
+    """
+    Apply a `since` delta to the locally held frame. Returns None when the
+    result does not line up with the server's series and a full reload is
+    needed: the server revised bars before the delta (its history version
+    changed) or the row count no longer matches.
+    """
+    if payload.get("history") != history:
+        return None
+    if not delta.empty:
+        local = pd.concat([local[local.index < delta.index[0]], delta])
+    # Drop bars that have rolled out of the requested window
+    local = local[local.index >= pd.Timestamp(payload["first"])]
+    if len(local) != payload["rows"]:
+        return None
+    return local
+
+
+def _request_stock_data(symbol: str, params: dict, headers: dict):
+    response = requests.get(
+        f"{API_BASE_URL}/api/stock-data/{symbol}",
+        params=params,
+        headers={**headers, **_deadline(30)},
+        timeout=30
+    )
+
+    if response.status_code == 304:
+        return response
+
+    # Check for HTTP errors
+    if response.status_code == 404:
+        raise ValueError(f"No data available for {symbol}")
+    elif response.status_code == 400:
+        error_data = response.json() if response.content else {}
+        raise ValueError(error_data.get("detail", f"Bad request for {symbol}"))
+    elif response.status_code >= 400:
+        error_data = response.json() if response.content else {}
+        error_msg = error_data.get("detail", f"Server error: {response.status_code}")
+        raise Exception(f"API error: {error_msg}")
+
+    response.raise_for_status()
+    return response
+
+
+def _payload_frame(data: dict) -> pd.DataFrame:
+    # Convert back to DataFrame
+    df = pd.DataFrame.from_dict(data["data"], orient="index")
+    if df.empty:
+        return df
+    if data.get("tz"):
+        # Timestamps carry per-row UTC offsets (DST); restore the exchange zone
+        df.index = pd.to_datetime(df.index, utc=True).tz_convert(data["tz"])
+    else:
         df.index = pd.to_datetime(df.index)
-        df.sort_index(inplace=True)
+    df.sort_index(inplace=True)
+    return df
+
+
+def get_stock_data_via_api(symbol: str, period: str, start: Optional[str] = None,
+                           end: Optional[str] = None, interval: str = "1d") -> pd.DataFrame:
+    """
+    Get stock data via FastAPI
+
+    Sends the ETag of the last response for the same query, so an unchanged
+    series comes back as an empty 304 and is served from the local copy.
+    When it has changed, only bars since the local copy's last bar are
+    downloaded and merged in, unless the server reports that older bars
+    were revised, in which case the full series is reloaded.
+    """
+    params = {"period": period, "interval": interval}
+    if start:
+        params["start"] = start
+    if end:
+        params["end"] = end
+    key = (symbol.upper(), period, start, end, interval)
+    cached = _cached_validator(key)
+
+    try:
+        df = None
+        if cached:
+            etag, history, local = cached
+            response = _request_stock_data(
+                symbol,
+                {**params, "since": str(local.index[-1])},
+                {"If-None-Match": etag}
+            )
+            if response.status_code == 304:
+                return local.copy()
+            data = response.json()
+            df = _merge_delta(local, history, _payload_frame(data), data)
+
+        if df is None:
+            response = _request_stock_data(symbol, params, {})
+            data = response.json()
+            
+            if not data.get("data"):
+                raise ValueError(f"No data returned for {symbol}")
+            
+            df = _payload_frame(data)
         
         if df.empty:
             raise ValueError(f"Empty dataset for {symbol}")
         
+        # Travels with the frame (and Streamlit's pickled copies of it), so a
+        # chart seeded with this frame knows which history it was drawn from
+        df.attrs["history"] = data.get("history")
+        etag = response.headers.get("ETag")
+        if etag:
+            _remember_validator(key, etag, data.get("history"), df.copy())
         return df
     except requests.exceptions.Timeout:
         raise Exception(f"Request timeout: API took too long to respond for {symbol}")
@@ -64,6 +184,7 @@ def summarize_text_via_api(text: str, max_length: int, min_length: int) -> str:
                 "max_length": max_length,
                 "min_length": min_length
             },
+            headers=_deadline(120),
             timeout=120  # Longer timeout for summarization
         )
         response.raise_for_status()
@@ -73,14 +194,15 @@ def summarize_text_via_api(text: str, max_length: int, min_length: int) -> str:
         raise Exception(f"API request failed: {str(e)}")
 
 
-def get_stock_data(symbol: str, period: str) -> pd.DataFrame:
+def get_stock_data(symbol: str, period: str, start: Optional[str] = None,
+                   end: Optional[str] = None, interval: str = "1d") -> pd.DataFrame:
     """Get stock data - uses API if enabled, otherwise direct call"""
     if USE_API:
-        return get_stock_data_via_api(symbol, period)
+        return get_stock_data_via_api(symbol, period, start, end, interval)
     else:
         # Direct import and call
         from src.data.stock_data import get_stock_data as get_stock_data_direct
-        return get_stock_data_direct(symbol, period)
+        return get_stock_data_direct(symbol, period, start=start, end=end, interval=interval)
 
 
 def summarize_text(text: str, max_length: int, min_length: int) -> str:
@@ -92,3 +214,192 @@ def summarize_text(text: str, max_length: int, min_length: int) -> str:
         from src.data.summarization import summarize_text as summarize_text_direct
         return summarize_text_direct(text, max_length, min_length)
 
+
+def summarize_batch(texts, max_length: int, min_length: int) -> dict:
+    """Summarize many texts, once per near-duplicate cluster - uses API if enabled, otherwise direct call"""
+    if USE_API:
+        return _post_analytics("/api/summarize/batch", {
+            "texts": list(texts),
+            "max_length": max_length,
+            "min_length": min_length
+        }, timeout=600)
+    else:
+        from src.data.summarization import summarize_batch as summarize_batch_direct
+        return summarize_batch_direct(list(texts), max_length, min_length)
+
+
+def score_sentiment(texts) -> dict:
+    """Score a batch of texts in one request - uses API if enabled, otherwise direct call"""
+    if USE_API:
+        return _post_analytics("/api/sentiment", {"texts": list(texts)})
+    else:
+        from src.data.sentiment import score_sentiment as score_sentiment_direct
+        return score_sentiment_direct(list(texts))
+
+
+def get_correlation_via_api(symbols, period: str, window: int) -> dict:
+    """Get correlation/covariance matrices via FastAPI"""
+    try:
+        response = requests.post(
+            f"{API_BASE_URL}/api/correlation",
+            json={"symbols": list(symbols), "period": period, "window": window},
+            headers=_deadline(120),
+            timeout=120
+        )
+        if response.status_code == 400:
+            raise ValueError(response.json().get("detail", "Bad correlation request"))
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"API request failed: {str(e)}")
+
+
+def get_correlation(symbols, period: str, window: int) -> dict:
+    """Get correlation matrices - uses API if enabled, otherwise direct call"""
+    if USE_API:
+        return get_correlation_via_api(symbols, period, window)
+    else:
+        from src.analytics.correlation import correlation_matrices
+        return correlation_matrices(list(symbols), period, window)
+
+
+def _post_analytics(path: str, payload: dict, timeout: int = 120) -> dict:
+    try:
+        response = requests.post(f"{API_BASE_URL}{path}", json=payload,
+                                 headers=_deadline(timeout), timeout=timeout)
+        if response.status_code == 400:
+            raise ValueError(response.json().get("detail", "Bad request"))
+        response.raise_for_status()
+        return response.json()
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"API request failed: {str(e)}")
+
+
+def run_backtest(symbol: str, strategy: str, params: dict, period: str = "max",
+                 cost_bps: float = 1.0) -> dict:
+    """Backtest one strategy - uses API if enabled, otherwise direct call"""
+    if USE_API:
+        return _post_analytics("/api/backtest", {
+            "symbol": symbol,
+            "strategy": strategy,
+            "params": params,
+            "period": period,
+            "cost_bps": cost_bps
+        })
+    else:
+        from src.analytics.backtest import backtest
+        return backtest(symbol, strategy, params, period, cost_bps)
+
+
+def run_backtest_sweep(symbol: str, strategy: str, grid: dict, period: str = "max",
+                       cost_bps: float = 1.0, top: int = 20, sort_by: str = "sharpe") -> dict:
+    """Parameter sweep - uses API if enabled, otherwise direct call"""
+    if USE_API:
+        return _post_analytics("/api/backtest/sweep", {
+            "symbol": symbol,
+            "strategy": strategy,
+            "grid": grid,
+            "period": period,
+            "cost_bps": cost_bps,
+            "top": top,
+            "sort_by": sort_by
+        }, timeout=300)
+    else:
+        from src.analytics.backtest import sweep
+        return sweep(symbol, strategy, grid, period, cost_bps, top, sort_by)
+
+
+def run_screener(filters: dict, sort_by: Optional[str] = None, descending: bool = True,
+                 limit: int = 100) -> dict:
+    """Screen the symbol universe - uses API if enabled, otherwise direct call"""
+    if USE_API:
+        return _post_analytics("/api/screener", {
+            "filters": filters,
+            "sort_by": sort_by,
+            "descending": descending,
+            "limit": limit
+        })
+    else:
+        from src.analytics.screener import screener_index
+        # No background task without the API: answer from the index as it is,
+        # built from stored bars only, and fetch stale symbols in a thread
+        if screener_index.needs_refresh():
+            if not len(screener_index):
+                screener_index.refresh()
+            screener_index.refresh_in_background()
+        return screener_index.query(filters, sort_by, descending, limit)
+
+
+def get_anomalies(symbol: str, period: str, start: Optional[str] = None,
+                  end: Optional[str] = None, interval: str = "1d") -> dict:
+    """Flagged volume spikes and price gaps - uses API if enabled, otherwise direct call"""
+    if USE_API:
+        params = {"period": period, "interval": interval}
+        if start:
+            params["start"] = start
+        if end:
+            params["end"] = end
+        try:
+            response = requests.get(f"{API_BASE_URL}/api/anomalies/{symbol}", params=params,
+                                    headers=_deadline(30), timeout=30)
+            if response.status_code == 400:
+                raise ValueError(response.json().get("detail", "Bad anomaly request"))
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"API request failed: {str(e)}")
+    else:
+        from src.analytics.anomaly import detect_anomalies
+        return detect_anomalies(symbol, period, start, end, interval)
+
+
+def search_symbols(query: str, limit: int = 10) -> list:
+    """Find symbols by ticker or company name prefix - uses API if enabled, otherwise direct call"""
+    if USE_API:
+        try:
+            response = requests.get(
+                f"{API_BASE_URL}/api/symbols/search",
+                params={"q": query, "limit": limit},
+                timeout=10
+            )
+            response.raise_for_status()
+            return response.json()["results"]
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"API request failed: {str(e)}")
+    else:
+        from src.data.symbols import search_symbols as search_symbols_direct
+        return search_symbols_direct(query, limit)
+
+
+# Alerts are evaluated inside the API process against its live quote stream,
+# so there is no direct-call mode for them
+def create_alert(symbol: str, kind: str, value: float, reference: Optional[float] = None,
+                 note: str = "") -> dict:
+    return _post_analytics("/api/alerts", {
+        "symbol": symbol,
+        "kind": kind,
+        "value": value,
+        "reference": reference,
+        "note": note
+    }, timeout=30)
+
+
+def list_alerts() -> dict:
+    """Armed and recently triggered alerts"""
+    try:
+        armed = requests.get(f"{API_BASE_URL}/api/alerts", timeout=10)
+        armed.raise_for_status()
+        triggered = requests.get(f"{API_BASE_URL}/api/alerts/triggered", timeout=10)
+        triggered.raise_for_status()
+        return {"alerts": armed.json()["alerts"], "triggered": triggered.json()["triggered"]}
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"API request failed: {str(e)}")
+
+
+def delete_alert(alert_id: int):
+    try:
+        response = requests.delete(f"{API_BASE_URL}/api/alerts/{alert_id}", timeout=10)
+        if response.status_code != 404:
+            response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        raise Exception(f"API request failed: {str(e)}")
@@ -0,0 +1,77 @@
+"""
+End-to-end request deadlines.
+
+A client states how long it is prepared to wait with the X-Request-Timeout
+header (seconds). The API binds the resulting deadline to a context
+variable for the request, so every layer below can ask how much budget is
+left without it being threaded through each call:
+
+- check() raises DeadlineExceeded once the deadline has passed, letting
+  fallbacks and queued work be skipped instead of finishing for nobody
+- timeout(default) caps a provider call's own timeout at the time left
+
+Without a deadline both are no-ops (timeout returns the default). The
+context is copied into asyncio.to_thread workers; plain executor threads
+get it through bind().
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Optional
+
+# Shortest timeout handed to a provider call, so a nearly spent budget
+# still fails fast instead of passing a zero/negative timeout
+MIN_TIMEOUT_SECONDS = 0.05
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(Exception):
+    """The client's deadline passed before the work could finish"""
+
+
+@contextmanager
+def bound(seconds: Optional[float]):
+    """Run the enclosed block with a deadline `seconds` from now (None: no deadline)"""
+    token = _deadline.set(time.monotonic() + seconds if seconds is not None else None)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, None when there is none"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def check(what: str = "request"):
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded(f"Deadline exceeded before {what}")
+
+
+def timeout(default: float) -> float:
+    """`default` capped at the time left; raises if nothing is left"""
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceeded("Deadline exceeded")
+    return max(min(default, left), MIN_TIMEOUT_SECONDS)
+
+
+def bind(fn: Callable) -> Callable:
+    """Wrap fn so it sees the current deadline when run on another thread"""
+    deadline = _deadline.get()
+
+    def run(*args, **kwargs):
+        token = _deadline.set(deadline)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _deadline.reset(token)
+    return run
@@ -0,0 +1,52 @@
+"""
+One leader process per node for background jobs.
+
+Every worker of a multi-worker server runs the app's lifespan, but jobs that
+poll rate-limited providers on their own schedule (watchlist prefetch,
+screener refresh) must run once per node, not once per worker. Workers try
+a non-blocking exclusive flock on a lock file in SHARED_CACHE_DIR and only
+the holder runs the jobs. The kernel drops the lock when the holder exits,
+so after a crash or a graceful reload another worker takes over on its
+next attempt.
+
+Without SHARED_CACHE_DIR the process is taken to be the only one and leads.
+"""
+import fcntl
+import os
+
+from src.data.shared_cache import SHARED_CACHE_DIR
+
+LEADER_LOCK_FILE = "leader.lock"
+
+# Seconds between a follower's attempts to take over
+LEADER_RETRY_SECONDS = int(os.getenv("LEADER_RETRY_SECONDS", "30"))
+
+_lock_file = None
+
+
+def try_acquire() -> bool:
+    """Become the leader if no other process is; True while this one leads"""
+    global _lock_file
+    if _lock_file is not None or not SHARED_CACHE_DIR:
+        return True
+    os.makedirs(SHARED_CACHE_DIR, exist_ok=True)
+    lock_file = open(os.path.join(SHARED_CACHE_DIR, LEADER_LOCK_FILE), "a")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock_file.close()
+        return False
+    _lock_file = lock_file
+    return True
+
+
+def release():
+    global _lock_file
+    if _lock_file is not None:
+        fcntl.flock(_lock_file, fcntl.LOCK_UN)
+        _lock_file.close()
+        _lock_file = None
+
+
+def is_leader() -> bool:
+    return _lock_file is not None or not SHARED_CACHE_DIR
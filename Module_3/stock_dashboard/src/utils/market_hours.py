@@ -0,0 +1,68 @@
+"""
+US equity market session helpers.
+
+Only the regular weekday session (09:30-16:00 America/New_York) is modelled;
+exchange holidays are treated as trading days.
+"""
+import os
+from datetime import time as dtime
+from typing import Optional
+
+import pandas as pd
+
+MARKET_TZ = "America/New_York"
+MARKET_OPEN = dtime(9, 30)
+MARKET_CLOSE = dtime(16, 0)
+
+# Upper bound for client caching while the market is closed
+CLOSED_MAX_AGE_SECONDS = int(os.getenv("CLOSED_MAX_AGE_SECONDS", str(6 * 3600)))
+
+
+def _market_now(now: Optional[pd.Timestamp] = None) -> pd.Timestamp:
+    if now is None:
+        return pd.Timestamp.now(tz=MARKET_TZ)
+    if now.tzinfo is None:
+        now = now.tz_localize("UTC")
+    return now.tz_convert(MARKET_TZ)
+
+
+def is_market_open(now: Optional[pd.Timestamp] = None) -> bool:
+    """Whether the regular session is in progress"""
+    now = _market_now(now)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+def seconds_until_open(now: Optional[pd.Timestamp] = None) -> int:
+    """Seconds until the next session opens (0 while it is open)"""
+    now = _market_now(now)
+    if is_market_open(now):
+        return 0
+    day = now.date()
+    if now.time() >= MARKET_OPEN:
+        day += pd.Timedelta(days=1)
+    while day.weekday() >= 5:
+        day += pd.Timedelta(days=1)
+    # Localise the wall-clock open so DST changes are handled
+    next_open = pd.Timestamp.combine(day, MARKET_OPEN).tz_localize(MARKET_TZ)
+    return int((next_open - now).total_seconds())
+
+
+def last_close(now: Optional[pd.Timestamp] = None) -> pd.Timestamp:
+    """Most recent session close at or before now"""
+    now = _market_now(now)
+    day = now.date()
+    if now.time() < MARKET_CLOSE:
+        day -= pd.Timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= pd.Timedelta(days=1)
+    return pd.Timestamp.combine(day, MARKET_CLOSE).tz_localize(MARKET_TZ)
+
+
+def cache_max_age(open_max_age: int, now: Optional[pd.Timestamp] = None) -> int:
+    """
+    Seconds a client may reuse a response: `open_max_age` during the session,
+    otherwise until the next open (capped at CLOSED_MAX_AGE_SECONDS)
+    """
+    if is_market_open(now):
+        return open_max_age
+    return max(open_max_age, min(seconds_until_open(now), CLOSED_MAX_AGE_SECONDS))
@@ -0,0 +1,157 @@
+"""
+Opt-in profiling of single API requests.
+
+A request that asks for profiling gets a RequestProfile bound to a context
+variable for its lifetime. Code on the request path wraps its phases in
+stage("name"); with no profile bound that is one context-variable lookup,
+so unprofiled requests pay next to nothing. The context is copied into
+asyncio.to_thread workers, so stages run off the event loop are recorded
+too.
+
+Two modes:
+- "stages": wall-clock time per named stage (provider, normalize, store,
+  slice, serialize, ...), summed when a stage runs more than once
+- "cprofile": stages plus a cProfile of the event-loop thread for the
+  request, kept as the top PROFILE_TOP_FUNCTIONS functions by cumulative
+  time. Only one request is cProfiled at a time; others fall back to stages.
+  cProfile only sees the thread it was enabled on, so work the request
+  hands to asyncio.to_thread workers shows up as its stage timings only,
+  while event-loop work of other requests running meanwhile is included.
+  Each report starts with a note saying so.
+
+Disabled unless PROFILING_ENABLED=true, so clients cannot make a
+production server profile itself.
+
+Finished profiles are kept in memory (the last PROFILE_HISTORY_SIZE) for
+retrieval by id.
+"""
+import cProfile
+import io
+import itertools
+import os
+import pstats
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+
+PROFILE_HISTORY_SIZE = int(os.getenv("PROFILE_HISTORY_SIZE", "100"))
+
+# Functions listed in a stored cProfile report
+PROFILE_TOP_FUNCTIONS = int(os.getenv("PROFILE_TOP_FUNCTIONS", "30"))
+
+PROFILE_MODES = ["stages", "cprofile"]
+
+CPROFILE_SCOPE_NOTE = (
+    "Event-loop thread only: work run in asyncio.to_thread workers appears only in the "
+    "stage timings, and event-loop work of concurrent requests is included.\n\n"
+)
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+_ids = itertools.count(1)
+_history: "OrderedDict[int, dict]" = OrderedDict()
+_history_lock = threading.Lock()
+_cprofile_lock = threading.Lock()
+
+
+class RequestProfile:
+    def __init__(self, mode: str, label: str):
+        self.id = next(_ids)
+        self.mode = mode
+        self.label = label
+        self.started = time.perf_counter()
+        self.created_at = time.time()
+        self.stages: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self.report: Optional[str] = None
+        self.total_ms: Optional[float] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        self.token = None
+
+    def record(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds * 1000
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def server_timing(self) -> str:
+        """Stages as a Server-Timing header value"""
+        parts = [f"{name};dur={ms:.2f}" for name, ms in self.stages.items()]
+        if self.total_ms is not None:
+            parts.append(f"total;dur={self.total_ms:.2f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "mode": self.mode,
+            "request": self.label,
+            "created_at": self.created_at,
+            "total_ms": round(self.total_ms, 2) if self.total_ms is not None else None,
+            "stages": [
+                {"name": name, "ms": round(ms, 2), "calls": self.counts[name]}
+                for name, ms in self.stages.items()
+            ],
+            "cprofile": self.report,
+        }
+
+
+@contextmanager
+def stage(name: str):
+    """Time the enclosed block as `name` when the current request is profiled"""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.record(name, time.perf_counter() - started)
+
+
+def start(mode: str, label: str) -> RequestProfile:
+    """Bind a new profile to the current context"""
+    if mode not in PROFILE_MODES:
+        mode = "stages"
+    profile = RequestProfile(mode, label)
+    if mode == "cprofile":
+        if _cprofile_lock.acquire(blocking=False):
+            profile._profiler = cProfile.Profile()
+            profile._profiler.enable()
+        else:
+            profile.mode = "stages"
+    profile.token = _current.set(profile)
+    return profile
+
+
+def finish(profile: RequestProfile) -> RequestProfile:
+    """Stop profiling, unbind it from the context and store the result"""
+    profile.total_ms = (time.perf_counter() - profile.started) * 1000
+    if profile._profiler is not None:
+        profile._profiler.disable()
+        _cprofile_lock.release()
+        out = io.StringIO()
+        pstats.Stats(profile._profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        profile.report = CPROFILE_SCOPE_NOTE + out.getvalue()
+        profile._profiler = None
+    _current.reset(profile.token)
+    with _history_lock:
+        _history[profile.id] = profile.to_dict()
+        while len(_history) > PROFILE_HISTORY_SIZE:
+            _history.popitem(last=False)
+    return profile
+
+
+def get(profile_id: int) -> Optional[dict]:
+    with _history_lock:
+        return _history.get(profile_id)
+
+
+def recent() -> List[dict]:
+    """Stored profiles, newest first, without their cProfile reports"""
+    with _history_lock:
+        profiles = list(_history.values())
+    return [{k: v for k, v in p.items() if k != "cprofile"} for p in reversed(profiles)]
@@ -1,8 +1,30 @@
 #!/bin/bash
 
+# Number of API worker processes (production mode defaults to one per CPU)
+if [ "${PRODUCTION_MODE:-false}" = "true" ]; then
+    API_WORKERS=${API_WORKERS:-$(nproc)}
+else
+    API_WORKERS=${API_WORKERS:-1}
+fi
+export API_WORKERS
+
+# Workers share fetched series and quotes through a node-local cache on
+# tmpfs. Every worker runs the app's startup, but the background jobs
+# (PREFETCH_ENABLED, SCREENER_ENABLED) only run in the worker holding
+# $SHARED_CACHE_DIR/leader.lock; another takes over if it exits.
+if [ "$API_WORKERS" -gt 1 ] && [ -z "$SHARED_CACHE_DIR" ]; then
+    export SHARED_CACHE_DIR=/dev/shm/stock_dashboard
+fi
+
 # Start FastAPI in the background
-echo "Starting FastAPI server on port 8000..."
-uvicorn api.main:app --host 0.0.0.0 --port 8000 &
+if [ "${PRODUCTION_MODE:-false}" = "true" ]; then
+    # Preloaded multi-worker server, see gunicorn.conf.py
+    echo "Starting FastAPI server on port 8000 under gunicorn (production mode)..."
+    gunicorn api.main:app -c gunicorn.conf.py &
+else
+    echo "Starting FastAPI server on port 8000 with $API_WORKERS worker(s)..."
+    uvicorn api.main:app --host 0.0.0.0 --port 8000 --workers "$API_WORKERS" &
+fi
 
 # Wait a moment for FastAPI to start
 sleep 2
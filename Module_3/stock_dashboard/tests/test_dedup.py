@@ -0,0 +1,21 @@
+from src.data.dedup import cluster, signature
+
+
+def test_mixed_batch_clusters_without_words():
+    story = "Apple shares rose 3% after the company reported record quarterly revenue"
+    texts = [
+        story,
+        "苹果公司股价上涨百分之三",
+        story + " on Thursday",
+        "🚀🚀🚀",
+        "苹果公司股价上涨百分之三",
+        "?!",
+        "   ",
+    ]
+    clusters = cluster(texts)
+    assert sorted(map(sorted, clusters)) == [[0, 2], [1, 4], [3], [5], [6]]
+
+
+def test_blank_text_has_no_signature():
+    assert signature(" \n ") is None
+    assert signature("🚀") is not None